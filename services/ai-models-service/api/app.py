@@ -3,19 +3,23 @@ AI Models API Service
 FastAPI application for serving AI model predictions
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 import uvicorn
+import asyncio
+import base64
+import json
 import os
-import cv2
-import numpy as np
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 import logging
+from contextlib import AsyncExitStack, asynccontextmanager
 
 # Import our model classes
-from src.models.work_at_height_detector import WorkAtHeightDetector
-from src.models.fall_detector import FallDetector
+from src.models.registry import ModelRegistry, ModelNotAvailableError
+from ruth_serving.decode import DecodedImage, decode_image, scale_detections
+from ruth_serving.executor import InferenceExecutor, QueueFullError
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -36,47 +40,170 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global model instances
-models = {}
+# Inference executor configuration
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "32"))
+INFERENCE_RETRY_AFTER = int(os.getenv("INFERENCE_RETRY_AFTER", "1"))
 
-def load_models():
-    """Load all AI models on startup"""
-    models_dir = Path(__file__).parent.parent / "models"
-    
+# Batch endpoint configuration
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "8"))
+BATCH_MAX_IMAGES = int(os.getenv("BATCH_MAX_IMAGES", "256"))
+
+# Intra-op threads per model; 0 splits the CPU cores evenly between the available models
+MODEL_THREADS = int(os.getenv("MODEL_THREADS", "0"))
+
+# Model registry configuration
+MODELS_DIR = Path(__file__).parent.parent / "models"
+MODEL_CONFIG = os.getenv("MODEL_CONFIG", str(MODELS_DIR / "models.yaml"))
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+
+# Fused model artifacts shared with fall-detection-model (mapped read-only; empty = fuse in memory)
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "/app/cache")
+MODEL_CACHE_READ_ONLY = os.getenv("MODEL_CACHE_READ_ONLY", "true").lower() in ("1", "true", "yes")
+
+# Models are loaded on first use (or at startup if marked preload in models.yaml),
+# each with its own inference executor
+registry = ModelRegistry(
+    MODEL_CONFIG,
+    MODELS_DIR,
+    memory_budget_mb=MODEL_MEMORY_BUDGET_MB,
+    cache_dir=MODEL_CACHE_DIR or None,
+    cache_read_only=MODEL_CACHE_READ_ONLY
+)
+executors: Dict[str, InferenceExecutor] = {}
+
+def get_executor(model_name: str) -> InferenceExecutor:
+    """Return the dedicated inference executor of a model, creating it on first use"""
+    if model_name not in executors:
+        threads = MODEL_THREADS or max(
+            1, (os.cpu_count() or 1) // max(1, len(registry.available()) * INFERENCE_WORKERS)
+        )
+        executors[model_name] = InferenceExecutor(
+            max_workers=INFERENCE_WORKERS,
+            max_queue_size=INFERENCE_QUEUE_SIZE,
+            retry_after=INFERENCE_RETRY_AFTER,
+            thread_budget=threads,
+            name=model_name
+        )
+        logger.info(f"Created inference executor for {model_name} with {threads} threads")
+    return executors[model_name]
+
+def require_model(model_name: str) -> InferenceExecutor:
+    """Check a model can be served and that its queue has room, returning its executor"""
+    if model_name not in registry:
+        raise HTTPException(status_code=400, detail=f"Unknown model '{model_name}'")
+    if model_name not in registry.available():
+        raise HTTPException(status_code=503, detail=f"Model '{model_name}' not loaded")
+    executor = get_executor(model_name)
+    if not executor.has_capacity():
+        raise QueueFullError(executor.retry_after)
+    return executor
+
+@asynccontextmanager
+async def use_model(model_name: str):
+    """Load a model if needed and keep it from being evicted while in use"""
     try:
-        # Load Work at Height detector
-        wah_model_path = models_dir / "work-at-height" / "best.wah.pt"
-        if wah_model_path.exists():
-            models["work_at_height"] = WorkAtHeightDetector(str(wah_model_path))
-            logger.info("Loaded Work at Height detector")
-        else:
-            logger.warning(f"Work at Height model not found: {wah_model_path}")
-        
-        # Load Fall detector
-        fall_model_path = models_dir / "fall-detection" / "yolov7-w6-pose.pt"
-        if fall_model_path.exists():
-            models["fall_detection"] = FallDetector(str(fall_model_path))
-            logger.info("Loaded Fall detector")
-        else:
-            logger.warning(f"Fall detection model not found: {fall_model_path}")
-        
-    except Exception as e:
-        logger.error(f"Error loading models: {e}")
+        detector = await asyncio.get_running_loop().run_in_executor(None, registry.acquire, model_name)
+    except ModelNotAvailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    try:
+        yield detector
+    finally:
+        registry.release(model_name)
+
+def normalize_model_id(model_id: str) -> str:
+    """Map URL style model ids (fall-detection, work-at-height, fall) to model keys"""
+    key = model_id.strip().lower().replace("-", "_")
+    return {"fall": "fall_detection"}.get(key, key)
 
 @app.on_event("startup")
 async def startup_event():
-    """Load models when the API starts"""
+    """Preload models marked preload when the API starts"""
     logger.info("Starting Ruth AI Models Service...")
-    load_models()
-    logger.info(f"Loaded {len(models)} models")
-
-def process_uploaded_image(file_content: bytes) -> np.ndarray:
-    """Convert uploaded file to OpenCV image"""
-    nparr = np.frombuffer(file_content, np.uint8)
-    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    if image is None:
+    await asyncio.get_running_loop().run_in_executor(None, registry.preload)
+    logger.info(f"Loaded {len(registry.loaded())} of {len(registry.available())} available models")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the inference threads when the API shuts down"""
+    for model_executor in executors.values():
+        model_executor.shutdown()
+
+@app.exception_handler(QueueFullError)
+async def queue_full_handler(request: Request, exc: QueueFullError):
+    """Reject requests quickly when the inference queue is full"""
+    return JSONResponse(
+        status_code=503,
+        content={"success": False, "detail": "Inference queue is full, retry later"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+def decode_target(model_keys: List[str]) -> int:
+    """Longer side an upload must keep for every requested model (0 = full resolution)"""
+    sizes = [registry.entries[key].input_size for key in model_keys]
+    return 0 if 0 in sizes else max(sizes)
+
+def process_uploaded_image(file_content: bytes, target_size: int = 0) -> DecodedImage:
+    """
+    Decode an uploaded image, no larger than a model input of target_size needs
+
+    Large JPEGs are decoded at a reduced scale; pass results through
+    to_image_pixels with the returned scale.
+    """
+    try:
+        return decode_image(file_content, target_size)
+    except ValueError:
         raise HTTPException(status_code=400, detail="Invalid image format")
-    return image
+
+def decode_batch_image(file_content: bytes, target_size: int) -> Optional[DecodedImage]:
+    """Decode image bytes, returning None instead of raising for invalid images"""
+    try:
+        return decode_image(file_content, target_size)
+    except ValueError:
+        return None
+
+def to_image_pixels(model_key: str, result: Dict, scale: float) -> Dict:
+    """Map a model's detections on a reduced decode back to the upload's pixels"""
+    if registry.entries[model_key].image_coordinates:
+        return scale_detections(result, scale)
+    return result
+
+async def read_batch_request(request: Request) -> List[Tuple[str, bytes]]:
+    """
+    Read the images of a batch request
+
+    Accepts multipart/form-data with repeated "files" fields, or NDJSON with
+    one {"id": ..., "image": "<base64>"} object per line.
+
+    Returns:
+        List of (id, encoded image bytes) in request order
+    """
+    content_type = request.headers.get("content-type", "")
+    items = []
+
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        for index, upload in enumerate(form.getlist("files")):
+            items.append((upload.filename or str(index), await upload.read()))
+
+    elif "ndjson" in content_type or "jsonlines" in content_type:
+        body = await request.body()
+        for index, line in enumerate(body.splitlines()):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                items.append((str(record.get("id", index)), base64.b64decode(record["image"])))
+            except (ValueError, KeyError, TypeError):
+                raise HTTPException(status_code=400, detail=f"Invalid NDJSON record on line {index + 1}")
+
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail="Use multipart/form-data with 'files' fields or application/x-ndjson"
+        )
+
+    return items
 
 @app.get("/")
 async def root():
@@ -88,37 +215,109 @@ async def health_check():
         "status": "healthy",
         "service": "ai-models",
         "version": "1.0.0",
-        "models_loaded": len(models),
-        "available_models": list(models.keys())
+        "models_loaded": len(registry.loaded()),
+        "available_models": registry.available(),
+        "queue_depth": sum(e.queue_depth for e in executors.values()),
+        "queue_capacity": INFERENCE_QUEUE_SIZE,
+        "in_flight": sum(e.in_flight for e in executors.values()),
+        "executors": {
+            model_name: {
+                "queue_depth": e.queue_depth,
+                "in_flight": e.in_flight,
+                "threads": e.thread_budget
+            }
+            for model_name, e in executors.items()
+        }
     }
 
 @app.get("/models")
 async def list_models():
-    """List all available models"""
-    model_list = []
-    for model_name, model_instance in models.items():
-        model_list.append({
-            "name": model_name,
-            "version": "1.0.0",
-            "status": "loaded",
-            "type": "object_detection" if model_name == "work_at_height" else "pose_estimation"
-        })
-    
-    return {"models": model_list}
+    """List configured models with their load state, memory footprint and last use"""
+    return registry.stats()
+
+@app.post("/detect")
+async def detect_multi(file: UploadFile = File(...),
+                       model_ids: str = Query("fall_detection,work_at_height", alias="models")):
+    """
+    Run several models on one image
+
+    The image is decoded once, at the smallest scale that covers the largest
+    requested model input, and the same read-only frame is handed to every
+    requested model; each model resizes it to its own input. The models run
+    concurrently on their own executors and thread budgets.
+
+    Args:
+        file: Uploaded image file
+        model_ids: Comma separated model ids, e.g. "fall-detection,work-at-height"
+
+    Returns:
+        Per-model results keyed by model, plus an overall violation flag
+    """
+    keys = list(dict.fromkeys(normalize_model_id(m) for m in model_ids.split(",") if m.strip()))
+    if not keys:
+        raise HTTPException(status_code=400, detail="No models requested")
+
+    # Reject before reading the upload if any requested model is missing or its queue is full
+    for key in keys:
+        require_model(key)
+
+    try:
+        # Decode once and share the frame between models
+        file_content = await file.read()
+        decoded = process_uploaded_image(file_content, decode_target(keys))
+        image = decoded.image
+        image.setflags(write=False)
+
+        async with AsyncExitStack() as stack:
+            detectors = [await stack.enter_async_context(use_model(key)) for key in keys]
+            outcomes = await asyncio.gather(
+                *(executors[key].run(detector.detect, image) for key, detector in zip(keys, detectors)),
+                return_exceptions=True
+            )
+
+        results = {}
+        for key, outcome in zip(keys, outcomes):
+            if isinstance(outcome, QueueFullError):
+                results[key] = {"success": False, "error": "Inference queue is full, retry later"}
+            elif isinstance(outcome, Exception):
+                logger.error(f"{key} detection failed: {outcome}")
+                results[key] = {"success": False, "error": str(outcome)}
+            else:
+                results[key] = {"success": True, "model": key, **to_image_pixels(key, outcome, decoded.scale)}
+
+        return {
+            "success": any(result["success"] for result in results.values()),
+            "violation_detected": any(result.get("violation_detected", False) for result in results.values()),
+            "results": results
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Multi-model detection failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/detect/work-at-height")
 async def detect_work_at_height(file: UploadFile = File(...)):
     """Work at height detection endpoint"""
-    if "work_at_height" not in models:
+    if "work_at_height" not in registry.available():
         raise HTTPException(status_code=503, detail="Work at height model not loaded")
     
+    executor = get_executor("work_at_height")
+
+    # Reject before reading the upload if the queue is already full
+    if not executor.has_capacity():
+        raise QueueFullError(executor.retry_after)
+
     try:
         # Process uploaded image
         file_content = await file.read()
-        image = process_uploaded_image(file_content)
+        decoded = process_uploaded_image(file_content, decode_target(["work_at_height"]))
         
-        # Run detection
-        result = models["work_at_height"].detect(image)
+        # Run detection on the inference executor, loading the model on first use
+        async with use_model("work_at_height") as detector:
+            result = await executor.run(detector.detect, decoded.image)
+        result = to_image_pixels("work_at_height", result, decoded.scale)
         
         return {
             "success": True,
@@ -126,6 +325,8 @@ async def detect_work_at_height(file: UploadFile = File(...)):
             **result
         }
         
+    except (QueueFullError, HTTPException):
+        raise
     except Exception as e:
         logger.error(f"Work at height detection failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -133,16 +334,24 @@ async def detect_work_at_height(file: UploadFile = File(...)):
 @app.post("/detect/fall")
 async def detect_fall(file: UploadFile = File(...)):
     """Fall detection endpoint"""
-    if "fall_detection" not in models:
+    if "fall_detection" not in registry.available():
         raise HTTPException(status_code=503, detail="Fall detection model not loaded")
     
+    executor = get_executor("fall_detection")
+
+    # Reject before reading the upload if the queue is already full
+    if not executor.has_capacity():
+        raise QueueFullError(executor.retry_after)
+
     try:
         # Process uploaded image
         file_content = await file.read()
-        image = process_uploaded_image(file_content)
+        decoded = process_uploaded_image(file_content, decode_target(["fall_detection"]))
         
-        # Run detection
-        result = models["fall_detection"].detect(image)
+        # Run detection on the inference executor, loading the model on first use
+        async with use_model("fall_detection") as detector:
+            result = await executor.run(detector.detect, decoded.image)
+        result = to_image_pixels("fall_detection", result, decoded.scale)
         
         return {
             "success": True,
@@ -150,10 +359,91 @@ async def detect_fall(file: UploadFile = File(...)):
             **result
         }
         
+    except (QueueFullError, HTTPException):
+        raise
     except Exception as e:
         logger.error(f"Fall detection failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/detect/batch")
+async def detect_batch(request: Request, model: str):
+    """
+    Batch detection endpoint for offline re-scans and multi-camera sweeps
+
+    Images are decoded in parallel and run through the model in chunks of
+    BATCH_CHUNK_SIZE. Results are streamed back as NDJSON, one line per image
+    in request order, as soon as each chunk finishes.
+    """
+    model_key = normalize_model_id(model)
+    if model_key not in registry:
+        raise HTTPException(status_code=400, detail=f"Batch detection is not supported for model '{model}'")
+
+    # Reject before reading the uploads if the model is missing or its queue is already full
+    executor = require_model(model_key)
+
+    items = await read_batch_request(request)
+    if not items:
+        raise HTTPException(status_code=400, detail="No images in request")
+    if len(items) > BATCH_MAX_IMAGES:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_IMAGES} images per batch request")
+
+    # Start decoding everything in parallel; cv2.imdecode releases the GIL
+    loop = asyncio.get_running_loop()
+    target_size = decode_target([model_key])
+    decodes = [loop.run_in_executor(None, decode_batch_image, content, target_size) for _, content in items]
+
+    async def stream_results():
+        # Acquire inside the generator so the release in its finally always pairs with it,
+        # including when the client disconnects or the response is never iterated
+        acquiring = loop.run_in_executor(None, registry.acquire, model_key)
+        try:
+            detector = await asyncio.shield(acquiring)
+        except ModelNotAvailableError as e:
+            for index, (item_id, _) in enumerate(items):
+                yield json.dumps({"index": index, "id": item_id, "model": model_key, "success": False, "error": str(e)}) + "\n"
+            return
+        except asyncio.CancelledError:
+            # The client went away while the model was loading; release it once the load finishes
+            def release_when_loaded(future):
+                if future.exception() is None:
+                    registry.release(model_key)
+            acquiring.add_done_callback(release_when_loaded)
+            raise
+
+        try:
+            for start in range(0, len(items), BATCH_CHUNK_SIZE):
+                chunk_ids = [item_id for item_id, _ in items[start:start + BATCH_CHUNK_SIZE]]
+                images = await asyncio.gather(*decodes[start:start + BATCH_CHUNK_SIZE])
+                valid = [decoded.image for decoded in images if decoded is not None]
+
+                results = []
+                error = None
+                if valid:
+                    try:
+                        results = await executor.run(detector.detect_batch, valid)
+                    except QueueFullError:
+                        error = "Inference queue is full, retry later"
+                    except Exception as e:
+                        logger.error(f"Batch detection failed: {e}")
+                        error = str(e)
+
+                result_iter = iter(results)
+                for offset, (item_id, image) in enumerate(zip(chunk_ids, images)):
+                    line = {"index": start + offset, "id": item_id, "model": model_key}
+                    if image is None:
+                        line.update({"success": False, "error": "Invalid image format"})
+                    elif error is not None:
+                        line.update({"success": False, "error": error})
+                    else:
+                        result = to_image_pixels(model_key, next(result_iter), image.scale)
+                        line.update({"success": "error" not in result, **result})
+                    yield json.dumps(line) + "\n"
+        finally:
+            # Keep the model loaded until the last chunk has been streamed
+            registry.release(model_key)
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
 @app.post("/detect/fire")
 async def detect_fire(file: UploadFile = File(...)):
     """Fire/smoke detection endpoint - placeholder"""
@@ -437,14 +437,17 @@ def plot_results(start=0, stop=0, bucket='', id=(), labels=(), save_dir=''):
     
     
 def output_to_keypoint(output):
-    # Convert model output to target format [batch_id, class_id, x, y, w, h, conf]
+    # Convert model output to target format [batch_id, class_id, x, y, w, h, conf, kpts...]
+    # One device transfer per image and whole-array box conversion, instead of one per detection
     targets = []
     for i, o in enumerate(output):
-        kpts = o[:,6:]
-        o = o[:,:6]
-        for index, (*box, conf, cls) in enumerate(o.cpu().numpy()):
-            targets.append([i, cls, *list(*xyxy2xywh(np.array(box)[None])), conf, *list(kpts.cpu().numpy()[index])])
-    return np.array(targets)
+        o = o.detach().cpu().numpy()
+        if not len(o):
+            continue
+        targets.append(np.concatenate([
+            np.full((len(o), 1), i, dtype=o.dtype), o[:, 5:6], xyxy2xywh(o[:, :4]), o[:, 4:5], o[:, 6:]
+        ], 1))
+    return np.concatenate(targets) if targets else np.array([])
 
 
 def plot_skeleton_kpts(im, kpts, steps, orig_shape=None):
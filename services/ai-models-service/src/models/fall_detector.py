@@ -10,6 +10,14 @@ from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 import logging
 import math
+import sys
+
+# The YOLOv7 tree provides the model classes the weights and fused artifacts unpickle into
+YOLOV7_ROOT = Path(__file__).resolve().parent.parent / "fall-detection"
+if str(YOLOV7_ROOT) not in sys.path:
+    sys.path.append(str(YOLOV7_ROOT))
+
+from ruth_serving.artifacts import load_inference_model  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
@@ -18,16 +26,22 @@ class FallDetector:
     Detects falls using human pose estimation and keypoint analysis
     """
     
-    def __init__(self, model_path: str, confidence_threshold: float = 0.6):
+    def __init__(self, model_path: str, confidence_threshold: float = 0.6, cache_dir: Optional[str] = None,
+                 cache_read_only: bool = True):
         """
         Initialize the fall detector
         
         Args:
             model_path: Path to the YOLOv7 pose model weights
             confidence_threshold: Minimum confidence for detections
+            cache_dir: Directory of fused model artifacts (None = fuse in memory on every load)
+            cache_read_only: Only map artifacts built by the fall-detection-model service
         """
         self.model_path = Path(model_path)
         self.confidence_threshold = confidence_threshold
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.cache_read_only = cache_read_only
+        self.artifact_path = None
         self.model = None
         
         # COCO pose keypoint indices
@@ -54,10 +68,10 @@ class FallDetector:
             if not self.model_path.exists():
                 raise FileNotFoundError(f"Model file not found: {self.model_path}")
             
-            # Load YOLOv7 pose model
-            self.model = torch.load(str(self.model_path), map_location='cpu')
-            if hasattr(self.model, 'float'):
-                self.model.float()
+            # Map the fused artifact shared with other services when one exists for these weights
+            self.model, self.artifact_path = load_inference_model(
+                self.model_path, self.cache_dir, read_only=self.cache_read_only
+            )
             self.model.eval()
             
             logger.info(f"Loaded fall detection model from {self.model_path}")
@@ -76,50 +90,70 @@ class FallDetector:
         Returns:
             Dictionary containing detection results
         """
+        return self.detect_batch([image])[0]
+
+    def detect_batch(self, images: List[np.ndarray]) -> List[Dict]:
+        """
+        Detect falls in several images with a single batched forward pass
+
+        Args:
+            images: Input images as numpy arrays (BGR format)
+
+        Returns:
+            List of detection result dictionaries, one per input image
+        """
         if self.model is None:
             raise RuntimeError("Model not loaded")
         
         try:
-            # Preprocess image
-            img_tensor = self._preprocess_image(image)
+            # Preprocess and stack images into one batch
+            batch = torch.cat([self._preprocess_image(image) for image in images])
             
             # Run inference
             with torch.no_grad():
-                predictions = self.model(img_tensor)[0]
+                predictions = self.model(batch)[0]
             
-            # Post-process results
-            detections = self._postprocess_predictions(predictions, image.shape)
-            
-            # Analyze poses for fall detection
-            fall_detected = False
-            fall_confidence = 0.0
-            fall_type = None
-            
-            for detection in detections:
-                is_fall, confidence, f_type = self._analyze_pose_for_fall(detection["keypoints"])
-                if is_fall and confidence > fall_confidence:
-                    fall_detected = True
-                    fall_confidence = confidence
-                    fall_type = f_type
-            
-            return {
-                "violation_detected": fall_detected,
-                "violation_type": fall_type,
-                "severity": "critical" if fall_detected else "low",
-                "confidence": fall_confidence,
-                "detections": detections,
-                "detection_count": len(detections),
-                "model_name": "fall_detector",
-                "model_version": "1.0.0"
-            }
+            # Post-process results per image
+            results = []
+            for i, image in enumerate(images):
+                detections = self._postprocess_predictions(predictions[i:i + 1], image.shape)
+                results.append(self._build_result(detections))
+            return results
             
         except Exception as e:
             logger.error(f"Fall detection failed: {e}")
-            return {
-                "violation_detected": False,
-                "error": str(e),
-                "model_name": "fall_detector"
-            }
+            return [
+                {
+                    "violation_detected": False,
+                    "error": str(e),
+                    "model_name": "fall_detector"
+                }
+                for _ in images
+            ]
+
+    def _build_result(self, detections: List[Dict]) -> Dict:
+        """Analyze detected poses and build the response for one image"""
+        fall_detected = False
+        fall_confidence = 0.0
+        fall_type = None
+        
+        for detection in detections:
+            is_fall, confidence, f_type = self._analyze_pose_for_fall(detection["keypoints"])
+            if is_fall and confidence > fall_confidence:
+                fall_detected = True
+                fall_confidence = confidence
+                fall_type = f_type
+        
+        return {
+            "violation_detected": fall_detected,
+            "violation_type": fall_type,
+            "severity": "critical" if fall_detected else "low",
+            "confidence": fall_confidence,
+            "detections": detections,
+            "detection_count": len(detections),
+            "model_name": "fall_detector",
+            "model_version": "1.0.0"
+        }
     
     def _preprocess_image(self, image: np.ndarray) -> torch.Tensor:
         """Preprocess image for YOLOv7 pose model"""
@@ -0,0 +1,284 @@
+"""
+Model Registry
+Loads models described in models.yaml on first use and evicts idle ones under a memory budget
+"""
+
+import gc
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+from src.models.fall_detector import FallDetector
+from ruth_serving.memory import weights_memory_kb
+from src.models.work_at_height_detector import WorkAtHeightDetector
+
+logger = logging.getLogger(__name__)
+
+# Detector class for each "framework" value in models.yaml
+FRAMEWORK_LOADERS: Dict[str, Callable[..., Any]] = {
+    "yolov7": FallDetector,
+    "yolov8": WorkAtHeightDetector,
+}
+
+# Frameworks whose detectors can map fused artifacts from the shared model cache
+CACHED_FRAMEWORKS = {"yolov7"}
+
+# Frameworks whose detections are in pixels of the image they were given, so
+# results on a reduced decode must be mapped back to the upload's pixels
+# (the yolov7 detector reports boxes in its fixed model input frame)
+IMAGE_COORDINATE_FRAMEWORKS = {"yolov8"}
+
+
+class ModelNotAvailableError(Exception):
+    """Raised when a model is not configured or cannot be loaded"""
+
+
+def _detector_bytes(detector: Any, weights_path: Path) -> int:
+    """Estimate a detector's memory footprint from its parameter and buffer tensors"""
+    module = getattr(detector, "model", None)
+    try:
+        tensors = list(module.parameters()) + list(module.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    except Exception:
+        return weights_path.stat().st_size if weights_path.exists() else 0
+
+
+class ModelEntry:
+    """
+    Configuration and load state of one model
+    """
+
+    def __init__(self, key: str, config: Dict, models_dir: Path):
+        self.key = key
+        self.config = config
+        self.name = config.get("name", key)
+        self.type = config.get("type", "object_detection")
+        self.framework = config.get("framework", "")
+        self.weights_path = models_dir / config.get("weights_file", "")
+        self.confidence_threshold = config.get("confidence_threshold")
+        self.preload = bool(config.get("preload", False))
+        # Longer side the model resizes images to; uploads are decoded no larger (0 = full resolution)
+        self.input_size = int(config.get("input_size", 0))
+
+        self.detector = None
+        self.memory_bytes = 0
+        self.loaded_at: Optional[float] = None
+        self.last_used: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self.active = 0
+        self.loads = 0
+        self.lock = threading.Lock()
+
+    @property
+    def image_coordinates(self) -> bool:
+        """Whether the detector reports detections in pixels of the image it was given"""
+        return self.framework in IMAGE_COORDINATE_FRAMEWORKS
+
+    @property
+    def available(self) -> bool:
+        """Whether the model has a loader and its weights file exists"""
+        return self.framework in FRAMEWORK_LOADERS and self.weights_path.is_file()
+
+    def info(self) -> Dict:
+        return {
+            "name": self.key,
+            "display_name": self.name,
+            "type": self.type,
+            "framework": self.framework,
+            "version": "1.0.0",
+            "status": "loaded" if self.detector is not None else ("available" if self.available else "missing"),
+            "preload": self.preload,
+            "input_size": self.input_size,
+            "memory_mb": round(self.memory_bytes / (1024 * 1024), 1),
+            "loaded_at": self.loaded_at,
+            "last_used": self.last_used,
+            "load_seconds": round(self.load_seconds, 2) if self.load_seconds is not None else None,
+            "loads": self.loads,
+            "active_requests": self.active,
+            "weights_memory": self.weights_memory()
+        }
+
+    def weights_memory(self) -> Dict:
+        """Resident memory of the loaded weights in this process (empty when not loaded)"""
+        detector = self.detector
+        if detector is None:
+            return {}
+        return weights_memory_kb(getattr(detector, "model", None), getattr(detector, "artifact_path", None))
+
+
+class ModelRegistry:
+    """
+    Lazily loaded, LRU evicted set of models
+
+    Models are loaded on their first request, or at startup if marked
+    preload. When the loaded models exceed the memory budget, the least
+    recently used models that are not serving a request are unloaded.
+    """
+
+    def __init__(self, config_path: Path, models_dir: Path, memory_budget_mb: float = 0,
+                 cache_dir: Optional[Path] = None, cache_read_only: bool = True):
+        """
+        Initialize the registry
+
+        Args:
+            config_path: Path to models.yaml
+            models_dir: Directory the weights_file entries are relative to
+            memory_budget_mb: Maximum memory for loaded models (0 = unlimited)
+            cache_dir: Shared directory of fused, memory-mappable model artifacts (None = disabled)
+            cache_read_only: Only map artifacts built by another service, never write the cache
+        """
+        self.config_path = Path(config_path)
+        self.models_dir = Path(models_dir)
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.cache_read_only = cache_read_only
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        with open(self.config_path, "r") as f:
+            config = yaml.safe_load(f) or {}
+        self.entries: Dict[str, ModelEntry] = {
+            key: ModelEntry(key, model_config or {}, self.models_dir)
+            for key, model_config in (config.get("models") or {}).items()
+        }
+        logger.info(f"Model registry configured with {list(self.entries)} from {self.config_path}")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def available(self) -> List[str]:
+        """Keys of configured models that can be loaded"""
+        return [key for key, entry in self.entries.items() if entry.available]
+
+    def loaded(self) -> List[str]:
+        """Keys of models currently in memory"""
+        return [key for key, entry in self.entries.items() if entry.detector is not None]
+
+    def preload(self):
+        """Load every available model marked preload"""
+        for key, entry in self.entries.items():
+            if entry.preload and entry.available:
+                try:
+                    self.load(key)
+                except ModelNotAvailableError as e:
+                    logger.error(f"Failed to preload {key}: {e}")
+
+    def load(self, key: str):
+        """
+        Load a model if it is not in memory yet (blocking)
+
+        Returns:
+            The detector instance
+
+        Raises:
+            ModelNotAvailableError: If the model is unknown, has no weights or fails to load
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            raise ModelNotAvailableError(f"Model '{key}' is not configured")
+
+        with entry.lock:
+            if entry.detector is None:
+                if not entry.available:
+                    raise ModelNotAvailableError(f"Model '{key}' weights not found: {entry.weights_path}")
+
+                started = time.perf_counter()
+                kwargs = {}
+                if entry.confidence_threshold is not None:
+                    kwargs["confidence_threshold"] = entry.confidence_threshold
+                if entry.framework in CACHED_FRAMEWORKS and self.cache_dir is not None:
+                    kwargs["cache_dir"] = str(self.cache_dir)
+                    kwargs["cache_read_only"] = self.cache_read_only
+                try:
+                    detector = FRAMEWORK_LOADERS[entry.framework](str(entry.weights_path), **kwargs)
+                except Exception as e:
+                    raise ModelNotAvailableError(f"Model '{key}' failed to load: {e}")
+
+                entry.detector = detector
+                entry.memory_bytes = _detector_bytes(detector, entry.weights_path)
+                entry.load_seconds = time.perf_counter() - started
+                entry.loaded_at = time.time()
+                entry.last_used = entry.loaded_at
+                entry.loads += 1
+                logger.info(
+                    f"Loaded model {key} in {entry.load_seconds:.1f}s "
+                    f"({entry.memory_bytes / (1024 * 1024):.0f} MB)"
+                )
+
+            detector = entry.detector
+
+        self._enforce_budget(keep=key)
+        return detector
+
+    def acquire(self, key: str):
+        """
+        Load a model if needed and mark it as serving a request (blocking)
+
+        Every acquire must be paired with release(key). Acquired models are
+        never evicted.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            raise ModelNotAvailableError(f"Model '{key}' is not configured")
+        with self._lock:
+            entry.active += 1
+        try:
+            detector = self.load(key)
+        except Exception:
+            self.release(key)
+            raise
+        entry.last_used = time.time()
+        return detector
+
+    def release(self, key: str):
+        """Mark a request on a model as finished"""
+        entry = self.entries[key]
+        with self._lock:
+            entry.active = max(0, entry.active - 1)
+        entry.last_used = time.time()
+
+    def unload(self, key: str) -> bool:
+        """Unload a model that is not serving any request"""
+        entry = self.entries[key]
+        with entry.lock, self._lock:
+            if entry.detector is None or entry.active:
+                return False
+            entry.detector = None
+            freed, entry.memory_bytes = entry.memory_bytes, 0
+        gc.collect()
+        logger.info(f"Unloaded model {key} (freed ~{freed / (1024 * 1024):.0f} MB)")
+        return True
+
+    def memory_used(self) -> int:
+        return sum(entry.memory_bytes for entry in self.entries.values() if entry.detector is not None)
+
+    def _enforce_budget(self, keep: Optional[str] = None):
+        """Evict least recently used idle models until the loaded set fits the budget"""
+        if not self.memory_budget:
+            return
+        while self.memory_used() > self.memory_budget:
+            candidates = [
+                entry for entry in self.entries.values()
+                if entry.detector is not None and not entry.active and entry.key != keep
+            ]
+            if not candidates:
+                logger.warning(
+                    f"Loaded models use {self.memory_used() / (1024 * 1024):.0f} MB, over the "
+                    f"{self.memory_budget / (1024 * 1024):.0f} MB budget, but none can be evicted"
+                )
+                return
+            victim = min(candidates, key=lambda entry: entry.last_used or 0.0)
+            if self.unload(victim.key):
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        return {
+            "memory_budget_mb": round(self.memory_budget / (1024 * 1024), 1),
+            "memory_used_mb": round(self.memory_used() / (1024 * 1024), 1),
+            "evictions": self.evictions,
+            "models": [entry.info() for entry in self.entries.values()]
+        }
@@ -10,6 +10,7 @@ from ultralytics import YOLO
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -60,76 +61,107 @@ class WorkAtHeightDetector:
         Returns:
             Dictionary containing detection results
         """
+        return self.detect_batch([image])[0]
+
+    def detect_batch(self, images: List[np.ndarray]) -> List[Dict]:
+        """
+        Detect work at height violations in several images with one batched call
+
+        Args:
+            images: Input images as numpy arrays (BGR format)
+
+        Returns:
+            List of detection result dictionaries, one per input image. Each
+            carries a "timings" dict of stage durations in milliseconds.
+        """
         if self.model is None:
             raise RuntimeError("Model not loaded")
         
         try:
-            # Run inference
-            results = self.model(image, conf=self.confidence_threshold)
-            
-            # Process results
-            detections = []
-            violation_detected = False
-            
+            # Run inference on the whole list at once
+            results = self.model(images, conf=self.confidence_threshold)
+
+            outputs = []
             for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        # Extract box information
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        confidence = box.conf[0].cpu().numpy()
-                        class_id = int(box.cls[0].cpu().numpy())
-                        class_name = self.class_names.get(class_id, "unknown")
-                        
-                        detection = {
-                            "bbox": [int(x1), int(y1), int(x2), int(y2)],
-                            "confidence": float(confidence),
-                            "class_id": class_id,
-                            "class_name": class_name
-                        }
-                        detections.append(detection)
-                        
-                        # Check for violations
-                        if class_name in ["person_at_height", "unsafe_position"]:
-                            violation_detected = True
-            
-            # Determine violation type and severity
-            violation_type = None
-            severity = "low"
-            
-            if violation_detected:
-                person_at_height = any(d["class_name"] == "person_at_height" for d in detections)
-                unsafe_position = any(d["class_name"] == "unsafe_position" for d in detections)
-                safety_equipment = any(d["class_name"] == "safety_equipment" for d in detections)
-                
-                if person_at_height and not safety_equipment:
-                    violation_type = "work_at_height_no_safety_equipment"
-                    severity = "high"
-                elif unsafe_position:
-                    violation_type = "unsafe_work_position"
-                    severity = "medium"
-                elif person_at_height:
-                    violation_type = "work_at_height_detected"
-                    severity = "low"
-            
-            return {
-                "violation_detected": violation_detected,
-                "violation_type": violation_type,
-                "severity": severity,
-                "confidence": max([d["confidence"] for d in detections]) if detections else 0.0,
-                "detections": detections,
-                "detection_count": len(detections),
-                "model_name": "work_at_height_detector",
-                "model_version": "1.0.0"
-            }
+                started = time.perf_counter()
+                output = self._build_result(result)
+                # ultralytics reports its own per-image stage speeds in milliseconds
+                speed = getattr(result, "speed", None) or {}
+                output["timings"] = {
+                    "preprocess": speed.get("preprocess", 0.0),
+                    "forward": speed.get("inference", 0.0),
+                    "nms": speed.get("postprocess", 0.0),
+                    "postprocess": (time.perf_counter() - started) * 1000.0
+                }
+                outputs.append(output)
+            return outputs
             
         except Exception as e:
             logger.error(f"Detection failed: {e}")
-            return {
-                "violation_detected": False,
-                "error": str(e),
-                "model_name": "work_at_height_detector"
-            }
+            return [
+                {
+                    "violation_detected": False,
+                    "error": str(e),
+                    "model_name": "work_at_height_detector"
+                }
+                for _ in images
+            ]
+
+    def _build_result(self, result) -> Dict:
+        """Convert one ultralytics result into the response dictionary"""
+        detections = []
+        violation_detected = False
+        
+        boxes = result.boxes
+        if boxes is not None:
+            for box in boxes:
+                # Extract box information
+                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+                confidence = box.conf[0].cpu().numpy()
+                class_id = int(box.cls[0].cpu().numpy())
+                class_name = self.class_names.get(class_id, "unknown")
+                
+                detection = {
+                    "bbox": [int(x1), int(y1), int(x2), int(y2)],
+                    "confidence": float(confidence),
+                    "class_id": class_id,
+                    "class_name": class_name
+                }
+                detections.append(detection)
+                
+                # Check for violations
+                if class_name in ["person_at_height", "unsafe_position"]:
+                    violation_detected = True
+        
+        # Determine violation type and severity
+        violation_type = None
+        severity = "low"
+        
+        if violation_detected:
+            person_at_height = any(d["class_name"] == "person_at_height" for d in detections)
+            unsafe_position = any(d["class_name"] == "unsafe_position" for d in detections)
+            safety_equipment = any(d["class_name"] == "safety_equipment" for d in detections)
+            
+            if person_at_height and not safety_equipment:
+                violation_type = "work_at_height_no_safety_equipment"
+                severity = "high"
+            elif unsafe_position:
+                violation_type = "unsafe_work_position"
+                severity = "medium"
+            elif person_at_height:
+                violation_type = "work_at_height_detected"
+                severity = "low"
+        
+        return {
+            "violation_detected": violation_detected,
+            "violation_type": violation_type,
+            "severity": severity,
+            "confidence": max([d["confidence"] for d in detections]) if detections else 0.0,
+            "detections": detections,
+            "detection_count": len(detections),
+            "model_name": "work_at_height_detector",
+            "model_version": "1.0.0"
+        }
     
     def annotate_image(self, image: np.ndarray, detections: List[Dict]) -> np.ndarray:
         """
@@ -0,0 +1,10 @@
+import sys
+from pathlib import Path
+
+# Tests import the service the way uvicorn runs it, from the service root,
+# with the shared serving helpers next to it as in the image
+SERVICE_ROOT = Path(__file__).resolve().parent.parent
+SHARED_ROOT = SERVICE_ROOT.parent.parent / "shared"
+for path in (SHARED_ROOT, SERVICE_ROOT):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
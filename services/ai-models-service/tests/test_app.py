@@ -0,0 +1,99 @@
+"""
+Tests for upload decoding in the models API
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("yaml")
+pytest.importorskip("torch")
+pytest.importorskip("ultralytics")
+pytest.importorskip("httpx")
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from api import app as app_module  # noqa: E402
+from src.models import registry as registry_module  # noqa: E402
+from src.models.registry import ModelRegistry  # noqa: E402
+
+
+class ImageSizeDetector:
+    """Reports one detection covering the whole image it was given"""
+
+    def __init__(self, weights_path, confidence_threshold=None, **kwargs):
+        self.model = None
+
+    def detect(self, image):
+        return self.detect_batch([image])[0]
+
+    def detect_batch(self, images):
+        return [
+            {"detections": [{"bbox": [0, 0, image.shape[1], image.shape[0]]}], "decoded_shape": list(image.shape[:2])}
+            for image in images
+        ]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    lines = ["models:"]
+    for key, framework in (("work_at_height", "yolov8"), ("fall_detection", "yolov7")):
+        (tmp_path / f"{key}.pt").write_bytes(b"\0")
+        monkeypatch.setitem(registry_module.FRAMEWORK_LOADERS, framework, ImageSizeDetector)
+        lines += [f"  {key}:", f"    framework: {framework}", f"    weights_file: {key}.pt", "    input_size: 640"]
+    (tmp_path / "models.yaml").write_text("\n".join(lines) + "\n")
+
+    monkeypatch.setattr(app_module, "registry", ModelRegistry(tmp_path / "models.yaml", tmp_path))
+    monkeypatch.setattr(app_module, "executors", {})
+    with TestClient(app_module.app) as client:
+        yield client
+
+
+def jpeg(height, width):
+    ok, data = cv2.imencode(".jpg", np.zeros((height, width, 3), np.uint8))
+    assert ok
+    return data.tobytes()
+
+
+def test_large_uploads_are_decoded_reduced_and_mapped_back(client):
+    response = client.post("/detect/work-at-height", files={"file": ("frame.jpg", jpeg(1080, 1920), "image/jpeg")})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["decoded_shape"] == [540, 960]
+    assert body["detections"][0]["bbox"] == [0, 0, 1920, 1080]
+
+
+def test_model_input_frame_results_are_not_rescaled(client):
+    response = client.post("/detect/fall", files={"file": ("frame.jpg", jpeg(1080, 1920), "image/jpeg")})
+    assert response.status_code == 200
+    assert response.json()["detections"][0]["bbox"] == [0, 0, 960, 540]
+
+
+def test_batch_results_are_mapped_back_per_image(client):
+    response = client.post(
+        "/detect/batch?model=work-at-height",
+        files=[("files", ("a.jpg", jpeg(1080, 1920), "image/jpeg")),
+               ("files", ("b.jpg", jpeg(480, 640), "image/jpeg")),
+               ("files", ("c.jpg", b"not an image", "image/jpeg"))]
+    )
+    lines = [line for line in response.text.splitlines() if line]
+    results = [json.loads(line) for line in lines]
+    assert results[0]["detections"][0]["bbox"] == [0, 0, 1920, 1080]
+    assert results[1]["detections"][0]["bbox"] == [0, 0, 640, 480]
+    assert results[2] == {"index": 2, "id": "c.jpg", "model": "work_at_height", "success": False,
+                          "error": "Invalid image format"}
+
+
+def test_invalid_uploads_are_rejected(client):
+    response = client.post("/detect/work-at-height", files={"file": ("frame.jpg", b"not an image", "image/jpeg")})
+    assert response.status_code == 400
+
+
+def test_shared_frame_is_mapped_back_per_model(client):
+    response = client.post("/detect?models=work-at-height,fall",
+                           files={"file": ("frame.jpg", jpeg(1080, 1920), "image/jpeg")})
+    results = response.json()["results"]
+    assert results["work_at_height"]["detections"][0]["bbox"] == [0, 0, 1920, 1080]
+    assert results["fall_detection"]["detections"][0]["bbox"] == [0, 0, 960, 540]
@@ -0,0 +1,125 @@
+"""
+Tests for the lazy, LRU evicted model registry
+"""
+
+import itertools
+
+import pytest
+
+# The registry imports both detector classes and their frameworks
+pytest.importorskip("yaml")
+pytest.importorskip("torch")
+pytest.importorskip("cv2")
+pytest.importorskip("ultralytics")
+
+from src.models import registry as registry_module  # noqa: E402
+from src.models.registry import ModelNotAvailableError, ModelRegistry  # noqa: E402
+
+MB = 1024 * 1024
+
+
+class FakeDetector:
+    """Stands in for a detector; its footprint is the weights file size"""
+
+    loads = []
+
+    def __init__(self, weights_path, confidence_threshold=None):
+        if weights_path.endswith("broken.pt"):
+            raise RuntimeError("corrupt checkpoint")
+        FakeDetector.loads.append(weights_path)
+        self.model = None
+
+
+@pytest.fixture
+def make_registry(tmp_path, monkeypatch):
+    monkeypatch.setitem(registry_module.FRAMEWORK_LOADERS, "fake", FakeDetector)
+    # Strictly increasing clock so least-recently-used order is deterministic
+    clock = itertools.count(1000)
+    monkeypatch.setattr(registry_module.time, "time", lambda: float(next(clock)))
+    FakeDetector.loads = []
+
+    def make(budget_mb=0, models=("a", "b", "c")):
+        lines = ["models:"]
+        for key in models:
+            weights = tmp_path / f"{key}.pt"
+            if key != "missing":
+                weights.write_bytes(b"\0" * MB)
+            lines += [f"  {key}:", "    framework: fake", f"    weights_file: {key}.pt"]
+        config = tmp_path / "models.yaml"
+        config.write_text("\n".join(lines) + "\n")
+        return ModelRegistry(config, tmp_path, memory_budget_mb=budget_mb)
+
+    return make
+
+
+def test_models_load_once_on_first_use(make_registry):
+    registry = make_registry()
+    assert registry.loaded() == []
+
+    first = registry.acquire("a")
+    registry.release("a")
+    assert registry.acquire("a") is first
+    registry.release("a")
+
+    assert registry.loaded() == ["a"]
+    assert len(FakeDetector.loads) == 1
+    assert registry.entries["a"].active == 0
+
+
+def test_least_recently_used_idle_model_is_evicted(make_registry):
+    registry = make_registry(budget_mb=2.5)
+    for key in ("a", "b"):
+        registry.acquire(key)
+        registry.release(key)
+    # Touch a again so b becomes the least recently used
+    registry.acquire("a")
+    registry.release("a")
+
+    registry.acquire("c")
+    registry.release("c")
+
+    assert sorted(registry.loaded()) == ["a", "c"]
+    assert registry.evictions == 1
+    assert registry.memory_used() <= 2.5 * MB
+
+
+def test_models_serving_requests_are_never_evicted(make_registry):
+    registry = make_registry(budget_mb=1.5)
+    registry.acquire("a")  # still serving
+    registry.acquire("b")  # over budget, but a is busy and b is the one being loaded
+
+    assert sorted(registry.loaded()) == ["a", "b"]
+    assert registry.evictions == 0
+    assert registry.unload("a") is False
+
+    registry.release("a")
+    registry.release("b")
+    registry.acquire("c")
+    registry.release("c")
+    assert registry.loaded() == ["c"]
+    assert registry.evictions == 2
+
+
+def test_failed_loads_do_not_leak_a_reference(make_registry):
+    registry = make_registry(models=("a", "broken", "missing"))
+
+    with pytest.raises(ModelNotAvailableError, match="corrupt checkpoint"):
+        registry.acquire("broken")
+    with pytest.raises(ModelNotAvailableError, match="weights not found"):
+        registry.acquire("missing")
+    with pytest.raises(ModelNotAvailableError, match="not configured"):
+        registry.acquire("unknown")
+
+    assert registry.entries["broken"].active == 0
+    assert registry.entries["missing"].active == 0
+    assert registry.available() == ["a", "broken"]
+
+
+def test_release_never_goes_negative(make_registry):
+    registry = make_registry()
+    registry.acquire("a")
+    registry.release("a")
+    registry.release("a")
+    assert registry.entries["a"].active == 0
+    assert registry.unload("a") is True
+    assert registry.loaded() == []
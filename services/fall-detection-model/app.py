@@ -3,16 +3,32 @@ Fall Detection Model Service
 FastAPI application for fall detection using pose estimation
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 import uvicorn
-import cv2
+import asyncio
+import json
 import numpy as np
 from pathlib import Path
+from typing import Dict, Optional
 import logging
 import os
+import time
 
 from detector import FallDetector
+from batching import BatchScheduler
+from ruth_serving.executor import InferenceExecutor, QueueFullError
+from streaming import CameraSession, SessionClosed
+from ingest import StreamIngestor, load_stream_sources
+from serialization import render_result
+from results import DetectionResult
+from ruth_serving.reload import ModelReloader, ReloadInProgressError
+from ruth_serving.artifacts import weights_sha256
+from ruth_serving.warmup import parse_batch_sizes, parse_shapes, warm_up
+from ruth_serving.metrics import Gauge, MetricsRegistry, server_timing_header, stage_timer
+from ruth_serving.memory import weights_memory_kb
+from ruth_serving.decode import DecodedImage, decode_image, scale_detections
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -33,13 +49,132 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Batching configuration
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "10"))
+
+# Inference executor configuration
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "64"))
+INFERENCE_RETRY_AFTER = int(os.getenv("INFERENCE_RETRY_AFTER", "1"))
+
+# Direct stream ingestion configuration
+STREAM_SOURCES = os.getenv("STREAM_SOURCES", "")
+STREAMS_FILE = os.getenv("STREAMS_FILE", "/app/streams.txt")
+STREAM_MAX_FPS = float(os.getenv("STREAM_MAX_FPS", "5"))
+STREAM_ALERT_URL = os.getenv("STREAM_ALERT_URL", "")
+
+# Hot reload configuration
+MODEL_PATH = Path(os.getenv("MODEL_PATH", "/app/weights/yolov7-w6-pose.pt"))
+# Fused, memory-mappable model artifacts keyed by weights hash (empty = fuse in memory on every start)
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "/app/cache")
+
+# Inference backend: torch (eager), torchscript (frozen traced backbone), onednn (channels-last modules
+# fused by oneDNN, compiled per input shape during warmup) or onnxruntime (exported graph with NMS embedded);
+# compiled backends are cached by weights hash and verified against torch
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+ONEDNN_MAX_SHAPES = int(os.getenv("ONEDNN_MAX_SHAPES", "16"))
+ONNX_MODEL_PATH = os.getenv("ONNX_MODEL_PATH", "")
+ORT_INTRA_OP_THREADS = int(os.getenv("ORT_INTRA_OP_THREADS", "0"))
+ORT_INTER_OP_THREADS = int(os.getenv("ORT_INTER_OP_THREADS", "1"))
+# fp32, or int8 for the statically quantized onnxruntime graph (build it with scripts/quantize_model.py)
+INFERENCE_PRECISION = os.getenv("INFERENCE_PRECISION", "fp32")
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Warmup configuration: frame shapes as HEIGHTxWIDTH and batch sizes to run before reporting ready.
+# Frames are letterboxed to stride-aligned rectangles, so 16:9 cameras (any of 720p, 1080p, 4K) run a
+# 384x640 input that a square warmup frame never exercises; the default warms both.
+# The onednn backend compiles every batch size the scheduler can form, so it warms them all by default
+WARMUP_SHAPES = parse_shapes(os.getenv("WARMUP_SHAPES", "640x640,720x1280"))
+WARMUP_BATCH_SIZES = parse_batch_sizes(os.getenv(
+    "WARMUP_BATCH_SIZES",
+    ",".join(str(size) for size in range(1, BATCH_MAX_SIZE + 1)) if INFERENCE_BACKEND == "onednn"
+    else f"1,{BATCH_MAX_SIZE}"
+))
+WARMUP_ITERATIONS = int(os.getenv("WARMUP_ITERATIONS", "2"))
+
 # Global model instance
 detector = None
+executor = None
+scheduler = None
+ingestor = None
+reloader = None
+
+# Set once the loaded model has been warmed up
+ready = False
+warmup_report = None
+warmup_task = None
+
+# Hash and load time of the weights being served
+model_sha256 = None
+model_loaded_at = None
+
+# Active WebSocket streaming sessions by camera id
+sessions: Dict[str, CameraSession] = {}
+
+# Set by serve.py when running as a pre-fork worker
+worker_index = 0
+worker_stats = None
+
+# Prometheus metrics exposed on /metrics (per process in pre-fork mode)
+STAGE_METRIC = "fall_detection_stage_seconds"
+STAGE_DESCRIPTION = "Time spent in each stage of a detection request"
+registry = MetricsRegistry()
+requests_in_flight = registry.register(Gauge(
+    "fall_detection_requests_in_flight",
+    "Detection requests currently being handled"
+))
+model_load_seconds = registry.register(Gauge(
+    "fall_detection_model_load_seconds",
+    "Time taken to load the model weights"
+))
+registry.register(Gauge(
+    "fall_detection_queue_depth",
+    "Requests waiting in the batching queue",
+    callback=lambda: scheduler.queue_depth if scheduler is not None else 0
+))
+registry.register(Gauge(
+    "fall_detection_batches_in_flight",
+    "Batched forward passes currently running",
+    callback=lambda: executor.in_flight if executor is not None else 0
+))
+
+def weights_memory() -> Dict:
+    """Resident memory of the served weights in this process (empty without a model)"""
+    if detector is None:
+        return {}
+    return weights_memory_kb(detector.model, detector.artifact_path)
+
+for kind in ("rss", "pss", "shared_clean", "private_dirty"):
+    registry.register(Gauge(
+        "fall_detection_weights_memory_bytes",
+        "Resident memory of the model weights in this process; shared_clean is shared with other processes",
+        labels={"kind": kind},
+        callback=lambda kind=kind: weights_memory().get(f"{kind}_kb", 0) * 1024
+    ))
+
+def create_detector(weights_path: str) -> FallDetector:
+    """Build a detector for a weights file, using the fused artifact cache and the configured backend"""
+    return FallDetector(
+        weights_path,
+        cache_dir=MODEL_CACHE_DIR or None,
+        backend=INFERENCE_BACKEND,
+        onnx_path=ONNX_MODEL_PATH or None,
+        ort_intra_op_threads=ORT_INTRA_OP_THREADS,
+        ort_inter_op_threads=ORT_INTER_OP_THREADS,
+        precision=INFERENCE_PRECISION,
+        onednn_max_shapes=ONEDNN_MAX_SHAPES
+    )
 
 def load_model():
     """Load the fall detection model on startup"""
-    global detector
-    model_path = Path("/app/weights/yolov7-w6-pose.pt")
+    global detector, model_sha256, model_loaded_at
+    if detector is not None:
+        # Already loaded, e.g. inherited from the pre-fork parent
+        return detector
+
+    model_path = MODEL_PATH
 
     # Check if model exists, if not, use placeholder
     if not model_path.exists():
@@ -48,27 +183,208 @@ def load_model():
         return None
 
     try:
-        detector = FallDetector(str(model_path))
+        started = time.perf_counter()
+        detector = create_detector(str(model_path))
+        model_load_seconds.set(time.perf_counter() - started)
+        model_sha256 = weights_sha256(model_path, MODEL_CACHE_DIR or None)
+        model_loaded_at = time.time()
         logger.info(f"Loaded fall detection model from {model_path}")
         return detector
     except Exception as e:
         logger.error(f"Failed to load model: {e}")
         return None
 
+async def start_inference():
+    """Create the executor, batch scheduler and stream ingestion for the loaded detector"""
+    global executor, scheduler, ingestor
+    if detector is not None and scheduler is None:
+        executor = InferenceExecutor(
+            max_workers=INFERENCE_WORKERS,
+            retry_after=INFERENCE_RETRY_AFTER
+        )
+        scheduler = BatchScheduler(
+            detector,
+            executor,
+            max_batch_size=BATCH_MAX_SIZE,
+            max_wait_ms=BATCH_MAX_WAIT_MS,
+            max_queue_size=INFERENCE_QUEUE_SIZE
+        )
+        registry.register(scheduler.batch_size_histogram)
+        registry.register(scheduler.queue_wait_histogram)
+        await scheduler.start()
+
+        # Only one pre-fork worker ingests streams so each camera is read once
+        sources = load_stream_sources(STREAM_SOURCES, STREAMS_FILE)
+        if sources and worker_index == 0:
+            ingestor = StreamIngestor(
+                sources,
+                submit_image,
+                alert_url=STREAM_ALERT_URL,
+                max_fps=STREAM_MAX_FPS
+            )
+            await ingestor.start()
+
+def warm_up_detector(target: FallDetector) -> Dict:
+    """Run the configured warmup inferences on a detector (blocking)"""
+    return warm_up(target, WARMUP_SHAPES, WARMUP_BATCH_SIZES, WARMUP_ITERATIONS)
+
+async def run_startup_warmup():
+    """Warm up the loaded model in the background, then report ready if it produced results"""
+    global ready, warmup_report
+    try:
+        warmup_report = await asyncio.get_running_loop().run_in_executor(None, warm_up_detector, detector)
+    except Exception as e:
+        # /ready keeps answering 503 with the error until a reload warms up cleanly
+        logger.error(f"Warmup failed, not reporting ready: {e}")
+        warmup_report = {"error": str(e)}
+        return
+    ready = True
+
+async def swap_detector(new_detector: FallDetector) -> Optional[FallDetector]:
+    """
+    Make a freshly loaded detector the one serving requests
+
+    Batches already dispatched hold a reference to the previous detector and
+    finish on it; new batches pick up the new one.
+    """
+    global detector, ready, warmup_report
+    previous, detector = detector, new_detector
+    if scheduler is not None:
+        scheduler.detector = new_detector
+    else:
+        # Weights appeared after starting in placeholder mode
+        await start_inference()
+    # The reloader only hands over a detector whose warmup ran without errors,
+    # so this also clears a failed startup warmup
+    warmup_report = reloader.warmup_report
+    ready = True
+    return previous
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize model when the API starts"""
+    global reloader, warmup_task
     logger.info("Starting Fall Detection Model Service...")
     load_model()
+    await start_inference()
+    if detector is not None:
+        warmup_task = asyncio.create_task(run_startup_warmup())
+
+    reloader = ModelReloader(
+        MODEL_PATH,
+        create_detector,
+        swap_detector,
+        warmup=warm_up_detector,
+        watch_interval=MODEL_WATCH_INTERVAL,
+        sha256=model_sha256,
+        loaded_at=model_loaded_at
+    )
+    reloader.start()
     logger.info("Fall Detection Model Service ready")
 
-def process_uploaded_image(file_content: bytes) -> np.ndarray:
-    """Convert uploaded file to OpenCV image"""
-    nparr = np.frombuffer(file_content, np.uint8)
-    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    if image is None:
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop stream ingestion and the batch scheduler when the API shuts down"""
+    if reloader is not None:
+        await reloader.stop()
+    if ingestor is not None:
+        await ingestor.stop()
+    if scheduler is not None:
+        await scheduler.stop()
+    if executor is not None:
+        executor.shutdown()
+
+@app.exception_handler(QueueFullError)
+async def queue_full_handler(request: Request, exc: QueueFullError):
+    """Reject requests quickly when the inference queue is full"""
+    return JSONResponse(
+        status_code=503,
+        content={"success": False, "detail": "Inference queue is full, retry later"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.middleware("http")
+async def track_in_flight(request: Request, call_next):
+    """Count detection requests currently being handled"""
+    if not request.url.path.startswith("/detect"):
+        return await call_next(request)
+    requests_in_flight.inc()
+    try:
+        return await call_next(request)
+    finally:
+        requests_in_flight.dec()
+
+async def submit_image(image: np.ndarray) -> Dict:
+    """Run detection through the batch scheduler and record its stage timings"""
+    result = await scheduler.submit(image)
+    registry.observe_stages(STAGE_METRIC, STAGE_DESCRIPTION, result.get("timings", {}))
+    return result
+
+def success_result(result: Dict) -> DetectionResult:
+    """Prefix a detector result with the success fields, keeping its arrays for the compact formats"""
+    return DetectionResult({"success": True, "model": "fall-detection", **result}, getattr(result, "arrays", None))
+
+def timed_response(result: Dict, timings: Dict[str, float], request: Request, summary_only: bool) -> Response:
+    """
+    Serialize a result and attach the request's stage breakdown as a Server-Timing header
+
+    Args:
+        result: Detector result, including its own "timings"
+        timings: Request stages measured outside the detector (read, decode)
+        request: Incoming request, for the Accept header
+        summary_only: Return only the verdict, without per-person keypoints
+    """
+    request_timings = dict(timings)
+    with stage_timer(request_timings, "serialize"):
+        response = render_result(result, request.headers.get("accept"), summary_only)
+    registry.observe_stages(STAGE_METRIC, STAGE_DESCRIPTION, request_timings)
+
+    request_timings.update(result.get("timings", {}))
+    response.headers["Server-Timing"] = server_timing_header(request_timings)
+    return response
+
+def process_uploaded_image(file_content: bytes) -> DecodedImage:
+    """
+    Convert uploaded file to OpenCV image
+
+    Large JPEGs are decoded at a reduced scale that still covers the model
+    input; pass results through scale_detections with the returned scale.
+    """
+    try:
+        return decode_image(file_content, detector.img_size if detector is not None else 0)
+    except ValueError:
         raise HTTPException(status_code=400, detail="Invalid image format")
-    return image
+
+def parse_raw_frame(body: bytes, shape_header: Optional[str], dtype_header: Optional[str]) -> np.ndarray:
+    """
+    Wrap a raw HWC frame buffer as an OpenCV image without copying
+
+    Args:
+        body: Raw pixel bytes in BGR channel order
+        shape_header: Frame shape as "height,width,channels" (e.g. "1080,1920,3")
+        dtype_header: Pixel data type, only "uint8" is supported
+
+    Returns:
+        Read-only numpy view over the request body
+    """
+    if (dtype_header or "uint8").lower() != "uint8":
+        raise HTTPException(status_code=400, detail="Only uint8 frames are supported")
+    if not shape_header:
+        raise HTTPException(status_code=400, detail="Missing X-Frame-Shape header")
+
+    try:
+        shape = tuple(int(dim) for dim in shape_header.replace("x", ",").split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid X-Frame-Shape: {shape_header}")
+    if len(shape) != 3 or shape[2] != 3 or min(shape) <= 0:
+        raise HTTPException(status_code=400, detail="X-Frame-Shape must be height,width,3")
+    if len(body) != shape[0] * shape[1] * shape[2]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Body has {len(body)} bytes, expected {shape[0] * shape[1] * shape[2]} for shape {shape}"
+        )
+
+    return np.frombuffer(body, dtype=np.uint8).reshape(shape)
 
 @app.get("/")
 async def root():
@@ -86,8 +402,22 @@ async def health_check():
         "status": "healthy",
         "service": "fall-detection-model",
         "version": "1.0.0",
-        "model_loaded": detector is not None
+        "model_loaded": detector is not None,
+        "queue_depth": scheduler.queue_depth if scheduler is not None else 0,
+        "queue_capacity": INFERENCE_QUEUE_SIZE,
+        "batches_in_flight": executor.in_flight if executor is not None else 0,
+        "streaming_sessions": len(sessions)
+    }
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once the model is loaded and warmed up, 503 before that"""
+    body = {
+        "ready": ready,
+        "model_loaded": detector is not None,
+        "warmup": warmup_report
     }
+    return JSONResponse(status_code=200 if ready else 503, content=body)
 
 @app.get("/info")
 async def model_info():
@@ -106,16 +436,77 @@ async def model_info():
             "pose_estimation",
             "keypoint_analysis"
         ],
-        "supported_formats": ["jpg", "jpeg", "png"]
+        "supported_formats": ["jpg", "jpeg", "png", "raw_bgr_uint8"],
+        "input_size": detector.img_size if detector is not None else 640,
+        "model_hash": reloader.sha256 if reloader is not None else model_sha256,
+        "model_loaded_at": reloader.loaded_at if reloader is not None else model_loaded_at,
+        "model_artifact": str(detector.artifact_path) if detector is not None and detector.artifact_path else None,
+        "backend": detector.backend_name if detector is not None else None,
+        "precision": detector.precision if detector is not None else None,
+        "compiled_model": str(detector.compiled_path) if detector is not None and detector.compiled_path else None,
+        "compiled_shapes": getattr(detector.backend, "compiled_shapes", None) if detector is not None else None,
+        "weights_memory": weights_memory()
+    }
+
+@app.post("/admin/reload")
+async def reload_model(request: Request, force: bool = False):
+    """
+    Load the current weights file, warm it up and swap it in without downtime
+
+    Requires the X-Admin-Token header when ADMIN_TOKEN is set. In pre-fork
+    mode this only reloads the worker that receives the request; use
+    MODEL_WATCH_INTERVAL to have every worker pick up new weights.
+
+    Args:
+        force: Reload even if the weights hash has not changed
+    """
+    if ADMIN_TOKEN and request.headers.get("X-Admin-Token") != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    if not MODEL_PATH.exists():
+        raise HTTPException(status_code=404, detail=f"Model weights not found at {MODEL_PATH}")
+
+    try:
+        return {"success": True, **(await reloader.reload(force=force))}
+    except ReloadInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, previous model still active: {e}")
+
+@app.get("/stats/batching")
+async def batching_stats():
+    """Get batch size and queue wait histograms for the batch scheduler"""
+    if scheduler is None:
+        return {"enabled": False}
+    return {"enabled": True, **scheduler.stats()}
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Stage latency histograms, queue depth, in-flight requests and model load time in Prometheus format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/workers")
+async def workers_info():
+    """Get per-worker throughput and memory usage in pre-fork mode"""
+    if worker_stats is None:
+        return {"prefork": False, "workers": []}
+    return {
+        "prefork": True,
+        "worker_index": worker_index,
+        "workers": worker_stats.snapshot(detector.artifact_path if detector is not None else None)
     }
 
 @app.post("/detect")
-async def detect_fall(file: UploadFile = File(...)):
+async def detect_fall(request: Request, file: UploadFile = File(...), summary_only: bool = False):
     """
     Detect falls in an uploaded image
 
+    The response is verbose JSON unless the Accept header asks for a compact
+    format (application/vnd.ruth.compact+json, application/x-msgpack or
+    application/octet-stream) with flat float32 box and keypoint arrays.
+
     Args:
         file: Uploaded image file
+        summary_only: Return only the verdict, without per-person keypoints
 
     Returns:
         Detection results including violation status and confidence
@@ -159,24 +550,181 @@ async def detect_fall(file: UploadFile = File(...)):
             "model_version": "1.0.0"
         }
 
+    # Reject before reading the upload if the queue is already full
+    if not scheduler.has_capacity():
+        raise QueueFullError(executor.retry_after)
+
     try:
+        timings = {}
+
         # Process uploaded image
-        file_content = await file.read()
-        image = process_uploaded_image(file_content)
+        with stage_timer(timings, "read"):
+            file_content = await file.read()
+        with stage_timer(timings, "decode"):
+            # Off the event loop; cv2.imdecode releases the GIL
+            decoded = await asyncio.get_running_loop().run_in_executor(None, process_uploaded_image, file_content)
 
-        # Run detection
-        result = detector.detect(image)
+        # Run detection through the batch scheduler, reporting coordinates in original pixels
+        result = scale_detections(await submit_image(decoded.image), decoded.scale)
+        if worker_stats is not None:
+            worker_stats.record(worker_index)
 
-        return {
-            "success": True,
-            "model": "fall-detection",
-            **result
-        }
+        return timed_response(
+            success_result(result),
+            timings,
+            request,
+            summary_only
+        )
+
+    except (QueueFullError, HTTPException):
+        raise
+    except Exception as e:
+        logger.error(f"Fall detection failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/detect/raw")
+async def detect_fall_raw(request: Request, summary_only: bool = False):
+    """
+    Detect falls in a raw, already decoded BGR frame
+
+    The request body is the frame's uint8 HWC pixel buffer, described by the
+    X-Frame-Shape ("height,width,3") and optional X-Frame-Dtype ("uint8")
+    headers. This skips JPEG encode/decode entirely. Frames already sized to
+    the model input (see input_size on /info) also skip the resize.
+    Response formats and summary_only work as on /detect.
+
+    Returns:
+        Detection results including violation status and confidence
+    """
+    if detector is None:
+        raise HTTPException(status_code=503, detail="Fall detection model not loaded")
+
+    # Reject before reading the body if the queue is already full
+    if not scheduler.has_capacity():
+        raise QueueFullError(executor.retry_after)
+
+    timings = {}
+    with stage_timer(timings, "read"):
+        body = await request.body()
+    with stage_timer(timings, "decode"):
+        image = await asyncio.get_running_loop().run_in_executor(
+            None,
+            parse_raw_frame,
+            body,
+            request.headers.get("X-Frame-Shape"),
+            request.headers.get("X-Frame-Dtype")
+        )
+
+    try:
+        result = await submit_image(image)
+        if worker_stats is not None:
+            worker_stats.record(worker_index)
+
+        return timed_response(
+            success_result(result),
+            timings,
+            request,
+            summary_only
+        )
+
+    except QueueFullError:
+        raise
     except Exception as e:
         logger.error(f"Fall detection failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/streams")
+async def list_streams():
+    """Get per-stream FPS, drop and latency counters and the latest verdict"""
+    if ingestor is None:
+        return {"enabled": False, "streams": []}
+    return {"enabled": True, "streams": ingestor.stats()}
+
+@app.get("/sessions")
+async def list_sessions():
+    """Get frame counters and the latest verdict for every streaming camera"""
+    return {"sessions": [session.stats() for session in sessions.values()]}
+
+def decode_stream_frame(frame: bytes, frame_shape: Optional[str]) -> DecodedImage:
+    """Decode a streamed frame, either an encoded image or a raw BGR buffer"""
+    if frame_shape is not None:
+        return DecodedImage(None, parse_raw_frame(frame, frame_shape, "uint8"))
+    return process_uploaded_image(frame)
+
+async def receive_frames(websocket: WebSocket, session: CameraSession):
+    """Read messages from the client into the session until it disconnects"""
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                session.offer(message["bytes"])
+            elif message.get("text") is not None:
+                # Control message, e.g. {"shape": "1080,1920,3"} for raw frames or {"shape": null}
+                try:
+                    session.frame_shape = json.loads(message["text"]).get("shape")
+                except (ValueError, AttributeError):
+                    await websocket.send_json({"success": False, "error": "Invalid control message"})
+    finally:
+        session.close()
+
+@app.websocket("/ws/stream/{camera_id}")
+async def stream_camera(websocket: WebSocket, camera_id: str):
+    """
+    Stream frames from one camera over a persistent connection
+
+    The client sends each frame as a binary message (an encoded image, or a
+    raw BGR buffer after sending {"shape": "height,width,3"} as text) and
+    receives one JSON result per processed frame. If frames arrive faster
+    than the model runs, only the latest is processed and the rest are
+    counted as dropped.
+    """
+    await websocket.accept()
+    if detector is None:
+        await websocket.close(code=1013, reason="Fall detection model not loaded")
+        return
+
+    session = CameraSession(camera_id)
+    sessions[camera_id] = session
+    receiver = asyncio.create_task(receive_frames(websocket, session))
+    loop = asyncio.get_running_loop()
+    logger.info(f"Streaming session opened for camera {camera_id}")
+
+    try:
+        while True:
+            sequence, frame = await session.next_frame()
+            try:
+                decoded = await loop.run_in_executor(None, decode_stream_frame, frame, session.frame_shape)
+                result = scale_detections(await submit_image(decoded.image), decoded.scale)
+                session.record(sequence, result)
+                if worker_stats is not None:
+                    worker_stats.record(worker_index)
+                response = {"success": True, "model": "fall-detection", **result}
+            except QueueFullError:
+                session.frames_dropped += 1
+                response = {"success": False, "error": "Inference queue is full, frame dropped"}
+            except HTTPException as e:
+                response = {"success": False, "error": e.detail}
+            except Exception as e:
+                logger.error(f"Streaming detection failed for camera {camera_id}: {e}")
+                response = {"success": False, "error": str(e)}
+
+            await websocket.send_json({
+                "camera_id": camera_id,
+                "frame": sequence,
+                "frames_dropped": session.frames_dropped,
+                **response
+            })
+
+    except (SessionClosed, WebSocketDisconnect):
+        pass
+    finally:
+        receiver.cancel()
+        if sessions.get(camera_id) is session:
+            del sessions[camera_id]
+        logger.info(f"Streaming session closed for camera {camera_id} ({session.frames_processed} frames processed)")
+
 if __name__ == "__main__":
     uvicorn.run(
         "app:app",
@@ -0,0 +1,532 @@
+"""
+Inference backends for the fall detector
+Run the YOLOv7 pose forward pass and keypoint NMS in eager PyTorch, as a frozen TorchScript
+backbone, as channels-last oneDNN-fused modules or as an exported ONNX Runtime graph
+"""
+
+import copy
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import torch
+
+from ruth_serving.metrics import stage_timer
+from models.experimental import End2End
+from utils.general import non_max_suppression_kpt
+from utils.torch_utils import TracedModel
+
+try:
+    import onnxruntime  # optional, enables the onnxruntime backend
+except ImportError:
+    onnxruntime = None
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "torchscript", "onednn", "onnxruntime")
+
+# NMS settings shared by every backend; exported graphs have them baked in
+NMS_CONF_THRES = 0.25  # Lower threshold to detect more people
+NMS_IOU_THRES = 0.65
+NMS_MAX_DET = 300
+NUM_KEYPOINTS = 17
+
+# Bump when the exported graph changes so stale exports are rebuilt
+ONNX_EXPORT_VERSION = 1
+ONNX_OPSET = 12
+TORCHSCRIPT_VERSION = 1
+
+# Input shapes the onednn backend compiles before running further shapes eagerly
+ONEDNN_MAX_SHAPES = 16
+# The profiling executor specializes and fuses the graph over its first runs
+ONEDNN_PROFILING_RUNS = 2
+
+# Name of the pickled detect layer stored alongside a frozen TorchScript backbone
+DETECT_LAYER_FILE = "detect_layer.pt"
+
+# Parity tolerances between the exported graph and the eager model
+PARITY_PROBE_CONF_THRES = 0.001  # near-zero threshold so noise frames still yield hundreds of boxes
+PARITY_BOX_ATOL = 0.5  # pixels
+PARITY_KEYPOINT_ATOL = 0.5  # pixels
+PARITY_SCORE_ATOL = 1e-3
+PARITY_COUNT_RTOL = 0.02  # boxes sitting exactly on a threshold may flip
+
+
+class ParityError(Exception):
+    """Raised when an exported graph does not reproduce the eager model's detections"""
+
+
+class TorchBackend:
+    """
+    PyTorch forward pass followed by NMS in Python
+
+    The model is either the eager module or a TracedModel wrapping a frozen
+    TorchScript backbone and the eager keypoint decode layer.
+    """
+
+    name = "torch"
+
+    def __init__(self, model: torch.nn.Module, conf_thres: float = NMS_CONF_THRES, iou_thres: float = NMS_IOU_THRES):
+        self.model = model
+        self.conf_thres = conf_thres
+        self.iou_thres = iou_thres
+
+    def infer(self, batch: torch.Tensor, timings: Dict[str, float]) -> List[torch.Tensor]:
+        """
+        Run the model on a preprocessed batch
+
+        Args:
+            batch: Float tensor (B x 3 x H x W) scaled to 0-1
+            timings: Dict that receives "forward" and "nms" durations in milliseconds
+
+        Returns:
+            One tensor per image with rows [x1, y1, x2, y2, conf, cls, 17 x (x, y, conf)]
+        """
+        with stage_timer(timings, "forward"), torch.no_grad():
+            predictions = self.model(batch)[0]
+
+        with stage_timer(timings, "nms"):
+            return non_max_suppression_kpt(
+                predictions,
+                conf_thres=self.conf_thres,
+                iou_thres=self.iou_thres,
+                nc=1,  # Number of classes (person only)
+                nkpt=NUM_KEYPOINTS,
+                kpt_label=True
+            )
+
+
+class OneDNNBackend:
+    """
+    Channels-last backbone traced and frozen per input shape, with oneDNN graph fusion
+
+    The model's weights are converted to channels_last (NHWC) in place, so
+    convolutions run oneDNN's blocked kernels without reordering every
+    activation, and the TorchScript fuser hands conv/add/activation chains to
+    oneDNN Graph. Fused graphs are specialized to one input shape, so a
+    frozen module is compiled on the first batch of each (batch, height,
+    width) shape and cached; warming up the served shapes and batch sizes
+    means steady-state requests never compile. Shapes beyond max_shapes, and
+    requests arriving while their shape is being compiled, run the
+    channels-last eager model instead.
+
+    The converted weights are private copies: the memory-mapped artifact is
+    no longer shared with other processes in this mode.
+    """
+
+    name = "onednn"
+
+    def __init__(self, model: torch.nn.Module, conf_thres: float = NMS_CONF_THRES, iou_thres: float = NMS_IOU_THRES,
+                 max_shapes: int = ONEDNN_MAX_SHAPES):
+        """
+        Initialize the backend
+
+        Args:
+            model: Eager (fused) model, converted to channels_last in place
+            conf_thres: NMS score threshold
+            iou_thres: NMS IoU threshold
+            max_shapes: Input shapes to compile before falling back to eager for new ones
+        """
+        torch.jit.enable_onednn_fusion(True)
+        self.model = model.eval().to(memory_format=torch.channels_last)
+        self.detect_layer = self.model.model[-1]
+        self.conf_thres = conf_thres
+        self.iou_thres = iou_thres
+        self.max_shapes = max_shapes
+        self._modules = {}
+        self._compiling = set()
+        # Guards the cache bookkeeping only; compiles and forwards run outside it
+        self._lock = threading.Lock()
+
+    @property
+    def compiled_shapes(self) -> List[str]:
+        """Compiled input shapes, as BATCHxHEIGHTxWIDTH"""
+        with self._lock:
+            modules = list(self._modules.items())
+        return [_shape_name(shape) for shape, module in modules if module is not None]
+
+    def _compile(self, batch: torch.Tensor) -> Optional[TracedModel]:
+        """
+        Trace and freeze the backbone for the batch's shape and verify it against the eager model
+
+        Returns:
+            The compiled model, or None if it disagrees with the eager model
+        """
+        started = time.perf_counter()
+        # A shallow copy shares the weights but not the traced flag, so eager
+        # runs of self.model in other threads keep their detect layer
+        backbone = copy.copy(self.model)
+        backbone.traced = True  # stop Model.forward before the detect layer
+        with torch.no_grad():
+            traced = torch.jit.trace(backbone, batch, strict=False)
+
+        with torch.no_grad():
+            frozen = torch.jit.freeze(traced.eval())
+            for _ in range(ONEDNN_PROFILING_RUNS):
+                frozen(batch)
+        compiled = TracedModel.from_traced(frozen, self.detect_layer)
+
+        expected = TorchBackend(self.model, conf_thres=PARITY_PROBE_CONF_THRES).infer(batch, {})
+        report = compare_outputs(expected, TorchBackend(compiled, conf_thres=PARITY_PROBE_CONF_THRES).infer(batch, {}))
+        shape = _shape_name(batch.shape)
+        if not report["ok"]:
+            logger.error(f"oneDNN module for {shape} does not match the eager model, running it eagerly: {report}")
+            return None
+        logger.info(f"Compiled oneDNN module for {shape} in {time.perf_counter() - started:.1f}s")
+        return compiled
+
+    def infer(self, batch: torch.Tensor, timings: Dict[str, float]) -> List[torch.Tensor]:
+        """
+        Run the compiled module for the batch's shape, compiling it on first use
+
+        Args:
+            batch: Float tensor (B x 3 x H x W) scaled to 0-1
+            timings: Dict that receives "forward" and "nms" durations in milliseconds
+                (the forward time includes compiling a new shape)
+
+        Returns:
+            One tensor per image with rows [x1, y1, x2, y2, conf, cls, 17 x (x, y, conf)]
+        """
+        batch = batch.contiguous(memory_format=torch.channels_last)
+        shape = tuple(batch.shape)
+        with stage_timer(timings, "forward"), torch.no_grad():
+            module = self._modules.get(shape)
+            if module is None:
+                with self._lock:
+                    claimed = (shape not in self._modules and shape not in self._compiling
+                               and len(self._modules) + len(self._compiling) < self.max_shapes)
+                    if claimed:
+                        self._compiling.add(shape)
+                if claimed:
+                    try:
+                        module = self._compile(batch)
+                        with self._lock:
+                            self._modules[shape] = module
+                    finally:
+                        with self._lock:
+                            self._compiling.discard(shape)
+            predictions = (module if module is not None else self.model)(batch)[0]
+
+        with stage_timer(timings, "nms"):
+            return non_max_suppression_kpt(
+                predictions,
+                conf_thres=self.conf_thres,
+                iou_thres=self.iou_thres,
+                nc=1,  # Number of classes (person only)
+                nkpt=NUM_KEYPOINTS,
+                kpt_label=True
+            )
+
+
+def _shape_name(shape: Sequence[int]) -> str:
+    """BATCHxHEIGHTxWIDTH name of a B x C x H x W input shape"""
+    return f"{shape[0]}x{shape[2]}x{shape[3]}"
+
+
+class OnnxRuntimeBackend:
+    """
+    Exported graph with NMS embedded, run by onnxruntime's CPU execution provider
+
+    The session is created on first use rather than in __init__, so a
+    detector loaded before the pre-fork workers are forked gets one session
+    (and thread pool) per worker instead of a pool that did not survive fork.
+    """
+
+    name = "onnxruntime"
+
+    def __init__(self, onnx_path: Path, intra_op_threads: int = 0, inter_op_threads: int = 1):
+        """
+        Initialize the backend
+
+        Args:
+            onnx_path: Graph exported by export_onnx
+            intra_op_threads: Threads per operator (0 = torch's thread count in the serving process)
+            inter_op_threads: Operators run in parallel
+        """
+        if onnxruntime is None:
+            raise RuntimeError("onnxruntime is not installed")
+        self.onnx_path = Path(onnx_path)
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self._session = None
+        self._session_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None or self._session_pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._session_pid != os.getpid():
+                    self._session = self._create_session()
+                    self._session_pid = os.getpid()
+        return self._session
+
+    def _create_session(self):
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = self.intra_op_threads or torch.get_num_threads()
+        options.inter_op_num_threads = self.inter_op_threads
+
+        started = time.perf_counter()
+        session = onnxruntime.InferenceSession(
+            str(self.onnx_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        logger.info(
+            f"Created onnxruntime session for {self.onnx_path} in {time.perf_counter() - started:.2f}s "
+            f"({options.intra_op_num_threads} intra-op, {options.inter_op_num_threads} inter-op threads)"
+        )
+        return session
+
+    def infer(self, batch: torch.Tensor, timings: Dict[str, float]) -> List[torch.Tensor]:
+        """
+        Run the graph on a preprocessed batch
+
+        NMS runs inside the graph, so the "nms" stage only splits its rows per image.
+
+        Args:
+            batch: Float tensor (B x 3 x H x W) scaled to 0-1
+            timings: Dict that receives "forward" and "nms" durations in milliseconds
+
+        Returns:
+            One tensor per image with rows [x1, y1, x2, y2, conf, cls, 17 x (x, y, conf)]
+        """
+        session = self.session
+        with stage_timer(timings, "forward"):
+            rows = session.run(None, {session.get_inputs()[0].name: batch.numpy()})[0]
+
+        with stage_timer(timings, "nms"):
+            image_index = rows[:, 0].astype(np.int64)
+            return [torch.from_numpy(rows[image_index == i, 1:]) for i in range(batch.shape[0])]
+
+
+def onnx_artifact_path(weights_path: Path, cache_dir: Path, sha256: str, img_size: int,
+                       precision: str = "fp32") -> Path:
+    """Location of the ONNX graph exported (and for int8, quantized) from weights with the given hash"""
+    suffix = "" if precision == "fp32" else f".{precision}"
+    return Path(cache_dir) / (
+        f"{Path(weights_path).stem}.{sha256[:16]}.{img_size}.ort-nms-v{ONNX_EXPORT_VERSION}{suffix}.onnx"
+    )
+
+
+def export_onnx(model: torch.nn.Module, output_path: Path, img_size: int,
+                conf_thres: float = NMS_CONF_THRES, iou_thres: float = NMS_IOU_THRES):
+    """
+    Export the pose model with keypoint NMS embedded as ONNX NonMaxSuppression
+
+    The batch dimension is dynamic; the spatial size is fixed to img_size.
+    """
+    wrapper = End2End(
+        model, max_obj=NMS_MAX_DET, iou_thres=iou_thres, score_thres=conf_thres, max_wh=4096, kpt_label=True
+    ).eval()
+    dummy = torch.zeros(1, 3, img_size, img_size)
+    with torch.no_grad():
+        torch.onnx.export(
+            wrapper,
+            dummy,
+            str(output_path),
+            opset_version=ONNX_OPSET,
+            input_names=["images"],
+            output_names=["detections"],
+            dynamic_axes={"images": {0: "batch"}, "detections": {0: "rows"}},
+            do_constant_folding=True
+        )
+
+
+def torchscript_artifact_path(weights_path: Path, cache_dir: Path, sha256: str, img_size: int) -> Path:
+    """Location of the frozen TorchScript module traced from weights with the given hash at an input size"""
+    return Path(cache_dir) / (
+        f"{Path(weights_path).stem}.{sha256[:16]}.{img_size}x{img_size}.frozen-v{TORCHSCRIPT_VERSION}.torchscript.pt"
+    )
+
+
+def compile_torchscript(model: torch.nn.Module, output_path: Path, img_size: int,
+                        batch: Optional[torch.Tensor] = None) -> Dict:
+    """
+    Trace, freeze and optimize the backbone, verify it and save it atomically
+
+    The backbone (every layer before IKeypoint) is traced through TracedModel,
+    then frozen, which inlines weights and attributes as constants, and run
+    through optimize_for_inference, which folds and fuses ops. Model.forward_once's
+    per-layer Python loop and module dispatch disappear from the serving path.
+    The IKeypoint decode stays an eager module, as in TracedModel, and is
+    stored in the same file as an extra entry.
+
+    Args:
+        model: Eager (fused) model
+        output_path: Where the verified module is written
+        img_size: Square input size the module is traced at
+        batch: Preprocessed frames to compare on (default: deterministic noise frames)
+
+    Returns:
+        Parity report against the eager model
+
+    Raises:
+        ParityError: If the frozen module disagrees with the eager model
+    """
+    # Compare at the probe threshold and a batch size other than the traced one
+    batch = batch if batch is not None else parity_frames(img_size)
+    expected = TorchBackend(model, conf_thres=PARITY_PROBE_CONF_THRES).infer(batch, {})
+
+    started = time.perf_counter()
+    traced = TracedModel(model, device="cpu", img_size=img_size)
+    with torch.no_grad():
+        frozen = torch.jit.optimize_for_inference(torch.jit.freeze(traced.model.eval()))
+    compiled = TracedModel.from_traced(frozen, traced.detect_layer)
+
+    report = compare_outputs(expected, TorchBackend(compiled, conf_thres=PARITY_PROBE_CONF_THRES).infer(batch, {}))
+    logger.info(f"TorchScript parity: {report}")
+    if not report["ok"]:
+        raise ParityError(f"Frozen TorchScript module does not match the eager model: {report}")
+
+    detect_layer = io.BytesIO()
+    torch.save(traced.detect_layer, detect_layer)
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.")
+    os.close(fd)
+    try:
+        torch.jit.save(frozen, tmp, _extra_files={DETECT_LAYER_FILE: detect_layer.getvalue()})
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, output_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    logger.info(f"Compiled frozen TorchScript module {output_path} in {time.perf_counter() - started:.1f}s")
+    return report
+
+
+def load_torchscript(path: Path) -> TracedModel:
+    """Load a frozen TorchScript backbone and its detect layer saved by compile_torchscript"""
+    extra_files = {DETECT_LAYER_FILE: ""}
+    module = torch.jit.load(str(path), map_location="cpu", _extra_files=extra_files)
+    detect_layer = torch.load(io.BytesIO(extra_files[DETECT_LAYER_FILE]), map_location="cpu", weights_only=False)
+    return TracedModel.from_traced(module, detect_layer.eval())
+
+
+def parity_frames(img_size: int, count: int = 2) -> torch.Tensor:
+    """Deterministic noise frames for parity checks when no real images are given"""
+    generator = np.random.default_rng(0)
+    frames = generator.integers(0, 256, size=(count, 3, img_size, img_size), dtype=np.uint8)
+    return torch.from_numpy(frames).float() / 255.0
+
+
+def compare_outputs(expected: Sequence[torch.Tensor], actual: Sequence[torch.Tensor]) -> Dict:
+    """
+    Compare per-image NMS outputs of two backends
+
+    Rows are matched by nearest box, since boxes with near-equal scores may
+    come out of the two NMS implementations in a different order.
+
+    Returns:
+        Dictionary with detection counts, worst absolute differences and "ok"
+    """
+    report = {"images": len(expected), "expected_detections": 0, "actual_detections": 0,
+              "max_box_diff": 0.0, "max_score_diff": 0.0, "max_keypoint_diff": 0.0,
+              "max_keypoint_conf_diff": 0.0, "count_mismatches": 0}
+    counts_ok = True
+    for reference, candidate in zip(expected, actual):
+        reference, candidate = reference.float().numpy(), candidate.float().numpy()
+        report["expected_detections"] += len(reference)
+        report["actual_detections"] += len(candidate)
+        if len(reference) != len(candidate):
+            report["count_mismatches"] += 1
+            if abs(len(reference) - len(candidate)) > max(1, PARITY_COUNT_RTOL * len(reference)):
+                counts_ok = False
+        if not len(reference) or not len(candidate):
+            continue
+
+        distance = np.abs(candidate[:, None, :4] - reference[None, :, :4]).max(-1)
+        matched = reference[distance.argmin(1)]
+        report["max_box_diff"] = max(report["max_box_diff"], float(distance.min(1).max()))
+        report["max_score_diff"] = max(report["max_score_diff"], float(np.abs(candidate[:, 4] - matched[:, 4]).max()))
+        kpt_diff = np.abs(candidate[:, 6:] - matched[:, 6:]).reshape(len(candidate), NUM_KEYPOINTS, 3)
+        report["max_keypoint_diff"] = max(report["max_keypoint_diff"], float(kpt_diff[:, :, :2].max()))
+        report["max_keypoint_conf_diff"] = max(report["max_keypoint_conf_diff"], float(kpt_diff[:, :, 2].max()))
+
+    report["ok"] = bool(
+        counts_ok
+        and report["max_box_diff"] <= PARITY_BOX_ATOL
+        and report["max_score_diff"] <= PARITY_SCORE_ATOL
+        and report["max_keypoint_diff"] <= PARITY_KEYPOINT_ATOL
+        and report["max_keypoint_conf_diff"] <= PARITY_SCORE_ATOL
+    )
+    return report
+
+
+def check_parity(model: torch.nn.Module, onnx_path: Path, batch: torch.Tensor,
+                 conf_thres: float = NMS_CONF_THRES) -> Dict:
+    """
+    Run an exported graph and the eager model on the same batch and compare detections
+
+    Args:
+        model: Eager model the graph was exported from
+        onnx_path: Exported graph
+        batch: Preprocessed frames (B x 3 x H x W)
+        conf_thres: Score threshold the graph was exported with
+
+    Returns:
+        Comparison report from compare_outputs
+    """
+    expected = TorchBackend(model, conf_thres=conf_thres).infer(batch, {})
+    actual = OnnxRuntimeBackend(onnx_path).infer(batch, {})
+    return compare_outputs(expected, actual)
+
+
+def build_onnx(model: torch.nn.Module, output_path: Path, img_size: int,
+               batch: Optional[torch.Tensor] = None) -> Dict:
+    """
+    Export the serving graph, verify it against the eager model and install it atomically
+
+    Besides the serving graph, a probe graph with a near-zero score threshold
+    is exported and compared, so the boxes, scores and keypoints of hundreds
+    of candidates are checked even on frames without people.
+
+    Args:
+        model: Eager (fused) model
+        output_path: Where the verified graph is written
+        img_size: Square model input size
+        batch: Preprocessed frames to compare on (default: deterministic noise frames)
+
+    Returns:
+        Parity reports for the "serving" and "probe" graphs
+
+    Raises:
+        ParityError: If either graph disagrees with the eager model
+    """
+    if onnxruntime is None:
+        raise RuntimeError("onnxruntime is not installed")
+    batch = batch if batch is not None else parity_frames(img_size)
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(dir=output_path.parent, prefix=".onnx-export-") as workdir:
+        serving_path = Path(workdir) / "serving.onnx"
+        probe_path = Path(workdir) / "probe.onnx"
+        export_onnx(model, serving_path, img_size)
+        export_onnx(model, probe_path, img_size, conf_thres=PARITY_PROBE_CONF_THRES)
+
+        reports = {
+            "serving": check_parity(model, serving_path, batch),
+            "probe": check_parity(model, probe_path, batch, conf_thres=PARITY_PROBE_CONF_THRES)
+        }
+        for graph, report in reports.items():
+            logger.info(f"ONNX parity ({graph} graph): {report}")
+            if not report["ok"]:
+                raise ParityError(f"Exported {graph} graph does not match the eager model: {report}")
+
+        # Other services may map the graph as a different user
+        os.chmod(serving_path, 0o644)
+        os.replace(serving_path, output_path)
+
+    logger.info(f"Exported ONNX graph {output_path} in {time.perf_counter() - started:.1f}s")
+    return reports
@@ -0,0 +1,201 @@
+"""
+Dynamic micro-batching for fall detection inference
+Collects concurrent requests and runs them through the model as one batch
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ruth_serving.executor import InferenceExecutor, QueueFullError
+from ruth_serving.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Batch size buckets are powers of two up to a generous maximum
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64]
+# Queue wait buckets in milliseconds
+QUEUE_WAIT_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 250, 500, 1000]
+
+
+class BatchScheduler:
+    """
+    Groups concurrent detection requests into batches for FallDetector.detect_batch
+
+    A batch is dispatched as soon as it reaches max_batch_size or the oldest
+    request in it has waited max_wait_ms, whichever comes first.
+    """
+
+    def __init__(self, detector, executor: InferenceExecutor, max_batch_size: int = 8,
+                 max_wait_ms: float = 10.0, max_queue_size: int = 64):
+        """
+        Initialize the scheduler
+
+        Args:
+            detector: Detector exposing detect_batch(images) -> List[Dict]
+            executor: Inference executor the batched forward passes run on
+            max_batch_size: Maximum number of images per forward pass
+            max_wait_ms: Maximum time the first request of a batch waits for more requests
+            max_queue_size: Maximum number of requests waiting to be batched
+        """
+        self.detector = detector
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_queue_size = max(1, max_queue_size)
+
+        self.batch_size_histogram = Histogram(
+            "fall_detection_batch_size",
+            "Number of images per batched forward pass",
+            BATCH_SIZE_BUCKETS
+        )
+        self.queue_wait_histogram = Histogram(
+            "fall_detection_queue_wait_ms",
+            "Time a request waited in the batching queue before its batch started",
+            QUEUE_WAIT_BUCKETS
+        )
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._dispatches = set()
+
+    async def start(self):
+        """Start the background batching loop"""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue()
+        # One batch in flight per inference thread; the rest keep accumulating
+        self._slots = asyncio.Semaphore(self.executor.max_workers)
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Batch scheduler started (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:.1f})"
+        )
+
+    async def stop(self):
+        """Stop the batching loop and fail any requests still queued"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batch scheduler stopped"))
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting to be batched"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def has_capacity(self) -> bool:
+        """Whether another request would be admitted right now"""
+        return self.queue_depth < self.max_queue_size
+
+    async def submit(self, image: np.ndarray) -> Dict:
+        """
+        Queue an image for batched detection and wait for its result
+
+        Args:
+            image: Input image as numpy array (BGR format)
+
+        Returns:
+            Detection result dictionary for this image
+
+        Raises:
+            QueueFullError: If max_queue_size requests are already waiting
+        """
+        if self._queue is None:
+            raise RuntimeError("Batch scheduler not started")
+        if not self.has_capacity():
+            raise QueueFullError(self.executor.retry_after)
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, future, time.monotonic()))
+        return await future
+
+    async def _collect_batch(self) -> List[Tuple[np.ndarray, asyncio.Future, float]]:
+        """Wait for the first request, then gather more until the batch is full or the deadline passes"""
+        batch = [await self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # Still take whatever is already queued without waiting
+                if self._queue.empty():
+                    break
+                batch.append(self._queue.get_nowait())
+                continue
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        """Batching loop: wait for a free inference slot, collect a batch and dispatch it"""
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect_batch()
+            except asyncio.CancelledError:
+                self._slots.release()
+                raise
+
+            # Drop requests whose callers already went away
+            batch = [item for item in batch if not item[1].cancelled()]
+            if not batch:
+                self._slots.release()
+                continue
+
+            # Keep a reference so the dispatch task is not garbage collected mid-flight
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[Tuple[np.ndarray, asyncio.Future, float]]):
+        """Run one batched forward pass and fan results back out to the callers"""
+        try:
+            started = time.monotonic()
+            self.batch_size_histogram.observe(len(batch))
+            for _, _, enqueued in batch:
+                self.queue_wait_histogram.observe((started - enqueued) * 1000.0)
+
+            images = [image for image, _, _ in batch]
+            try:
+                results = await self.executor.run(self.detector.detect_batch, images)
+            except Exception as e:
+                logger.error(f"Batched inference failed: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            for (_, future, enqueued), result in zip(batch, results):
+                result["timings"] = {"queue_wait": (started - enqueued) * 1000.0, **result.get("timings", {})}
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict:
+        """Return batching configuration and histograms"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_queue_size": self.max_queue_size,
+            "queue_depth": self.queue_depth,
+            "batch_size": self.batch_size_histogram.snapshot(),
+            "queue_wait_ms": self.queue_wait_histogram.snapshot()
+        }
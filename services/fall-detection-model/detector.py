@@ -11,31 +11,79 @@ from typing import List, Dict, Tuple, Optional
 import logging
 import math
 import sys
+import time
 
 # Add models directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
-from models.experimental import attempt_load
-from utils.general import non_max_suppression_kpt
-from utils.plots import output_to_keypoint
+from ruth_serving.artifacts import load_inference_model, weights_sha256
+from backends import (
+    BACKENDS, ONEDNN_MAX_SHAPES, OneDNNBackend, OnnxRuntimeBackend, TorchBackend, build_onnx, compile_torchscript,
+    load_torchscript, onnx_artifact_path, torchscript_artifact_path
+)
+from preprocess import Preprocessor
+from fall_rules import FALL_INDICATORS, evaluate_fall_rules, fall_verdict
+from results import DetectionResult
+from utils.general import scale_coords
+from utils.keypoints import output_to_arrays, scale_keypoints
+from ruth_serving.metrics import stage_timer
 
 logger = logging.getLogger(__name__)
 
+# Largest stride of YOLOv7-w6-pose; rectangular inputs are padded to a multiple of it
+MODEL_STRIDE = 64
+# Backends that accept any stride-aligned input shape; compiled graphs have img_size x img_size baked in
+RECT_BACKENDS = ("torch", "onednn")
+
 class FallDetector:
     """
     Detects falls using human pose estimation and keypoint analysis
     """
     
-    def __init__(self, model_path: str, confidence_threshold: float = 0.6):
+    def __init__(self, model_path: str, confidence_threshold: float = 0.6, img_size: int = 640,
+                 cache_dir: Optional[str] = None, backend: str = "torch", onnx_path: Optional[str] = None,
+                 ort_intra_op_threads: int = 0, ort_inter_op_threads: int = 1, precision: str = "fp32",
+                 onednn_max_shapes: int = ONEDNN_MAX_SHAPES):
         """
         Initialize the fall detector
         
         Args:
             model_path: Path to the YOLOv7 pose model weights
             confidence_threshold: Minimum confidence for detections
+            img_size: Model input size in pixels for the longer frame side; frames are letterboxed
+                to stride-aligned rectangles (e.g. 384x640 for 16:9) on the torch and onednn backends
+                and to img_size x img_size squares on the others
+            cache_dir: Directory for the fused model artifact (None = fuse in memory on every load)
+            backend: "torch" (eager), "torchscript" (frozen traced backbone), "onednn" (channels-last
+                modules fused by oneDNN, compiled per input shape) or "onnxruntime" (exported graph
+                with NMS embedded)
+            onnx_path: Exported graph for the onnxruntime backend (default: exported into cache_dir)
+            ort_intra_op_threads: onnxruntime threads per operator (0 = torch's thread count)
+            ort_inter_op_threads: onnxruntime operators run in parallel
+            precision: "fp32", or "int8" to run the statically quantized graph built by
+                scripts/quantize_model.py (onnxruntime backend only)
+            onednn_max_shapes: Input shapes the onednn backend compiles before running new ones eagerly
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+        if precision not in ("fp32", "int8") or (precision == "int8" and backend != "onnxruntime"):
+            raise ValueError(f"Unsupported precision '{precision}' for the {backend} backend")
         self.model_path = Path(model_path)
         self.confidence_threshold = confidence_threshold
+        self.img_size = img_size
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.backend_name = backend
+        self.precision = precision
+        self.onnx_path = Path(onnx_path) if onnx_path else None
+        self.compiled_path = None
+        self.ort_intra_op_threads = ort_intra_op_threads
+        self.ort_inter_op_threads = ort_inter_op_threads
+        self.onednn_max_shapes = onednn_max_shapes
+        self.artifact_path = None
         self.model = None
+        self.backend = None
+        self.stride = MODEL_STRIDE
+        self.rect = False
+        self.preprocessor = None
         
         # COCO pose keypoint indices
         self.keypoint_names = [
@@ -61,16 +109,69 @@ class FallDetector:
             if not self.model_path.exists():
                 raise FileNotFoundError(f"Model file not found: {self.model_path}")
 
-            # Load YOLOv7 pose model using proper loader
-            logger.info(f"Loading YOLOv7 pose model from {self.model_path}")
-            self.model = attempt_load(str(self.model_path), map_location='cpu')
-            self.model.eval()
+            if self.backend_name in ("torchscript", "onnxruntime"):
+                try:
+                    self.backend = self._load_compiled_backend()
+                except Exception as e:
+                    logger.error(f"{self.backend_name} backend unavailable ({e}), falling back to eager PyTorch")
+                    self.backend_name = "torch"
+                    self.precision = "fp32"
+
+            if self.backend is None:
+                # Load the fused YOLOv7 pose model, from the cached artifact when available
+                logger.info(f"Loading YOLOv7 pose model from {self.model_path}")
+                self.model, self.artifact_path = load_inference_model(self.model_path, self.cache_dir)
+                self.model.eval()
+                if self.backend_name == "onednn":
+                    self.backend = OneDNNBackend(self.model, max_shapes=self.onednn_max_shapes)
+                    # The channels-last weights are heap copies, not pages of the mapped artifact
+                    self.artifact_path = None
+                else:
+                    self.backend = TorchBackend(self.model)
 
-            logger.info(f"Successfully loaded fall detection model from {self.model_path}")
+            if self.model is not None:
+                self.stride = int(self.model.stride.max())
+            self.rect = self.backend_name in RECT_BACKENDS
+            self.preprocessor = Preprocessor(self.img_size, self.stride, self.rect)
+
+            logger.info(f"Successfully loaded fall detection model from {self.model_path} ({self.backend_name})")
 
         except Exception as e:
             logger.error(f"Failed to load model: {e}")
             raise
+
+    def _load_compiled_backend(self):
+        """
+        Open the TorchScript module or ONNX graph for these weights and input size
+
+        Missing artifacts are built from the eager model and verified against
+        it first; the eager model is released afterwards.
+        """
+        if self.backend_name == "onnxruntime" and self.onnx_path is not None:
+            path = self.onnx_path
+        elif self.cache_dir is None:
+            raise ValueError(f"the {self.backend_name} backend needs a model cache directory")
+        elif self.backend_name == "onnxruntime":
+            sha256 = weights_sha256(self.model_path, self.cache_dir)
+            path = onnx_artifact_path(self.model_path, self.cache_dir, sha256, self.img_size, self.precision)
+        else:
+            sha256 = weights_sha256(self.model_path, self.cache_dir)
+            path = torchscript_artifact_path(self.model_path, self.cache_dir, sha256, self.img_size)
+
+        if not path.exists() and self.precision == "int8":
+            # Quantization needs a calibration set, so it is never done implicitly
+            raise FileNotFoundError(f"No int8 graph at {path}; build it with scripts/quantize_model.py")
+        if not path.exists():
+            logger.info(f"No {self.backend_name} artifact at {path}, building it from {self.model_path}")
+            model, _ = load_inference_model(self.model_path, self.cache_dir)
+            build = build_onnx if self.backend_name == "onnxruntime" else compile_torchscript
+            build(model.eval(), path, self.img_size)
+            del model
+
+        self.compiled_path = path
+        if self.backend_name == "onnxruntime":
+            return OnnxRuntimeBackend(path, self.ort_intra_op_threads, self.ort_inter_op_threads)
+        return TorchBackend(load_torchscript(path))
     
     def detect(self, image: np.ndarray) -> Dict:
         """
@@ -82,214 +183,161 @@ class FallDetector:
         Returns:
             Dictionary containing detection results
         """
-        if self.model is None:
+        return self.detect_batch([image])[0]
+
+    def detect_batch(self, images: List[np.ndarray]) -> List[Dict]:
+        """
+        Detect falls in several images with one batched forward pass per input shape
+
+        Args:
+            images: Input images as numpy arrays (BGR format)
+
+        Returns:
+            List of DetectionResult dictionaries, one per input image, with
+            coordinates in source image pixels. Each carries a "timings" dict
+            of stage durations in milliseconds; the preprocess, forward and nms
+            stages are shared by the images letterboxed to the same input shape,
+            which run as one forward pass.
+        """
+        if self.backend is None:
             raise RuntimeError("Model not loaded")
-        
+
         try:
-            # Preprocess image
-            img_tensor = self._preprocess_image(image)
-            
-            # Run inference
-            with torch.no_grad():
-                predictions = self.model(img_tensor)[0]
-            
-            # Post-process results
-            detections = self._postprocess_predictions(predictions, image.shape)
-            
-            # Analyze poses for fall detection
-            fall_detected = False
-            fall_confidence = 0.0
-            fall_type = None
-            
-            for detection in detections:
-                is_fall, confidence, f_type = self._analyze_pose_for_fall(detection["keypoints"])
-                if is_fall and confidence > fall_confidence:
-                    fall_detected = True
-                    fall_confidence = confidence
-                    fall_type = f_type
-            
-            return {
-                "violation_detected": fall_detected,
-                "violation_type": fall_type,
-                "severity": "critical" if fall_detected else "low",
-                "confidence": fall_confidence,
-                "detections": detections,
-                "detection_count": len(detections),
-                "model_name": "fall_detector",
-                "model_version": "1.0.0"
-            }
-            
+            # Frames of different resolutions or aspect ratios get different input shapes
+            preprocess_timings = {}
+            with stage_timer(preprocess_timings, "preprocess"):
+                groups = self.preprocessor.group(images)
+
+            results = [None] * len(images)
+            for indices, plans in groups:
+                batch_timings = dict(preprocess_timings)
+                with stage_timer(batch_timings, "preprocess"):
+                    batch = torch.from_numpy(self.preprocessor.batch([images[index] for index in indices], plans))
+
+                # Run inference and NMS with keypoint support over the whole batch
+                outputs = self.backend.infer(batch, batch_timings)
+
+                for index, plan, output in zip(indices, plans, outputs):
+                    timings = dict(batch_timings)
+                    detections, arrays = self._postprocess_predictions(
+                        output, images[index].shape, timings, plan.input_shape, plan.ratio_pad
+                    )
+                    with stage_timer(timings, "fall_analysis"):
+                        result = self._build_result(detections, arrays)
+                    result["timings"] = timings
+                    results[index] = result
+            return results
+
         except Exception as e:
             logger.error(f"Fall detection failed: {e}")
-            return {
-                "violation_detected": False,
-                "error": str(e),
-                "model_name": "fall_detector"
-            }
-    
-    def _preprocess_image(self, image: np.ndarray) -> torch.Tensor:
-        """Preprocess image for YOLOv7 pose model"""
-        # Resize image to model input size (typically 640x640)
-        img = cv2.resize(image, (640, 640))
-        img = img[:, :, ::-1].transpose(2, 0, 1)  # BGR to RGB, HWC to CHW
-        img = np.ascontiguousarray(img)
-        img = torch.from_numpy(img).float()
-        img /= 255.0  # Normalize to 0-1
-        if img.ndimension() == 3:
-            img = img.unsqueeze(0)
-        return img
-    
-    def _postprocess_predictions(self, predictions: torch.Tensor, orig_shape: Tuple[int, int, int]) -> List[Dict]:
-        """Post-process model predictions to extract pose keypoints"""
-        detections = []
-
-        # Apply NMS with keypoint support
-        output = non_max_suppression_kpt(
-            predictions,
-            conf_thres=0.25,  # Lower threshold to detect more people
-            iou_thres=0.65,
-            nc=1,  # Number of classes (person only)
-            nkpt=17,  # Number of keypoints
-            kpt_label=True
-        )
-
-        # Process detections
-        # output_to_keypoint converts to: [batch_id, cls, x_center, y_center, w, h, conf, kpt1_x, kpt1_y, kpt1_conf, ...]
-        with torch.no_grad():
-            output = output_to_keypoint(output)
-
-        logger.info(f"Detections found: {output.shape[0]}")
-
-        # Extract detection info for each person detected
-        # Format: [batch_id, cls, x_center, y_center, w, h, conf, 17*3 keypoint values]
-        for idx in range(output.shape[0]):
-            # Get bounding box in xywh (center) format and convert to xyxy
-            x_center = float(output[idx, 2])
-            y_center = float(output[idx, 3])
-            w = float(output[idx, 4])
-            h = float(output[idx, 5])
-            conf = float(output[idx, 6])
-
-            # Convert from center format to corner format
-            x1 = x_center - w / 2
-            y1 = y_center - h / 2
-            x2 = x_center + w / 2
-            y2 = y_center + h / 2
-
-            # Extract 17 keypoints (x, y, conf) - starting from index 7
-            keypoints = []
-            for kpt_idx in range(17):
-                kpt_x = float(output[idx, 7 + kpt_idx * 3])
-                kpt_y = float(output[idx, 7 + kpt_idx * 3 + 1])
-                kpt_conf = float(output[idx, 7 + kpt_idx * 3 + 2])
-                keypoints.append({
-                    "x": kpt_x,
-                    "y": kpt_y,
-                    "confidence": kpt_conf
+            return [
+                DetectionResult({
+                    "violation_detected": False,
+                    "error": str(e),
+                    "model_name": "fall_detector"
                 })
+                for _ in images
+            ]
 
-            detection_dict = {
-                "bbox": [x1, y1, x2, y2],
-                "confidence": conf,
-                "keypoints": keypoints
-            }
-            detections.append(detection_dict)
+    def _build_result(self, detections: List[Dict], arrays: Dict[str, np.ndarray]) -> DetectionResult:
+        """
+        Analyze detected poses and build the response for one image
 
-            # Log first detection for debugging
-            if idx == 0:
-                logger.info(f"First detection - bbox: [{x1:.1f}, {y1:.1f}, {x2:.1f}, {y2:.1f}], conf: {conf:.2f}")
-                visible_kpts = sum(1 for kp in keypoints if kp['confidence'] > 0.5)
-                logger.info(f"Visible keypoints: {visible_kpts}/17")
+        Each detection gains the names of the fall rules it triggered
+        ("fall_indicators") and its own fall confidence ("fall_confidence").
+        The same detections as flat float32 arrays ride along in the result's
+        `arrays` attribute for compact response formats, so the dict itself
+        stays JSON serializable.
+        """
+        # Every rule for every person at once; the most confident fall decides the verdict
+        indicators, confidences = evaluate_fall_rules(arrays["keypoints"], arrays["boxes"])
+        for detection, triggered, confidence in zip(detections, indicators.tolist(), confidences.tolist()):
+            detection["fall_indicators"] = [name for name, hit in zip(FALL_INDICATORS, triggered) if hit]
+            detection["fall_confidence"] = confidence
+        fall_confidence = float(confidences.max()) if len(confidences) else 0.0
+        fall_type = fall_verdict(fall_confidence)
+        fall_detected = fall_type is not None
+        if not fall_detected:
+            fall_confidence = 0.0
 
-        logger.info(f"Returning {len(detections)} detections")
-        return detections
+        return DetectionResult({
+            "violation_detected": fall_detected,
+            "violation_type": fall_type,
+            "severity": "critical" if fall_detected else "low",
+            "confidence": fall_confidence,
+            "detections": detections,
+            "detection_count": len(detections),
+            "model_name": "fall_detector",
+            "model_version": "1.0.0"
+        }, arrays)
+    
+    def _preprocess_image(self, image: np.ndarray) -> torch.Tensor:
+        """
+        Preprocess one image for YOLOv7 pose model into a 1 x 3 x H x W tensor the caller owns
+
+        The frame is letterboxed (scaled to fit img_size without distortion and
+        padded with gray) to the smallest stride multiple on rectangular
+        backends (640x360 becomes 640x384) or to the full square otherwise.
+        detect_batch preprocesses into reused buffers instead of copying.
+        """
+        batch = self.preprocessor.batch([image], [self.preprocessor.plan(image.shape)])
+        return torch.from_numpy(batch.copy())
     
-    def _analyze_pose_for_fall(self, keypoints: List[Dict]) -> Tuple[bool, float, Optional[str]]:
+    def _postprocess_predictions(self, output: torch.Tensor, orig_shape: Tuple[int, int, int],
+                                 timings: Optional[Dict[str, float]] = None,
+                                 input_shape: Optional[Tuple[int, int]] = None,
+                                 ratio_pad: Optional[Tuple] = None) -> Tuple[List[Dict], Dict[str, np.ndarray]]:
         """
-        Analyze pose keypoints to detect falls
+        Post-process NMS output for one image to extract pose keypoints
 
         Args:
-            keypoints: List of keypoint dicts with 'x', 'y', 'confidence'
+            output: NMS output for one image, in model input coordinates
+            orig_shape: Shape of the original image
+            timings: Optional dict that receives "keypoints" and "postprocess" durations in milliseconds
+            input_shape: Model input (height, width) the image was letterboxed to (default: img_size square)
+            ratio_pad: Letterbox gain and padding from the LetterboxPlan (default: derived from the shapes)
 
         Returns:
-            Tuple of (is_fall, confidence, fall_type)
+            Tuple of (detection dicts, arrays) where arrays holds float32
+            "boxes" (N x 4, xyxy), "scores" (N) and "keypoints" (N x 17 x 3)
         """
-        try:
-            # Extract key body parts (0-indexed)
-            nose = keypoints[0]
-            left_shoulder = keypoints[5]
-            right_shoulder = keypoints[6]
-            left_hip = keypoints[11]
-            right_hip = keypoints[12]
-            left_knee = keypoints[13]
-            right_knee = keypoints[14]
-            left_ankle = keypoints[15]
-            right_ankle = keypoints[16]
-
-            # Check if key points are visible
-            key_points_visible = [
-                nose['confidence'] > 0.3,
-                left_shoulder['confidence'] > 0.3,
-                right_shoulder['confidence'] > 0.3,
-                left_hip['confidence'] > 0.3,
-                right_hip['confidence'] > 0.3
-            ]
+        timings = timings if timings is not None else {}
 
-            if not any(key_points_visible):
-                return False, 0.0, None
-
-            # Calculate body orientation
-            if left_shoulder['confidence'] > 0.3 and right_shoulder['confidence'] > 0.3:
-                shoulder_center_y = (left_shoulder['y'] + right_shoulder['y']) / 2
-            else:
-                shoulder_center_y = nose['y'] if nose['confidence'] > 0.3 else 0
-
-            if left_hip['confidence'] > 0.3 and right_hip['confidence'] > 0.3:
-                hip_center_y = (left_hip['y'] + right_hip['y']) / 2
-            else:
-                hip_center_y = shoulder_center_y + 100  # Estimate
-
-            # Fall detection logic
-            fall_indicators = []
-
-            # 1. Check if person is horizontal (body orientation)
-            if abs(shoulder_center_y - hip_center_y) < 50:  # Nearly same height
-                fall_indicators.append(("horizontal_body", 0.8))
-
-            # 2. Check if head is lower than hips
-            if nose['confidence'] > 0.3 and hip_center_y > 0:
-                if nose['y'] > hip_center_y + 20:  # Head below hips
-                    fall_indicators.append(("head_below_hips", 0.7))
-
-            # 3. Check limb positions
-            if left_ankle['confidence'] > 0.3 and right_ankle['confidence'] > 0.3:
-                ankle_distance = abs(left_ankle['x'] - right_ankle['x'])
-                if ankle_distance > 100:  # Legs spread wide
-                    fall_indicators.append(("legs_spread", 0.6))
-
-            # 4. Overall body compactness (person might be on ground)
-            visible_kpts = [kp for kp in keypoints if kp['confidence'] > 0.3]
-            if len(visible_kpts) > 10:  # Many keypoints visible
-                y_coords = [kp['y'] for kp in visible_kpts]
-                if y_coords:
-                    y_range = max(y_coords) - min(y_coords)
-                    if y_range < 150:  # Very compact vertically
-                        fall_indicators.append(("compact_body", 0.7))
-
-            # Determine fall status
-            if fall_indicators:
-                max_confidence = max(indicator[1] for indicator in fall_indicators)
-
-                if max_confidence > 0.7:
-                    return True, max_confidence, "fall_detected"
-                elif max_confidence > 0.5:
-                    return True, max_confidence, "possible_fall"
-
-            return False, 0.0, None
+        # Map boxes and keypoints from the letterboxed input back to source pixels, then
+        # split the rows into arrays with one tensor to NumPy transfer
+        input_shape = input_shape or (self.img_size, self.img_size)
+        with stage_timer(timings, "keypoints"), torch.no_grad():
+            output = output.clone()
+            scale_coords(input_shape, output[:, :4], orig_shape, ratio_pad)
+            scale_keypoints(input_shape, output[:, 6:], orig_shape, ratio_pad)
+            arrays = output_to_arrays(output, len(self.keypoint_names))
 
-        except Exception as e:
-            logger.error(f"Pose analysis failed: {e}")
-            return False, 0.0, None
+        logger.info(f"Detections found: {len(arrays['scores'])}")
+
+        # Build the per-person dicts from plain Python lists rather than element by element
+        postprocess_start = time.perf_counter()
+        detections = [
+            {
+                "bbox": bbox,
+                "confidence": conf,
+                "keypoints": [{"x": x, "y": y, "confidence": kpt_conf} for x, y, kpt_conf in keypoints]
+            }
+            for bbox, conf, keypoints in zip(
+                arrays["boxes"].tolist(), arrays["scores"].tolist(), arrays["keypoints"].tolist()
+            )
+        ]
+
+        # Log first detection for debugging
+        if detections:
+            x1, y1, x2, y2 = detections[0]["bbox"]
+            logger.info(
+                f"First detection - bbox: [{x1:.1f}, {y1:.1f}, {x2:.1f}, {y2:.1f}], conf: {detections[0]['confidence']:.2f}"
+            )
+            logger.info(f"Visible keypoints: {int((arrays['keypoints'][0, :, 2] > 0.5).sum())}/17")
+
+        timings["postprocess"] = (time.perf_counter() - postprocess_start) * 1000.0
+        logger.info(f"Returning {len(detections)} detections")
+        return detections, arrays
     
     def annotate_image(self, image: np.ndarray, detections: List[Dict]) -> np.ndarray:
         """
@@ -0,0 +1,95 @@
+"""
+Fall heuristics
+Evaluates the pose-based fall rules for every detected person at once on N x 17 x 3 keypoint arrays
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+# COCO keypoint indices used by the rules
+NOSE = 0
+LEFT_SHOULDER, RIGHT_SHOULDER = 5, 6
+LEFT_HIP, RIGHT_HIP = 11, 12
+LEFT_ANKLE, RIGHT_ANKLE = 15, 16
+# At least one of these must be visible for any rule to apply
+ANCHOR_KEYPOINTS = [NOSE, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP]
+
+# Keypoints above this confidence count as visible
+VISIBLE_CONFIDENCE = 0.3
+
+# Rules, in indicator column order, and the fall confidence each one contributes
+FALL_INDICATORS = ("horizontal_body", "head_below_hips", "legs_spread", "compact_body")
+INDICATOR_CONFIDENCE = np.array([0.8, 0.7, 0.6, 0.7])
+
+# Thresholds as fractions of the person's box size s = max(box width, box height), so the rules
+# hold at any camera resolution or distance. An upright person spans about 1.0 s vertically with
+# about 0.3 s between shoulders and hips; a person lying down spans well under half of s.
+HORIZONTAL_MAX_GAP = 0.12  # shoulders and hips at nearly the same height
+HEAD_BELOW_HIPS_MARGIN = 0.05  # nose this far below the hips
+LEGS_SPREAD_MIN = 0.35  # horizontal distance between the ankles
+COMPACT_MIN_VISIBLE = 10  # visible keypoints needed to judge compactness
+COMPACT_MAX_HEIGHT = 0.5  # vertical extent of the visible keypoints
+HIP_ESTIMATE_OFFSET = 0.25  # hips assumed this far below the shoulders when not visible
+
+# Verdicts by the highest indicator confidence
+FALL_CONFIDENCE = 0.7
+POSSIBLE_FALL_CONFIDENCE = 0.5
+
+
+def evaluate_fall_rules(keypoints: np.ndarray, boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluate every fall rule for every person
+
+    Keypoints are first expressed relative to the top-left corner of the
+    person's box and divided by the box's longer side.
+
+    Args:
+        keypoints: N x 17 x 3 keypoints (x, y, confidence) in pixels
+        boxes: N x 4 boxes (x1, y1, x2, y2) in the same pixels
+
+    Returns:
+        Tuple of (indicators, confidences): an N x 4 boolean mask with one
+        column per FALL_INDICATORS rule, and each person's fall confidence
+        (the highest confidence of their triggered rules, 0 if none)
+    """
+    keypoints = np.asarray(keypoints, dtype=np.float32).reshape(-1, 17, 3)
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+
+    size = np.maximum((boxes[:, 2:] - boxes[:, :2]).max(1), 1e-6)
+    x = (keypoints[..., 0] - boxes[:, 0:1]) / size[:, None]
+    y = (keypoints[..., 1] - boxes[:, 1:2]) / size[:, None]
+    visible = keypoints[..., 2] > VISIBLE_CONFIDENCE
+
+    nose_visible = visible[:, NOSE]
+    shoulder_y = np.where(
+        visible[:, LEFT_SHOULDER] & visible[:, RIGHT_SHOULDER],
+        (y[:, LEFT_SHOULDER] + y[:, RIGHT_SHOULDER]) / 2,
+        np.where(nose_visible, y[:, NOSE], 0.0)
+    )
+    hip_y = np.where(
+        visible[:, LEFT_HIP] & visible[:, RIGHT_HIP],
+        (y[:, LEFT_HIP] + y[:, RIGHT_HIP]) / 2,
+        shoulder_y + HIP_ESTIMATE_OFFSET
+    )
+    vertical_extent = np.where(visible, y, -np.inf).max(1) - np.where(visible, y, np.inf).min(1)
+
+    indicators = np.stack([
+        np.abs(shoulder_y - hip_y) < HORIZONTAL_MAX_GAP,
+        nose_visible & (hip_y > 0) & (y[:, NOSE] > hip_y + HEAD_BELOW_HIPS_MARGIN),
+        visible[:, LEFT_ANKLE] & visible[:, RIGHT_ANKLE] & (np.abs(x[:, LEFT_ANKLE] - x[:, RIGHT_ANKLE]) > LEGS_SPREAD_MIN),
+        (visible.sum(1) > COMPACT_MIN_VISIBLE) & (vertical_extent < COMPACT_MAX_HEIGHT)
+    ], axis=1)
+    indicators &= visible[:, ANCHOR_KEYPOINTS].any(1)[:, None]
+
+    confidences = np.where(indicators, INDICATOR_CONFIDENCE, 0.0).max(1, initial=0.0)
+    return indicators, confidences
+
+
+def fall_verdict(confidence: float) -> Optional[str]:
+    """Verdict for a fall confidence: "fall_detected", "possible_fall" or None"""
+    if confidence > FALL_CONFIDENCE:
+        return "fall_detected"
+    if confidence > POSSIBLE_FALL_CONFIDENCE:
+        return "possible_fall"
+    return None
@@ -0,0 +1,278 @@
+"""
+Direct RTSP/HTTP stream ingestion
+Reader threads keep the latest frame of each camera and feed the batched inference path
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ruth_serving.executor import QueueFullError
+
+logger = logging.getLogger(__name__)
+
+
+def load_stream_sources(sources: str = "", streams_file: str = "") -> List[Tuple[str, str]]:
+    """
+    Parse stream sources from a comma separated list and/or a streams.txt file
+
+    Each entry is either a bare URL or "camera_id=url". Bare URLs get their
+    position as camera id, like utils.datasets.LoadStreams.
+
+    Returns:
+        List of (camera_id, url)
+    """
+    entries = [entry.strip() for entry in sources.split(",") if entry.strip()]
+    if streams_file and os.path.isfile(streams_file):
+        with open(streams_file, "r") as f:
+            entries += [line.strip() for line in f.read().strip().splitlines()
+                        if line.strip() and not line.strip().startswith("#")]
+
+    parsed = []
+    for index, entry in enumerate(entries):
+        camera_id, separator, url = entry.partition("=")
+        # Only treat it as camera_id=url if the left side is not part of the URL itself
+        if separator and "://" not in camera_id:
+            parsed.append((camera_id.strip(), url.strip()))
+        else:
+            parsed.append((str(index), entry))
+    return parsed
+
+
+class StreamReader:
+    """
+    Reads one camera stream in a daemon thread, keeping only its latest frame
+
+    The latest frame lives in a single attribute that is replaced wholesale,
+    so the consumer never takes a lock. Failed or ended streams are reopened
+    with exponential backoff.
+    """
+
+    def __init__(self, camera_id: str, url: str, max_fps: float = 5.0,
+                 backoff_min: float = 1.0, backoff_max: float = 30.0):
+        """
+        Initialize the reader
+
+        Args:
+            camera_id: Identifier reported with results
+            url: RTSP/HTTP URL (or a local device index as a string)
+            max_fps: Maximum rate at which frames are decoded into the slot (0 = every frame)
+            backoff_min: Initial reconnect delay in seconds
+            backoff_max: Maximum reconnect delay in seconds
+        """
+        self.camera_id = camera_id
+        self.url = url
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+
+        # Latest frame slot: (sequence, frame, capture time)
+        self._slot: Optional[Tuple[int, np.ndarray, float]] = None
+        self._taken_sequence = 0
+
+        self.state = "connecting"
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.frames_processed = 0
+        self.reconnects = 0
+        self.fps = 0.0
+        self.last_latency_ms: Optional[float] = None
+        self.last_result: Optional[Dict] = None
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"stream-{camera_id}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def take(self) -> Optional[Tuple[int, np.ndarray, float]]:
+        """Return the latest frame if it has not been taken yet, counting frames skipped since the last take"""
+        slot = self._slot
+        if slot is None or slot[0] <= self._taken_sequence:
+            return None
+        if self._taken_sequence:
+            self.frames_dropped += slot[0] - self._taken_sequence - 1
+        self._taken_sequence = slot[0]
+        return slot
+
+    def _open(self) -> Optional[cv2.VideoCapture]:
+        source = int(self.url) if self.url.isnumeric() else self.url
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+
+    def _run(self):
+        backoff = self.backoff_min
+        while not self._stop.is_set():
+            self.state = "connecting"
+            cap = self._open()
+            if cap is None:
+                self.state = "backoff"
+                logger.warning(f"Stream {self.camera_id}: failed to open, retrying in {backoff:.0f}s")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.backoff_max)
+                self.reconnects += 1
+                continue
+
+            logger.info(f"Stream {self.camera_id}: connected")
+            self.state = "streaming"
+            backoff = self.backoff_min
+            last_retrieve = 0.0
+            window_start, window_frames = time.monotonic(), 0
+
+            while not self._stop.is_set():
+                if not cap.grab():
+                    break
+                now = time.monotonic()
+                if now - last_retrieve < self.min_interval:
+                    continue
+                success, frame = cap.retrieve()
+                if not success:
+                    break
+
+                last_retrieve = now
+                self.frames_read += 1
+                self._slot = (self.frames_read, frame, now)
+
+                window_frames += 1
+                if now - window_start >= 5.0:
+                    self.fps = window_frames / (now - window_start)
+                    window_start, window_frames = now, 0
+
+            cap.release()
+            if not self._stop.is_set():
+                self.state = "backoff"
+                self.reconnects += 1
+                logger.warning(f"Stream {self.camera_id}: stream ended, reconnecting in {backoff:.0f}s")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.backoff_max)
+
+        self.state = "stopped"
+
+    def stats(self) -> Dict:
+        last = self.last_result or {}
+        return {
+            "camera_id": self.camera_id,
+            "url": self.url,
+            "state": self.state,
+            "fps": round(self.fps, 2),
+            "frames_read": self.frames_read,
+            "frames_processed": self.frames_processed,
+            "frames_dropped": self.frames_dropped,
+            "reconnects": self.reconnects,
+            "latency_ms": round(self.last_latency_ms, 1) if self.last_latency_ms is not None else None,
+            "violation_detected": last.get("violation_detected", False),
+            "violation_type": last.get("violation_type"),
+            "confidence": last.get("confidence", 0.0)
+        }
+
+
+class StreamIngestor:
+    """
+    Feeds the latest frame of every stream into the batch scheduler
+
+    Each round submits all streams with a new frame at once, so they share
+    one batched forward pass. Frames that arrive while a round is running are
+    superseded by newer ones rather than queued.
+    """
+
+    def __init__(self, sources: List[Tuple[str, str]], submit: Callable, alert_url: str = "",
+                 max_fps: float = 5.0, backoff_max: float = 30.0):
+        """
+        Initialize the ingestor
+
+        Args:
+            sources: List of (camera_id, url)
+            submit: Coroutine function taking an image and returning its detection result
+            alert_url: Optional URL that receives a JSON POST for every violation
+            max_fps: Per-stream decode rate limit
+            backoff_max: Maximum reconnect delay in seconds
+        """
+        self.readers = [StreamReader(camera_id, url, max_fps=max_fps, backoff_max=backoff_max)
+                        for camera_id, url in sources]
+        self.submit = submit
+        self.alert_url = alert_url
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        for reader in self.readers:
+            reader.start()
+        self._task = asyncio.create_task(self._feed())
+        logger.info(f"Stream ingestion started for {len(self.readers)} streams")
+
+    async def stop(self):
+        for reader in self.readers:
+            reader.stop()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _feed(self):
+        while True:
+            frames = [(reader, reader.take()) for reader in self.readers]
+            frames = [(reader, slot) for reader, slot in frames if slot is not None]
+            if not frames:
+                await asyncio.sleep(0.005)
+                continue
+
+            results = await asyncio.gather(
+                *(self.submit(frame) for _, (_, frame, _) in frames),
+                return_exceptions=True
+            )
+
+            done = time.monotonic()
+            for (reader, (sequence, _, captured)), result in zip(frames, results):
+                if isinstance(result, QueueFullError):
+                    reader.frames_dropped += 1
+                    continue
+                if isinstance(result, Exception):
+                    logger.error(f"Stream {reader.camera_id}: detection failed: {result}")
+                    continue
+
+                reader.frames_processed += 1
+                reader.last_latency_ms = (done - captured) * 1000.0
+                reader.last_result = result
+                if result.get("violation_detected") and self.alert_url:
+                    asyncio.get_running_loop().run_in_executor(
+                        None, self._post_alert, reader.camera_id, sequence, result
+                    )
+
+    def _post_alert(self, camera_id: str, sequence: int, result: Dict):
+        payload = {
+            "camera_id": camera_id,
+            "frame": sequence,
+            "model": "fall-detection",
+            "timestamp": time.time(),
+            **result
+        }
+        request = urllib.request.Request(
+            self.alert_url,
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except Exception as e:
+            logger.error(f"Stream {camera_id}: failed to post alert: {e}")
+
+    def stats(self) -> List[Dict]:
+        return [reader.stats() for reader in self.readers]
@@ -187,6 +187,39 @@ class ONNX_ORT(nn.Module):
         X = X.unsqueeze(1).float()
         return torch.cat([X, selected_boxes, selected_categories, selected_scores], 1)
 
+class ONNX_ORT_KPT(nn.Module):
+    '''onnx module with ONNX-Runtime NMS operation for keypoint (pose) models.
+    Rows match non_max_suppression_kpt prefixed with the batch index:
+    [batch_id, x1, y1, x2, y2, conf, cls, kpt1_x, kpt1_y, kpt1_conf, ...]'''
+    def __init__(self, max_obj=300, iou_thres=0.45, score_thres=0.25, max_wh=640, device=None, nc=1):
+        super().__init__()
+        self.device = device if device else torch.device("cpu")
+        self.max_obj = torch.tensor([max_obj]).to(device)
+        self.iou_threshold = torch.tensor([iou_thres]).to(device)
+        self.score_threshold = torch.tensor([score_thres]).to(device)
+        self.max_wh = max_wh # if max_wh != 0 : non-agnostic else : agnostic
+        self.nc = nc
+        self.convert_matrix = torch.tensor([[1, 0, 1, 0], [0, 1, 0, 1], [-0.5, 0, 0.5, 0], [0, -0.5, 0, 0.5]],
+                                           dtype=torch.float32,
+                                           device=self.device)
+
+    def forward(self, x):
+        boxes = x[:, :, :4] @ self.convert_matrix  # xywh to xyxy
+        scores = x[:, :, 5:5 + self.nc] * x[:, :, 4:5]  # conf = obj_conf * cls_conf
+        kpts = x[:, :, 5 + self.nc:]
+        max_score, category_id = scores.max(2, keepdim=True)
+        dis = category_id.float() * self.max_wh
+        nmsbox = boxes + dis
+        max_score_tp = max_score.transpose(1, 2).contiguous()
+        selected_indices = ORT_NMS.apply(nmsbox, max_score_tp, self.max_obj, self.iou_threshold, self.score_threshold)
+        X, Y = selected_indices[:, 0], selected_indices[:, 2]
+        selected_boxes = boxes[X, Y, :]
+        selected_categories = category_id[X, Y, :].float()
+        selected_scores = max_score[X, Y, :]
+        selected_kpts = kpts[X, Y, :]
+        X = X.unsqueeze(1).float()
+        return torch.cat([X, selected_boxes, selected_scores, selected_categories, selected_kpts], 1)
+
 class ONNX_TRT(nn.Module):
     '''onnx module with TensorRT NMS operation.'''
     def __init__(self, max_obj=100, iou_thres=0.45, score_thres=0.25, max_wh=None ,device=None):
@@ -215,18 +248,25 @@ class ONNX_TRT(nn.Module):
 
 class End2End(nn.Module):
     '''export onnx or tensorrt model with NMS operation.'''
-    def __init__(self, model, max_obj=100, iou_thres=0.45, score_thres=0.25, max_wh=None, device=None):
+    def __init__(self, model, max_obj=100, iou_thres=0.45, score_thres=0.25, max_wh=None, device=None, kpt_label=False):
         super().__init__()
         device = device if device else torch.device('cpu')
         assert isinstance(max_wh,(int)) or max_wh is None
         self.model = model.to(device)
         self.model.model[-1].end2end = True
-        self.patch_model = ONNX_TRT if max_wh is None else ONNX_ORT
+        if kpt_label:
+            # keypoint heads are only supported with ONNX-Runtime NMS
+            assert max_wh is not None, 'keypoint models need max_wh (ONNX-Runtime NMS)'
+            self.patch_model = ONNX_ORT_KPT
+        else:
+            self.patch_model = ONNX_TRT if max_wh is None else ONNX_ORT
         self.end2end = self.patch_model(max_obj, iou_thres, score_thres, max_wh, device)
         self.end2end.eval()
 
     def forward(self, x):
         x = self.model(x)
+        if isinstance(x, tuple):  # keypoint heads return (predictions, feature maps)
+            x = x[0]
         x = self.end2end(x)
         return x
 
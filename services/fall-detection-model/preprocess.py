@@ -0,0 +1,161 @@
+"""
+Frame preprocessing into reusable input buffers
+Letterboxes BGR frames straight into per-thread uint8 canvases and float32 model input batches
+"""
+
+import threading
+from collections import OrderedDict
+from typing import List, NamedTuple, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+# Gray used for letterbox padding, as in utils.datasets.letterbox
+LETTERBOX_COLOR = 114
+# Input shapes each thread keeps buffers for before dropping the least recently used
+MAX_BUFFERED_SHAPES = 8
+
+
+class LetterboxPlan(NamedTuple):
+    """Where a frame lands in the model input"""
+    input_shape: Tuple[int, int]  # model input (height, width)
+    resized: Tuple[int, int]  # scaled frame (height, width) before padding
+    offset: Tuple[int, int]  # (top, left) padding
+    ratio_pad: Tuple  # ((gain, gain), (pad_w, pad_h)) for scale_coords
+
+
+def letterbox_plan(shape: Sequence[int], img_size: int, stride: int = 32, auto: bool = True) -> LetterboxPlan:
+    """
+    Compute the letterbox geometry utils.datasets.letterbox would use for a frame
+
+    Args:
+        shape: Frame shape (height, width[, channels])
+        img_size: Input size for the longer side
+        stride: Rectangular inputs are padded to a multiple of it
+        auto: Pad to the smallest stride multiple instead of the full square
+
+    Returns:
+        The frame's LetterboxPlan
+    """
+    height, width = shape[:2]
+    r = min(img_size / height, img_size / width)
+    new_unpad = int(round(width * r)), int(round(height * r))
+    dw, dh = img_size - new_unpad[0], img_size - new_unpad[1]
+    if auto:  # minimum rectangle
+        dw, dh = np.mod(dw, stride), np.mod(dh, stride)
+    dw /= 2
+    dh /= 2
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    return LetterboxPlan(
+        input_shape=(new_unpad[1] + top + bottom, new_unpad[0] + left + right),
+        resized=(new_unpad[1], new_unpad[0]),
+        offset=(top, left),
+        ratio_pad=((r, r), (dw, dh))
+    )
+
+
+class Preprocessor:
+    """
+    Letterboxes frames into a float32 model input batch without per-request allocations
+
+    Each thread keeps, per input shape, a uint8 canvas the frame is resized
+    into (with cv2.resize writing straight into the canvas region) and a
+    float32 batch buffer. BGR to RGB, HWC to CHW and the /255 scaling are
+    one np.divide pass from the canvas into the frame's slot of the batch.
+    Frames that already have the input shape are read in place.
+
+    Returned batches are views of the calling thread's buffers: they stay
+    valid until the same thread preprocesses the next batch of that shape.
+    """
+
+    def __init__(self, img_size: int, stride: int = 32, rect: bool = True, max_shapes: int = MAX_BUFFERED_SHAPES):
+        """
+        Initialize the preprocessor
+
+        Args:
+            img_size: Model input size for the longer frame side
+            stride: Rectangular inputs are padded to a multiple of it
+            rect: Pad to the smallest stride multiple (True) or to an img_size square (False)
+            max_shapes: Input shapes each thread keeps buffers for
+        """
+        self.img_size = img_size
+        self.stride = stride
+        self.rect = rect
+        self.max_shapes = max_shapes
+        self._local = threading.local()
+
+    def plan(self, shape: Sequence[int]) -> LetterboxPlan:
+        """Letterbox geometry of a frame of the given shape"""
+        return letterbox_plan(shape, self.img_size, self.stride, auto=self.rect)
+
+    def _buffers(self, input_shape: Tuple[int, int], batch_size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """This thread's canvas and batch buffer for an input shape, grown to batch_size if needed"""
+        cache = getattr(self._local, "buffers", None)
+        if cache is None:
+            cache = self._local.buffers = OrderedDict()
+
+        canvas, batch = cache.pop(input_shape, (None, None))
+        if canvas is None:
+            canvas = np.empty((*input_shape, 3), dtype=np.uint8)
+        if batch is None or batch.shape[0] < batch_size:
+            batch = np.empty((batch_size, 3, *input_shape), dtype=np.float32)
+        cache[input_shape] = (canvas, batch)
+        while len(cache) > self.max_shapes:
+            cache.popitem(last=False)
+        return canvas, batch
+
+    def _letterbox_into(self, image: np.ndarray, plan: LetterboxPlan, canvas: np.ndarray) -> np.ndarray:
+        """Resize a frame into the canvas and paint the padding; returns the canvas"""
+        (top, left), (height, width) = plan.offset, plan.resized
+        region = canvas[top:top + height, left:left + width]
+        if image.shape[:2] == (height, width):
+            region[...] = image
+        else:
+            resized = cv2.resize(image, (width, height), dst=region, interpolation=cv2.INTER_LINEAR)
+            if not np.shares_memory(resized, region):  # OpenCV could not write into the view
+                region[...] = resized
+
+        canvas[:top] = LETTERBOX_COLOR
+        canvas[top + height:] = LETTERBOX_COLOR
+        canvas[top:top + height, :left] = LETTERBOX_COLOR
+        canvas[top:top + height, left + width:] = LETTERBOX_COLOR
+        return canvas
+
+    def batch(self, images: Sequence[np.ndarray], plans: Sequence[LetterboxPlan]) -> np.ndarray:
+        """
+        Letterbox frames that share an input shape into one model input batch
+
+        Args:
+            images: BGR uint8 frames (HWC)
+            plans: Their plans, all with the same input_shape
+
+        Returns:
+            Float32 B x 3 x H x W RGB batch scaled to 0-1 (a view of this thread's buffer)
+        """
+        input_shape = plans[0].input_shape
+        canvas, batch = self._buffers(input_shape, len(images))
+        batch = batch[:len(images)]
+        for slot, image, plan in zip(batch, images, plans):
+            if plan.input_shape != input_shape:
+                raise ValueError(f"Frames letterboxed to {plan.input_shape} and {input_shape} cannot share a batch")
+            if image.shape[:2] != input_shape:
+                image = self._letterbox_into(image, plan, canvas)
+            # BGR to RGB, HWC to CHW and 0-255 to 0-1 in one pass
+            np.divide(image[:, :, ::-1].transpose(2, 0, 1), 255.0, out=slot, dtype=np.float32)
+        return batch
+
+    def group(self, images: Sequence[np.ndarray]) -> List[Tuple[List[int], List[LetterboxPlan]]]:
+        """
+        Plan every frame and group them by input shape
+
+        Returns:
+            (indices, plans) per input shape, in order of first appearance
+        """
+        groups = OrderedDict()
+        for index, image in enumerate(images):
+            plan = self.plan(image.shape)
+            indices, plans = groups.setdefault(plan.input_shape, ([], []))
+            indices.append(index)
+            plans.append(plan)
+        return list(groups.values())
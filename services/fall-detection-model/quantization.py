@@ -0,0 +1,216 @@
+"""
+INT8 post-training quantization
+Statically quantizes the exported ONNX graph on representative camera frames and measures the accuracy cost
+"""
+
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+import torch
+
+from utils.datasets import LoadImages
+
+try:
+    # optional, needs the onnx package next to onnxruntime
+    from onnxruntime.quantization import (
+        CalibrationDataReader, CalibrationMethod, QuantFormat, QuantType, quantize_static
+    )
+except ImportError:
+    CalibrationDataReader = object
+    quantize_static = None
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_METHODS = ("minmax", "entropy", "percentile")
+
+# COCO keypoint sigmas used by the OKS metric
+COCO_KPT_SIGMAS = np.array([
+    .26, .25, .25, .35, .35, .79, .79, .72, .72, .62, .62, 1.07, 1.07, .87, .87, .89, .89
+]) / 10.0
+
+# Reference keypoints below this confidence do not count towards OKS
+OKS_VISIBLE_CONF = 0.5
+MATCH_IOU = 0.5
+
+
+def load_frames(source: str, limit: int = 0) -> Iterator[Tuple[str, np.ndarray]]:
+    """
+    Yield (path, BGR frame) pairs from an image/video folder or glob through LoadImages
+
+    Only the original frames are used; the letterboxed copies LoadImages
+    builds are ignored so frames go through the detector's own preprocessing.
+    """
+    for count, (path, _, frame, _) in enumerate(LoadImages(source, img_size=640, stride=64)):
+        if limit and count >= limit:
+            return
+        yield path, frame
+
+
+class FrameCalibrationReader(CalibrationDataReader):
+    """
+    Feeds preprocessed camera frames to onnxruntime's calibrator one at a time
+    """
+
+    def __init__(self, source: str, preprocess: Callable[[np.ndarray], torch.Tensor],
+                 input_name: str = "images", limit: int = 0):
+        """
+        Initialize the reader
+
+        Args:
+            source: Folder (or glob) of representative frames
+            preprocess: Turns a BGR frame into the model input batch, e.g. FallDetector._preprocess_image
+            input_name: Graph input name
+            limit: Maximum number of frames (0 = all)
+        """
+        self.frames = load_frames(source, limit)
+        self.preprocess = preprocess
+        self.input_name = input_name
+        self.count = 0
+
+    def get_next(self):
+        item = next(self.frames, None)
+        if item is None:
+            return None
+        self.count += 1
+        return {self.input_name: self.preprocess(item[1]).numpy()}
+
+
+def quantize_onnx(fp32_path: Path, output_path: Path, reader: FrameCalibrationReader,
+                  method: str = "minmax", per_channel: bool = True, reduce_range: bool = False):
+    """
+    Statically quantize the convolutions of an exported graph to INT8
+
+    Only Conv nodes are quantized (QDQ format, uint8 activations, int8
+    weights), so the keypoint decode arithmetic and the embedded NMS keep
+    FP32 precision while the bulk of the compute runs as QLinearConv.
+
+    Args:
+        fp32_path: Graph exported by backends.build_onnx
+        output_path: Where the quantized graph is written (atomically)
+        reader: Calibration frames
+        method: Activation range calibration: minmax, entropy or percentile
+        per_channel: Per output channel weight scales
+        reduce_range: 7-bit weights, for CPUs without VNNI where u8 x s8 products can saturate
+    """
+    if quantize_static is None:
+        raise RuntimeError("onnxruntime quantization tools are not installed (pip install onnx onnxruntime)")
+    if method not in CALIBRATION_METHODS:
+        raise ValueError(f"Unknown calibration method '{method}', expected one of {CALIBRATION_METHODS}")
+    calibrate_method = {
+        "minmax": CalibrationMethod.MinMax,
+        "entropy": CalibrationMethod.Entropy,
+        "percentile": CalibrationMethod.Percentile
+    }[method]
+
+    output_path = Path(output_path)
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(dir=output_path.parent, prefix=".quantize-") as workdir:
+        tmp = Path(workdir) / "int8.onnx"
+        quantize_static(
+            str(fp32_path),
+            str(tmp),
+            reader,
+            quant_format=QuantFormat.QDQ,
+            op_types_to_quantize=["Conv"],
+            per_channel=per_channel,
+            reduce_range=reduce_range,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            calibrate_method=calibrate_method
+        )
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, output_path)
+
+    logger.info(
+        f"Quantized {fp32_path} to {output_path} on {reader.count} frames ({method}) "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+def _box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of xyxy boxes (N x 4, M x 4)"""
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.clip(rb - lt, 0, None).prod(-1)
+    area_a = (a[:, 2:] - a[:, :2]).prod(-1)
+    area_b = (b[:, 2:] - b[:, :2]).prod(-1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def keypoint_oks(reference: np.ndarray, candidate: np.ndarray, area: float) -> float:
+    """
+    Object keypoint similarity of one person, COCO style
+
+    Args:
+        reference: 17 x 3 reference keypoints (x, y, conf)
+        candidate: 17 x 3 keypoints to score
+        area: Reference box area in pixels
+
+    Returns:
+        OKS in [0, 1], or nan when no reference keypoint is visible
+    """
+    visible = reference[:, 2] > OKS_VISIBLE_CONF
+    if not visible.any():
+        return float("nan")
+    d2 = ((reference[:, :2] - candidate[:, :2]) ** 2).sum(1)
+    e = d2 / ((2 * COCO_KPT_SIGMAS) ** 2 * (area + np.spacing(1)) * 2)
+    return float(np.exp(-e)[visible].mean())
+
+
+def compare_results(reference: List[Dict], candidate: List[Dict]) -> Dict:
+    """
+    Compare detector results of a candidate (e.g. INT8) against a reference (FP32) on the same frames
+
+    Detections are matched greedily by IoU >= 0.5, highest reference score
+    first. Precision and recall treat the reference as ground truth.
+
+    Returns:
+        Dictionary with detection agreement, keypoint OKS and fall verdict agreement
+    """
+    ref_total = cand_total = matched = verdicts = 0
+    oks, score_diffs = [], []
+    for ref, cand in zip(reference, candidate):
+        ref_arrays, cand_arrays = ref.arrays, cand.arrays
+        ref_total += len(ref_arrays["boxes"])
+        cand_total += len(cand_arrays["boxes"])
+        verdicts += int(ref["violation_detected"] == cand["violation_detected"]
+                        and ref.get("violation_type") == cand.get("violation_type"))
+        if not len(ref_arrays["boxes"]) or not len(cand_arrays["boxes"]):
+            continue
+
+        iou = _box_iou(ref_arrays["boxes"], cand_arrays["boxes"])
+        used = set()
+        for r in np.argsort(-ref_arrays["scores"]):
+            order = [c for c in np.argsort(-iou[r]) if c not in used and iou[r, c] >= MATCH_IOU]
+            if not order:
+                continue
+            c = order[0]
+            used.add(c)
+            matched += 1
+            box = ref_arrays["boxes"][r]
+            area = float((box[2] - box[0]) * (box[3] - box[1]))
+            oks.append(keypoint_oks(ref_arrays["keypoints"][r], cand_arrays["keypoints"][c], area))
+            score_diffs.append(abs(float(ref_arrays["scores"][r]) - float(cand_arrays["scores"][c])))
+
+    oks = np.array([value for value in oks if not np.isnan(value)])
+    precision = matched / cand_total if cand_total else 1.0
+    recall = matched / ref_total if ref_total else 1.0
+    return {
+        "images": len(reference),
+        "reference_detections": ref_total,
+        "candidate_detections": cand_total,
+        "matched": matched,
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+        "mean_oks": round(float(oks.mean()), 4) if len(oks) else None,
+        "p10_oks": round(float(np.percentile(oks, 10)), 4) if len(oks) else None,
+        "oks_above_0.9": round(float((oks >= 0.9).mean()), 4) if len(oks) else None,
+        "mean_score_diff": round(float(np.mean(score_diffs)), 4) if score_diffs else None,
+        "verdict_agreement": round(verdicts / len(reference), 4) if reference else None
+    }
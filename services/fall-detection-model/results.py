@@ -0,0 +1,24 @@
+"""
+Detector results
+The JSON payload of a detection, with the same detections as float32 arrays alongside it
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class DetectionResult(dict):
+    """
+    Result of one image: a plain, JSON serializable dict of the response fields
+
+    The detections are also kept as flat float32 arrays in `arrays` ("boxes"
+    N x 4 xyxy, "scores" N and "keypoints" N x 17 x 3) for the compact
+    response formats and for comparing results numerically. The attribute is
+    not part of the dict, so the result can be returned as JSON as it is.
+    Copying or spreading the dict drops it.
+    """
+
+    def __init__(self, fields: Optional[Dict] = None, arrays: Optional[Dict[str, np.ndarray]] = None):
+        super().__init__(fields or {})
+        self.arrays = arrays
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Compare full-resolution and DCT-reduced JPEG decoding for the model input
+
+Each image is decoded the old way (IMREAD_COLOR, then letterboxed to the
+model input) and through ruth_serving.decode.decode_image (reduced decode, then
+letterboxed), reporting median latency and the tracemalloc peak per call:
+
+    python scripts/benchmark_decode.py snapshot-4k.jpg snapshot-1080p.jpg
+    python scripts/benchmark_decode.py --synthetic 2160x3840,1440x2560,1080x1920
+
+Synthetic images are smooth gradients with noise, encoded at quality 90.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ruth_serving.decode import decode_image, jpeg_size  # noqa: E402
+from preprocess import Preprocessor  # noqa: E402
+from ruth_serving.warmup import parse_shapes  # noqa: E402
+
+
+def synthetic_jpeg(height: int, width: int) -> bytes:
+    """Encode a camera-like test image"""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width]
+    image = np.stack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)], axis=-1)
+    image = np.clip(image + rng.normal(0, 8, image.shape), 0, 255).astype(np.uint8)
+    return cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+
+
+def measure(function, iterations: int):
+    """Median milliseconds and the largest tracemalloc peak over iterations, after one warm-up call"""
+    function()
+    samples, peaks = [], []
+    for _ in range(iterations):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    return {"median_ms": round(statistics.median(samples), 2), "peak_kb": max(peaks) // 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reduced JPEG decoding")
+    parser.add_argument("images", nargs="*", help="JPEG files to decode")
+    parser.add_argument("--synthetic", default="", help="Synthetic image shapes as HEIGHTxWIDTH")
+    parser.add_argument("--img-size", type=int, default=640, help="Model input size for the longer side")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed runs per image")
+    args = parser.parse_args()
+
+    sources = [(path, Path(path).read_bytes()) for path in args.images]
+    sources += [(f"synthetic {h}x{w}", synthetic_jpeg(h, w)) for h, w in parse_shapes(args.synthetic)]
+    if not sources:
+        parser.error("give JPEG files or --synthetic shapes")
+
+    preprocessor = Preprocessor(args.img_size, stride=64)
+    tracemalloc.start()
+    runs = []
+    for name, data in sources:
+        def full():
+            image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+            return preprocessor.batch([image], [preprocessor.plan(image.shape)])
+
+        def reduced():
+            image = decode_image(data, args.img_size).image
+            return preprocessor.batch([image], [preprocessor.plan(image.shape)])
+
+        height, width = jpeg_size(data) or (0, 0)
+        decoded = decode_image(data, args.img_size)
+        before, after = measure(full, args.iterations), measure(reduced, args.iterations)
+        runs.append({
+            "image": name,
+            "size": f"{height}x{width}",
+            "decoded_size": "x".join(str(dim) for dim in decoded.image.shape[:2]),
+            "full": before,
+            "reduced": after,
+            "speedup": round(before["median_ms"] / after["median_ms"], 2),
+            "peak_reduction": round(before["peak_kb"] / max(1, after["peak_kb"]), 2)
+        })
+    tracemalloc.stop()
+
+    print(json.dumps({"img_size": args.img_size, "runs": runs}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
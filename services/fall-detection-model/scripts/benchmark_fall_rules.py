@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark the vectorized fall rules against the per-person dict implementation they replaced
+
+Random poses are generated for each crowd size; the previous implementation
+runs once per person over keypoint dicts, fall_rules.evaluate_fall_rules
+once per frame over the N x 17 x 3 array:
+
+    python scripts/benchmark_fall_rules.py --people 1,10,30,100 --iterations 2000
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fall_rules import evaluate_fall_rules  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+def legacy_analyze_pose_for_fall(keypoints: List[Dict]) -> Tuple[bool, float, Optional[str]]:
+    """
+    Per-person, per-dict fall rules with 640-space pixel thresholds, as FallDetector ran them before fall_rules
+
+    Args:
+        keypoints: List of keypoint dicts with 'x', 'y', 'confidence'
+
+    Returns:
+        Tuple of (is_fall, confidence, fall_type)
+    """
+    try:
+        # Extract key body parts (0-indexed)
+        nose = keypoints[0]
+        left_shoulder = keypoints[5]
+        right_shoulder = keypoints[6]
+        left_hip = keypoints[11]
+        right_hip = keypoints[12]
+        left_knee = keypoints[13]
+        right_knee = keypoints[14]
+        left_ankle = keypoints[15]
+        right_ankle = keypoints[16]
+
+        # Check if key points are visible
+        key_points_visible = [
+            nose['confidence'] > 0.3,
+            left_shoulder['confidence'] > 0.3,
+            right_shoulder['confidence'] > 0.3,
+            left_hip['confidence'] > 0.3,
+            right_hip['confidence'] > 0.3
+        ]
+
+        if not any(key_points_visible):
+            return False, 0.0, None
+
+        # Calculate body orientation
+        if left_shoulder['confidence'] > 0.3 and right_shoulder['confidence'] > 0.3:
+            shoulder_center_y = (left_shoulder['y'] + right_shoulder['y']) / 2
+        else:
+            shoulder_center_y = nose['y'] if nose['confidence'] > 0.3 else 0
+
+        if left_hip['confidence'] > 0.3 and right_hip['confidence'] > 0.3:
+            hip_center_y = (left_hip['y'] + right_hip['y']) / 2
+        else:
+            hip_center_y = shoulder_center_y + 100  # Estimate
+
+        # Fall detection logic
+        fall_indicators = []
+
+        # 1. Check if person is horizontal (body orientation)
+        if abs(shoulder_center_y - hip_center_y) < 50:  # Nearly same height
+            fall_indicators.append(("horizontal_body", 0.8))
+
+        # 2. Check if head is lower than hips
+        if nose['confidence'] > 0.3 and hip_center_y > 0:
+            if nose['y'] > hip_center_y + 20:  # Head below hips
+                fall_indicators.append(("head_below_hips", 0.7))
+
+        # 3. Check limb positions
+        if left_ankle['confidence'] > 0.3 and right_ankle['confidence'] > 0.3:
+            ankle_distance = abs(left_ankle['x'] - right_ankle['x'])
+            if ankle_distance > 100:  # Legs spread wide
+                fall_indicators.append(("legs_spread", 0.6))
+
+        # 4. Overall body compactness (person might be on ground)
+        visible_kpts = [kp for kp in keypoints if kp['confidence'] > 0.3]
+        if len(visible_kpts) > 10:  # Many keypoints visible
+            y_coords = [kp['y'] for kp in visible_kpts]
+            if y_coords:
+                y_range = max(y_coords) - min(y_coords)
+                if y_range < 150:  # Very compact vertically
+                    fall_indicators.append(("compact_body", 0.7))
+
+        # Determine fall status
+        if fall_indicators:
+            max_confidence = max(indicator[1] for indicator in fall_indicators)
+
+            if max_confidence > 0.7:
+                return True, max_confidence, "fall_detected"
+            elif max_confidence > 0.5:
+                return True, max_confidence, "possible_fall"
+
+        return False, 0.0, None
+
+    except Exception as e:
+        logger.error(f"Pose analysis failed: {e}")
+        return False, 0.0, None
+
+
+def random_poses(count: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Random boxes in 640-space with keypoints inside them"""
+    top_left = rng.uniform(0, 400, size=(count, 2))
+    size = rng.uniform(40, 240, size=(count, 2))
+    boxes = np.concatenate([top_left, top_left + size], axis=1).astype(np.float32)
+    keypoints = np.empty((count, 17, 3), dtype=np.float32)
+    keypoints[..., :2] = top_left[:, None] + rng.uniform(0, 1, size=(count, 17, 2)) * size[:, None]
+    keypoints[..., 2] = rng.uniform(0, 1, size=(count, 17))
+    return keypoints, boxes
+
+
+def time_us(function, iterations: int) -> float:
+    """Median microseconds per call"""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fall heuristics")
+    parser.add_argument("--people", default="1,10,30,100", help="Comma separated people per frame")
+    parser.add_argument("--iterations", type=int, default=1000, help="Timed frames per crowd size")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    runs = []
+    for count in [int(c) for c in args.people.split(",") if c.strip()]:
+        keypoints, boxes = random_poses(count, rng)
+        dicts = [[{"x": x, "y": y, "confidence": c} for x, y, c in person] for person in keypoints.tolist()]
+
+        per_dict_us = time_us(lambda: [legacy_analyze_pose_for_fall(person) for person in dicts], args.iterations)
+        vectorized_us = time_us(lambda: evaluate_fall_rules(keypoints, boxes), args.iterations)
+        indicators, _ = evaluate_fall_rules(keypoints, boxes)
+        runs.append({
+            "people": count,
+            "per_dict_us": round(per_dict_us, 1),
+            "vectorized_us": round(vectorized_us, 1),
+            "speedup": round(per_dict_us / vectorized_us, 2),
+            "indicator_rate": indicators.mean(0).round(3).tolist()
+        })
+
+    print(json.dumps({"iterations": args.iterations, "runs": runs}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark the channels-last oneDNN CPU mode against the eager model
+
+Both run the same weights on noise frames at each batch size; the first
+oneDNN call per batch size compiles its module and is reported separately:
+
+    python scripts/benchmark_onednn.py --weights weights/yolov7-w6-pose.pt --batch-sizes 1,4,8
+    python scripts/benchmark_onednn.py --threads 4 --report /tmp/onednn.json
+
+Serve the optimized mode with INFERENCE_BACKEND=onednn.
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ruth_serving.artifacts import load_inference_model  # noqa: E402
+from backends import (  # noqa: E402
+    NMS_CONF_THRES, PARITY_PROBE_CONF_THRES, OneDNNBackend, TorchBackend, compare_outputs, parity_frames
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def time_backend(backend, batch: torch.Tensor, iterations: int):
+    """First call and median milliseconds per batch over the following runs"""
+    started = time.perf_counter()
+    backend.infer(batch, {})
+    first_ms = (time.perf_counter() - started) * 1000
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        backend.infer(batch, {})
+        samples.append((time.perf_counter() - started) * 1000)
+    return first_ms, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the oneDNN CPU mode with eager PyTorch")
+    parser.add_argument("--weights", default="/app/weights/yolov7-w6-pose.pt", help="Training checkpoint")
+    parser.add_argument("--cache-dir", default="", help="Model cache directory (default: fuse in memory)")
+    parser.add_argument("--img-size", type=int, default=640, help="Square model input size")
+    parser.add_argument("--batch-sizes", default="1,4,8", help="Comma separated batch sizes to benchmark")
+    parser.add_argument("--iterations", type=int, default=10, help="Timed runs per batch size")
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0 = torch default)")
+    parser.add_argument("--report", default="", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    weights = Path(args.weights)
+    if not weights.exists():
+        logger.error(f"Weights not found: {weights}")
+        return 1
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    cache_dir = Path(args.cache_dir) if args.cache_dir else None
+
+    # The oneDNN backend converts its model to channels_last in place, so each side loads its own copy
+    eager_model, _ = load_inference_model(weights, cache_dir)
+    onednn_model, _ = load_inference_model(weights, cache_dir)
+    eager = TorchBackend(eager_model.eval())
+    onednn = OneDNNBackend(onednn_model)
+
+    runs = []
+    for batch_size in [int(b) for b in args.batch_sizes.split(",") if b.strip()]:
+        frames = parity_frames(args.img_size, batch_size)
+        _, eager_ms = time_backend(eager, frames, args.iterations)
+        compile_ms, onednn_ms = time_backend(onednn, frames, args.iterations)
+
+        # Compare at the probe threshold so noise frames still yield detections
+        eager.conf_thres = onednn.conf_thres = PARITY_PROBE_CONF_THRES
+        parity = compare_outputs(eager.infer(frames, {}), onednn.infer(frames, {}))
+        eager.conf_thres = onednn.conf_thres = NMS_CONF_THRES
+
+        runs.append({
+            "batch_size": batch_size,
+            "eager_ms": round(eager_ms, 1),
+            "onednn_ms": round(onednn_ms, 1),
+            "onednn_first_call_ms": round(compile_ms, 1),
+            "speedup": round(eager_ms / onednn_ms, 2),
+            "onednn_ms_per_frame": round(onednn_ms / batch_size, 1),
+            "parity_ok": parity["ok"],
+            "max_box_diff": round(parity["max_box_diff"], 4)
+        })
+        logger.info(
+            f"batch {batch_size}: eager {eager_ms:.1f} ms, onednn {onednn_ms:.1f} ms "
+            f"({eager_ms / onednn_ms:.2f}x, first call {compile_ms:.0f} ms), parity {'ok' if parity['ok'] else 'FAILED'}"
+        )
+
+    report = {
+        "weights": str(weights),
+        "img_size": args.img_size,
+        "threads": torch.get_num_threads(),
+        "compiled_shapes": onednn.compiled_shapes,
+        "runs": runs
+    }
+    print(json.dumps(report, indent=2))
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+    return 0 if all(run["parity_ok"] for run in runs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Measure preprocessing latency and per-request memory allocation
+
+Compares the previous preprocessing (letterbox copy, channel flip, contiguous
+copy, float32 copy, in-place /255, concatenation) with the reusable-buffer
+Preprocessor the detector uses, on noise frames of each shape:
+
+    python scripts/benchmark_preprocess.py --shapes 1080x1920,720x1280,640x640 --batch-sizes 1,8
+
+Allocation is traced with tracemalloc, which sees numpy and OpenCV array
+buffers: "peak_kb" is the most memory the call held above what was already
+allocated, "frame_copies" the same in multiples of the float32 model input.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from preprocess import Preprocessor  # noqa: E402
+from utils.datasets import letterbox  # noqa: E402
+from ruth_serving.warmup import parse_batch_sizes, parse_shapes  # noqa: E402
+
+
+def legacy_batch(images, img_size: int, stride: int, rect: bool) -> np.ndarray:
+    """Preprocessing as FallDetector did it before the reusable buffers (numpy instead of torch for the float copy)"""
+    frames = []
+    for image in images:
+        img = letterbox(image, img_size, auto=rect, stride=stride)[0]
+        img = img[:, :, ::-1].transpose(2, 0, 1)
+        img = np.ascontiguousarray(img)
+        img = img.astype(np.float32)
+        img /= 255.0
+        frames.append(img[None])
+    return np.concatenate(frames)
+
+
+def buffered_batch(preprocessor: Preprocessor):
+    def run(images, *_):
+        groups = preprocessor.group(images)
+        return [preprocessor.batch([images[index] for index in indices], plans) for indices, plans in groups]
+    return run
+
+
+def measure(function, images, iterations: int, *args):
+    """Median and p95 milliseconds and tracemalloc peak over iterations, after one warm-up call"""
+    function(images, *args)
+    samples, peaks = [], []
+    for _ in range(iterations):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        result = function(images, *args)
+        samples.append((time.perf_counter() - started) * 1000)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        del result
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "peak_kb": max(peaks) // 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fall detection preprocessing")
+    parser.add_argument("--shapes", default="1080x1920,720x1280,640x640", help="Frame shapes as HEIGHTxWIDTH")
+    parser.add_argument("--batch-sizes", default="1,8", help="Comma separated batch sizes")
+    parser.add_argument("--img-size", type=int, default=640, help="Model input size for the longer side")
+    parser.add_argument("--stride", type=int, default=64, help="Model stride")
+    parser.add_argument("--square", action="store_true", help="Letterbox to squares (onnxruntime/torchscript)")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed runs per combination")
+    args = parser.parse_args()
+
+    rect = not args.square
+    preprocessor = Preprocessor(args.img_size, args.stride, rect)
+    rng = np.random.default_rng(0)
+    tracemalloc.start()
+
+    runs = []
+    for height, width in parse_shapes(args.shapes):
+        frame = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        input_height, input_width = preprocessor.plan(frame.shape).input_shape
+        input_kb = 3 * input_height * input_width * 4 / 1024
+        for batch_size in parse_batch_sizes(args.batch_sizes):
+            images = [frame.copy() for _ in range(batch_size)]
+            expected = legacy_batch(images, args.img_size, args.stride, rect)
+            actual = buffered_batch(preprocessor)(images)[0]
+            run = {
+                "shape": f"{height}x{width}",
+                "input_shape": f"{input_height}x{input_width}",
+                "batch_size": batch_size,
+                "max_abs_diff": float(np.abs(expected - actual).max()),
+                "before": measure(legacy_batch, images, args.iterations, args.img_size, args.stride, rect),
+                "after": measure(buffered_batch(preprocessor), images, args.iterations)
+            }
+            for key in ("before", "after"):
+                run[key]["frame_copies"] = round(run[key]["peak_kb"] / (input_kb * batch_size), 2)
+            runs.append(run)
+
+    tracemalloc.stop()
+    print(json.dumps({"img_size": args.img_size, "rect": rect, "runs": runs}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Build the fused fall detection model artifact ahead of time
+
+Run this in CI, an init container or right after placing new weights so the
+first service start does not pay for the fusion:
+
+    python scripts/compile_model.py --weights weights/yolov7-w6-pose.pt --cache-dir /app/cache
+
+With --torchscript it also traces, freezes and verifies the TorchScript
+module used by INFERENCE_BACKEND=torchscript for the given input size.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ruth_serving.artifacts import artifact_path, compile_artifact, load_artifact, weights_sha256  # noqa: E402
+from backends import (  # noqa: E402
+    ParityError, TorchBackend, compile_torchscript, load_torchscript, parity_frames, torchscript_artifact_path
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a fused, memory-mappable fall detection model artifact")
+    parser.add_argument("--weights", default="/app/weights/yolov7-w6-pose.pt", help="Training checkpoint")
+    parser.add_argument("--cache-dir", default="/app/cache", help="Artifact cache directory")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the artifact exists")
+    parser.add_argument("--torchscript", action="store_true", help="Also build the frozen TorchScript module")
+    parser.add_argument("--img-size", type=int, default=640, help="Input size the TorchScript module is traced at")
+    args = parser.parse_args()
+
+    weights = Path(args.weights)
+    if not weights.exists():
+        logger.error(f"Weights not found: {weights}")
+        return 1
+
+    cache_dir = Path(args.cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    sha256 = weights_sha256(weights, cache_dir)
+    path = artifact_path(weights, cache_dir, sha256)
+
+    if path.exists() and not args.force:
+        logger.info(f"Artifact already up to date: {path}")
+    else:
+        compile_artifact(weights, path)
+
+    # Time a cold load of both formats for comparison
+    from models.experimental import attempt_load
+
+    started = time.perf_counter()
+    attempt_load(str(weights), map_location="cpu")
+    checkpoint_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    load_artifact(path)
+    artifact_seconds = time.perf_counter() - started
+
+    logger.info(f"Checkpoint load + fuse: {checkpoint_seconds:.2f}s, fused artifact load: {artifact_seconds:.2f}s")
+
+    if args.torchscript:
+        script_path = torchscript_artifact_path(weights, cache_dir, sha256, args.img_size)
+        model = load_artifact(path)
+        if script_path.exists() and not args.force:
+            logger.info(f"TorchScript module already up to date: {script_path}")
+        else:
+            try:
+                compile_torchscript(model, script_path, args.img_size)
+            except ParityError as e:
+                logger.error(str(e))
+                return 1
+
+        # Compare the eager and frozen forward passes at batch size 1
+        frames = parity_frames(args.img_size, 1)
+        for name, backend in (("eager", TorchBackend(model)), ("torchscript", TorchBackend(load_torchscript(script_path)))):
+            backend.infer(frames, {})
+            timings = {}
+            for _ in range(5):
+                backend.infer(frames, timings)
+            logger.info(f"{name} forward: {timings['forward'] / 5:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Export the fall detection model to ONNX with NMS embedded and verify it
+
+The graph is exported into the model cache (where the onnxruntime backend
+looks for it), compared against the eager model and benchmarked:
+
+    python scripts/export_onnx.py --weights weights/yolov7-w6-pose.pt --cache-dir /app/cache
+    python scripts/export_onnx.py --images samples/ --batch-sizes 1,4,8 --threads 4
+
+Exits non-zero if the exported graph does not match the eager model.
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ruth_serving.artifacts import load_inference_model, weights_sha256  # noqa: E402
+from backends import (  # noqa: E402
+    OnnxRuntimeBackend, ParityError, TorchBackend, build_onnx, check_parity, onnx_artifact_path, parity_frames
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def load_images(directory: Path, img_size: int) -> torch.Tensor:
+    """Read and resize every image in a directory into a preprocessed batch"""
+    frames = []
+    for path in sorted(directory.iterdir()):
+        image = cv2.imread(str(path))
+        if image is None:
+            continue
+        image = cv2.resize(image, (img_size, img_size))
+        frames.append(np.ascontiguousarray(image[:, :, ::-1].transpose(2, 0, 1)))
+    if not frames:
+        raise ValueError(f"No readable images in {directory}")
+    return torch.from_numpy(np.stack(frames)).float() / 255.0
+
+
+def time_backend(backend, batch: torch.Tensor, iterations: int) -> float:
+    """Median milliseconds per batch after one warm-up run"""
+    backend.infer(batch, {})
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        backend.infer(batch, {})
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and verify the ONNX Runtime fall detection graph")
+    parser.add_argument("--weights", default="/app/weights/yolov7-w6-pose.pt", help="Training checkpoint")
+    parser.add_argument("--cache-dir", default="/app/cache", help="Model cache directory")
+    parser.add_argument("--img-size", type=int, default=640, help="Square model input size")
+    parser.add_argument("--images", default="", help="Directory of images for the parity check (default: noise)")
+    parser.add_argument("--force", action="store_true", help="Re-export even if the graph exists")
+    parser.add_argument("--batch-sizes", default="1,4", help="Comma separated batch sizes to benchmark")
+    parser.add_argument("--iterations", type=int, default=10, help="Timed runs per batch size")
+    parser.add_argument("--threads", type=int, default=0, help="Threads for both backends (0 = torch default)")
+    args = parser.parse_args()
+
+    weights = Path(args.weights)
+    if not weights.exists():
+        logger.error(f"Weights not found: {weights}")
+        return 1
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    cache_dir = Path(args.cache_dir)
+    model, _ = load_inference_model(weights, cache_dir)
+    model.eval()
+    path = onnx_artifact_path(weights, cache_dir, weights_sha256(weights, cache_dir), args.img_size)
+    batch = load_images(Path(args.images), args.img_size) if args.images else parity_frames(args.img_size)
+
+    try:
+        if path.exists() and not args.force:
+            logger.info(f"ONNX graph already exported: {path}")
+            report = check_parity(model, path, batch)
+            logger.info(f"ONNX parity: {report}")
+            if not report["ok"]:
+                raise ParityError(f"Exported graph does not match the eager model: {report}")
+        else:
+            build_onnx(model, path, args.img_size, batch)
+    except ParityError as e:
+        logger.error(str(e))
+        return 1
+
+    eager = TorchBackend(model)
+    onnx = OnnxRuntimeBackend(path, intra_op_threads=args.threads)
+    for batch_size in [int(b) for b in args.batch_sizes.split(",") if b.strip()]:
+        frames = parity_frames(args.img_size, batch_size)
+        eager_ms = time_backend(eager, frames, args.iterations)
+        onnx_ms = time_backend(onnx, frames, args.iterations)
+        logger.info(
+            f"batch {batch_size}: torch {eager_ms:.1f} ms, onnxruntime {onnx_ms:.1f} ms "
+            f"({eager_ms / onnx_ms:.2f}x), {onnx_ms / batch_size:.1f} ms/frame"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Measure import time and resident memory of the serving import path
+
+Each module is imported in a fresh interpreter, reporting wall time, RSS
+growth over a bare interpreter and which heavy training/plotting libraries
+ended up loaded. Run it against two checkouts to compare before and after:
+
+    python scripts/measure_imports.py                       # this checkout
+    python scripts/measure_imports.py --path /tmp/baseline  # another checkout
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional, Tuple
+
+# Libraries the vendored YOLOv7 tree used to import that a serving process never needs.
+# PIL and tqdm are not listed: torchvision and torch.hub load them on any torch import.
+HEAVY_MODULES = ["matplotlib", "pandas", "seaborn", "scipy", "requests"]
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {path!r})
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+baseline = rss_kb()
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_mb": (rss_kb() - baseline) / 1024,
+    "heavy": sorted(m for m in {heavy!r} if m in sys.modules),
+    "modules": len(sys.modules)
+}}))
+"""
+
+
+def measure(path: Path, module: str, runs: int):
+    results = []
+    for _ in range(runs):
+        code = PROBE.format(path=str(path), module=module, heavy=HEAVY_MODULES)
+        output = subprocess.run([sys.executable, "-c", code], cwd=path, capture_output=True, text=True)
+        if output.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{output.stderr}")
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    # Report the fastest run; later runs benefit from a warm file cache like a real restart would
+    return min(results, key=lambda r: r["seconds"])
+
+
+def parse_importtime_line(line: str) -> Optional[Tuple[int, int, str]]:
+    """
+    Parse one line of python -X importtime output
+
+    Lines look like "import time:       312 |       1204 |   json.decoder".
+
+    Returns:
+        (self_us, cumulative_us, name), or None for the header and other stderr lines
+    """
+    prefix = "import time:"
+    if not line.startswith(prefix):
+        return None
+    fields = [part.strip() for part in line[len(prefix):].split("|")]
+    if len(fields) != 3 or not fields[0].isdigit():
+        return None
+    self_us, cumulative_us, name = fields
+    return int(self_us), int(cumulative_us), name
+
+
+def slowest_imports(path: Path, module: str, count: int):
+    """Top cumulative entries from python -X importtime"""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {str(path)!r}); import {module}"],
+        cwd=path, capture_output=True, text=True
+    )
+    rows = []
+    for line in output.stderr.splitlines():
+        parsed = parse_importtime_line(line)
+        if parsed is not None:
+            rows.append((parsed[1], parsed[2]))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure serving import time and memory")
+    parser.add_argument("--path", default=str(Path(__file__).resolve().parent.parent),
+                        help="Service checkout to measure")
+    parser.add_argument("--modules", default="detector,app", help="Comma separated modules to import")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    path = Path(args.path).resolve()
+    failed = False
+    for module in [m.strip() for m in args.modules.split(",") if m.strip()]:
+        result = measure(path, module, args.runs)
+        print(f"import {module}: {result['seconds'] * 1000:.0f} ms, +{result['rss_mb']:.0f} MB RSS, "
+              f"{result['modules']} modules")
+        if result["heavy"]:
+            failed = True
+            print(f"  heavy libraries loaded: {', '.join(result['heavy'])}")
+        for cumulative_us, name in slowest_imports(path, module, args.top):
+            print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
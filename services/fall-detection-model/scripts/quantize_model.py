@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Build the INT8 fall detection graph and report its accuracy and latency against FP32
+
+Calibrates on a folder of representative camera frames, then runs the FP32
+and INT8 onnxruntime graphs on a held-out folder:
+
+    python scripts/quantize_model.py --calibration frames/calib --holdout frames/holdout \\
+        --report /app/cache/int8-report.json
+
+Serve the result with INFERENCE_BACKEND=onnxruntime INFERENCE_PRECISION=int8
+once the report is acceptable for the deployment.
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ruth_serving.artifacts import weights_sha256  # noqa: E402
+from backends import onnx_artifact_path  # noqa: E402
+from detector import FallDetector  # noqa: E402
+from quantization import CALIBRATION_METHODS, FrameCalibrationReader, compare_results, load_frames, quantize_onnx  # noqa: E402
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def run_frames(detector: FallDetector, source: str, limit: int):
+    """Detect on every held-out frame one at a time; returns results and forward pass times (ms)"""
+    results, forward_ms = [], []
+    for _, frame in load_frames(source, limit):
+        result = detector.detect_batch([frame])[0]
+        if "error" in result:
+            raise RuntimeError(f"Detection failed: {result['error']}")
+        results.append(result)
+        forward_ms.append(result["timings"]["forward"])
+    return results, forward_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="INT8 post-training quantization of the fall detection model")
+    parser.add_argument("--weights", default="/app/weights/yolov7-w6-pose.pt", help="Training checkpoint")
+    parser.add_argument("--cache-dir", default="/app/cache", help="Model cache directory")
+    parser.add_argument("--img-size", type=int, default=640, help="Square model input size")
+    parser.add_argument("--calibration", required=True, help="Folder (or glob) of representative frames")
+    parser.add_argument("--holdout", required=True, help="Folder (or glob) of frames for the accuracy report")
+    parser.add_argument("--calibration-frames", type=int, default=200, help="Maximum calibration frames (0 = all)")
+    parser.add_argument("--holdout-frames", type=int, default=0, help="Maximum held-out frames (0 = all)")
+    parser.add_argument("--method", default="minmax", choices=CALIBRATION_METHODS, help="Calibration method")
+    parser.add_argument("--reduce-range", action="store_true", help="7-bit weights for CPUs without VNNI")
+    parser.add_argument("--force", action="store_true", help="Quantize again even if the INT8 graph exists")
+    parser.add_argument("--report", default="", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    weights = Path(args.weights)
+    if not weights.exists():
+        logger.error(f"Weights not found: {weights}")
+        return 1
+    cache_dir = Path(args.cache_dir)
+
+    # Exports and verifies the FP32 graph against the eager model if needed
+    fp32 = FallDetector(str(weights), img_size=args.img_size, cache_dir=str(cache_dir), backend="onnxruntime")
+    if fp32.backend_name != "onnxruntime":
+        logger.error("The FP32 onnxruntime graph could not be built, see the log above")
+        return 1
+
+    int8_path = onnx_artifact_path(weights, cache_dir, weights_sha256(weights, cache_dir), args.img_size, "int8")
+    if int8_path.exists() and not args.force:
+        logger.info(f"INT8 graph already built: {int8_path}")
+    else:
+        reader = FrameCalibrationReader(args.calibration, fp32._preprocess_image, limit=args.calibration_frames)
+        quantize_onnx(fp32.compiled_path, int8_path, reader, method=args.method, reduce_range=args.reduce_range)
+
+    int8 = FallDetector(str(weights), img_size=args.img_size, cache_dir=str(cache_dir), backend="onnxruntime",
+                        precision="int8")
+    if int8.precision != "int8":
+        logger.error("The INT8 graph could not be loaded, see the log above")
+        return 1
+
+    reference, fp32_ms = run_frames(fp32, args.holdout, args.holdout_frames)
+    candidate, int8_ms = run_frames(int8, args.holdout, args.holdout_frames)
+
+    # The first run of each session includes its creation and warm-up
+    fp32_median = statistics.median(fp32_ms[1:] or fp32_ms)
+    int8_median = statistics.median(int8_ms[1:] or int8_ms)
+    report = {
+        "weights": str(weights),
+        "int8_model": str(int8_path),
+        "calibration_method": args.method,
+        "reduce_range": args.reduce_range,
+        "accuracy": compare_results(reference, candidate),
+        "latency": {
+            "fp32_forward_ms": round(fp32_median, 2),
+            "int8_forward_ms": round(int8_median, 2),
+            "speedup": round(fp32_median / int8_median, 2) if int8_median else None
+        },
+        "model_size_mb": {
+            "fp32": round(fp32.compiled_path.stat().st_size / 1e6, 1),
+            "int8": round(int8_path.stat().st_size / 1e6, 1)
+        }
+    }
+    print(json.dumps(report, indent=2))
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Response serialization for fall detection results
+Verbose JSON by default, or compact columnar float32 arrays chosen via the Accept header
+"""
+
+import base64
+import json
+import struct
+from typing import Dict, Optional
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import msgpack  # optional, enables application/x-msgpack responses
+except ImportError:
+    msgpack = None
+
+# Compact base64 JSON: arrays as base64 encoded little-endian float32
+COMPACT_JSON = "application/vnd.ruth.compact+json"
+MSGPACK = "application/x-msgpack"
+# Raw binary: uint32 header length, JSON header, then the float32 arrays back to back
+BINARY = "application/octet-stream"
+
+SUMMARY_FIELDS = (
+    "success", "model", "status", "violation_detected", "violation_type", "severity",
+    "confidence", "detection_count", "model_name", "model_version", "error"
+)
+
+
+def summary_result(result: Dict) -> Dict:
+    """Keep only the verdict fields of a result"""
+    return {key: result[key] for key in SUMMARY_FIELDS if key in result}
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """Pick the response media type from an Accept header"""
+    accept = (accept or "").lower()
+    for media_type in (COMPACT_JSON, MSGPACK, BINARY):
+        if media_type in accept:
+            return media_type
+    return "application/json"
+
+
+def _columns(result: Dict, summary_only: bool) -> Dict:
+    """Select the float32 arrays to send, in wire order"""
+    arrays = getattr(result, "arrays", None) or {}
+    names = ("boxes", "scores") if summary_only else ("boxes", "scores", "keypoints")
+    return {name: arrays[name] for name in names if name in arrays}
+
+
+def _layout(columns: Dict) -> Dict:
+    return {name: {"dtype": "float32", "shape": list(array.shape)} for name, array in columns.items()}
+
+
+def render_result(result: Dict, accept: Optional[str], summary_only: bool = False) -> Response:
+    """
+    Serialize a detector result in the format requested by the client
+
+    Args:
+        result: Detector result, optionally a DetectionResult carrying its arrays
+        accept: Value of the request's Accept header
+        summary_only: Return only the verdict, without per-person keypoints
+
+    Returns:
+        Response in JSON, compact base64 JSON, msgpack or raw binary form
+    """
+    media_type = negotiate_format(accept)
+
+    if media_type == "application/json":
+        if summary_only:
+            return JSONResponse(summary_result(result))
+        return JSONResponse(result)
+
+    summary = summary_result(result)
+    columns = _columns(result, summary_only)
+
+    if media_type == COMPACT_JSON:
+        payload = {
+            **summary,
+            "layout": _layout(columns),
+            **{name: base64.b64encode(array.astype("<f4", copy=False).tobytes()).decode("ascii")
+               for name, array in columns.items()}
+        }
+        return Response(json.dumps(payload), media_type=COMPACT_JSON)
+
+    if media_type == MSGPACK:
+        if msgpack is None:
+            return JSONResponse(status_code=406, content={"detail": "msgpack is not installed on this server"})
+        payload = {
+            **summary,
+            "layout": _layout(columns),
+            **{name: array.astype("<f4", copy=False).tobytes() for name, array in columns.items()}
+        }
+        return Response(msgpack.packb(payload, use_bin_type=True), media_type=MSGPACK)
+
+    header = json.dumps({**summary, "layout": _layout(columns)}).encode("utf-8")
+    body = b"".join(
+        [struct.pack("<I", len(header)), header] +
+        [array.astype("<f4", copy=False).tobytes() for array in columns.values()]
+    )
+    return Response(body, media_type=BINARY)
@@ -0,0 +1,107 @@
+"""
+Fall Detection Model Service launcher
+Runs the API in one process, or in pre-fork mode where the model is loaded
+once in a parent process and shared with N worker processes
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+
+import torch
+import uvicorn
+
+import app as service
+from workers import WorkerStats
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+WORKERS = int(os.getenv("WORKERS", "1"))
+THREADS_PER_WORKER = int(os.getenv("THREADS_PER_WORKER", "0")) or max(1, (os.cpu_count() or 1) // max(1, WORKERS))
+
+
+def _worker_main(index: int, sock: socket.socket, stats: WorkerStats):
+    """Entry point of a forked worker: set its thread budget and serve on the shared socket"""
+    torch.set_num_threads(THREADS_PER_WORKER)
+    stats.register(index, os.getpid())
+    service.worker_index = index
+    service.worker_stats = stats
+
+    config = uvicorn.Config(service.app, host=HOST, port=PORT, log_level="info")
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+def _spawn(ctx, index: int, sock: socket.socket, stats: WorkerStats):
+    process = ctx.Process(target=_worker_main, args=(index, sock, stats), name=f"fall-worker-{index}")
+    process.start()
+    logger.info(f"Started worker {index} (pid {process.pid}, {THREADS_PER_WORKER} threads)")
+    return process
+
+
+def run_prefork():
+    """Load the model once, then fork workers that inherit it"""
+    # Keep the parent single-threaded so no OpenMP pool exists at fork time
+    torch.set_num_threads(1)
+
+    detector = service.load_model()
+    if detector is not None and detector.model is not None and detector.artifact_path is None:
+        # Move parameters into shared memory so workers map the same pages
+        # instead of copying them on first write (e.g. refcount touches).
+        # Weights memory-mapped from a fused artifact are already file backed.
+        detector.model.share_memory()
+        logger.info("Model weights moved to shared memory")
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((HOST, PORT))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    ctx = multiprocessing.get_context("fork")
+    stats = WorkerStats(WORKERS, THREADS_PER_WORKER)
+    processes = [_spawn(ctx, index, sock, stats) for index in range(WORKERS)]
+
+    stopping = False
+
+    def handle_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+
+    # Restart workers that die; they re-inherit the already loaded model
+    while not stopping:
+        for index, process in enumerate(processes):
+            if not process.is_alive() and not stopping:
+                logger.warning(f"Worker {index} exited with code {process.exitcode}, restarting")
+                processes[index] = _spawn(ctx, index, sock, stats)
+        time.sleep(1)
+
+    for process in processes:
+        process.join(timeout=30)
+    sock.close()
+
+
+def main():
+    if WORKERS <= 1:
+        uvicorn.run(service.app, host=HOST, port=PORT)
+    else:
+        logger.info(f"Starting {WORKERS} pre-fork workers with {THREADS_PER_WORKER} threads each")
+        run_prefork()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Per-camera streaming sessions
+Holds the latest unprocessed frame and recent results for one live camera connection
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+
+class SessionClosed(Exception):
+    """Raised when waiting for a frame on a session whose client disconnected"""
+
+
+class CameraSession:
+    """
+    State for one camera streaming frames over a persistent connection
+
+    Only the most recent unprocessed frame is kept. When the client sends
+    frames faster than the model can process them, older frames are dropped
+    instead of queueing up latency. Recent verdicts stay with the session so
+    temporal logic can use them without external lookups.
+    """
+
+    def __init__(self, camera_id: str, history_size: int = 30):
+        """
+        Initialize the session
+
+        Args:
+            camera_id: Identifier of the camera streaming on this connection
+            history_size: Number of recent per-frame verdicts to keep
+        """
+        self.camera_id = camera_id
+        self.connected_at = time.time()
+        self.frame_shape: Optional[str] = None  # set for raw frames, None for encoded images
+
+        self.frames_received = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+
+        self.last_result: Optional[Dict] = None
+        self.last_detections: list = []
+        self.history: Deque[Dict] = deque(maxlen=history_size)
+
+        self._pending: Optional[Tuple[int, bytes]] = None
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    def offer(self, frame: bytes):
+        """Store a newly received frame, dropping the previous one if it was never processed"""
+        self.frames_received += 1
+        if self._pending is not None:
+            self.frames_dropped += 1
+        self._pending = (self.frames_received, frame)
+        self._ready.set()
+
+    async def next_frame(self) -> Tuple[int, bytes]:
+        """
+        Wait for the latest unprocessed frame
+
+        Returns:
+            Tuple of (frame sequence number, frame bytes)
+
+        Raises:
+            SessionClosed: If the client disconnected
+        """
+        while self._pending is None:
+            if self._closed:
+                raise SessionClosed(self.camera_id)
+            self._ready.clear()
+            await self._ready.wait()
+
+        frame, self._pending = self._pending, None
+        return frame
+
+    def record(self, sequence: int, result: Dict):
+        """Remember the result of a processed frame"""
+        self.frames_processed += 1
+        self.last_result = result
+        self.last_detections = result.get("detections", [])
+        self.history.append({
+            "frame": sequence,
+            "timestamp": time.time(),
+            "violation_detected": result.get("violation_detected", False),
+            "violation_type": result.get("violation_type"),
+            "confidence": result.get("confidence", 0.0)
+        })
+
+    def close(self):
+        """Mark the session closed and wake up any waiting consumer"""
+        self._closed = True
+        self._ready.set()
+
+    def stats(self) -> Dict:
+        """Return counters and the most recent verdict for this session"""
+        return {
+            "camera_id": self.camera_id,
+            "connected_seconds": round(time.time() - self.connected_at, 1),
+            "frames_received": self.frames_received,
+            "frames_processed": self.frames_processed,
+            "frames_dropped": self.frames_dropped,
+            "last_detection_count": len(self.last_detections),
+            "last_verdict": self.history[-1] if self.history else None
+        }
@@ -0,0 +1,130 @@
+"""
+Tests for the vectorized fall heuristics
+"""
+
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from fall_rules import FALL_INDICATORS, evaluate_fall_rules, fall_verdict  # noqa: E402
+from scripts.benchmark_fall_rules import legacy_analyze_pose_for_fall, random_poses  # noqa: E402
+
+# COCO keypoints: nose, eyes, ears, shoulders, elbows, wrists, hips, knees, ankles
+STANDING = [
+    (250, 110), (245, 105), (255, 105), (240, 108), (260, 108),
+    (230, 170), (270, 170), (225, 230), (275, 230), (222, 290), (278, 290),
+    (238, 290), (262, 290), (240, 390), (260, 390), (240, 490), (260, 490),
+]
+LYING = [
+    (120, 435), (115, 430), (115, 440), (110, 428), (110, 442),
+    (150, 440), (150, 450), (200, 420), (200, 470), (250, 415), (250, 475),
+    (300, 445), (300, 450), (400, 445), (400, 452), (480, 450), (490, 455),
+]
+HEAD_DOWN = [
+    (250, 400), (245, 405), (255, 405), (240, 402), (260, 402),
+    (230, 300), (270, 300), (225, 350), (275, 350), (222, 420), (278, 420),
+    (238, 150), (262, 150), (240, 120), (260, 120), (240, 110), (260, 110),
+]
+LEGS_SPREAD = [
+    (250, 110), (245, 105), (255, 105), (240, 108), (260, 108),
+    (230, 170), (270, 170), (225, 230), (275, 230), (222, 290), (278, 290),
+    (238, 290), (262, 290), (200, 390), (300, 390), (170, 490), (330, 490),
+]
+POSES = {
+    "standing": (STANDING, (200, 100, 300, 500), []),
+    "lying": (LYING, (100, 400, 500, 480), ["horizontal_body", "compact_body"]),
+    "head_down": (HEAD_DOWN, (200, 100, 300, 500), ["head_below_hips"]),
+    "legs_spread": (LEGS_SPREAD, (150, 100, 350, 500), ["legs_spread"]),
+}
+
+
+def as_arrays(names, confidence=0.9):
+    keypoints = np.array([[(x, y, confidence) for x, y in POSES[name][0]] for name in names], dtype=np.float32)
+    boxes = np.array([POSES[name][1] for name in names], dtype=np.float32)
+    return keypoints, boxes
+
+
+def as_dicts(keypoints):
+    return [{"x": float(x), "y": float(y), "confidence": float(c)} for x, y, c in keypoints]
+
+
+def triggered(row):
+    return [name for name, hit in zip(FALL_INDICATORS, row) if hit]
+
+
+@pytest.mark.parametrize("name", list(POSES))
+def test_constructed_poses_trigger_the_expected_rules(name):
+    indicators, _ = evaluate_fall_rules(*as_arrays([name]))
+    assert triggered(indicators[0]) == POSES[name][2]
+
+
+def test_matches_the_legacy_rules_on_constructed_poses():
+    names = list(POSES)
+    keypoints, boxes = as_arrays(names)
+    _, confidences = evaluate_fall_rules(keypoints, boxes)
+
+    for name, person, confidence in zip(names, keypoints, confidences):
+        is_fall, legacy_confidence, legacy_type = legacy_analyze_pose_for_fall(as_dicts(person))
+        assert fall_verdict(confidence) == legacy_type, name
+        assert (fall_verdict(confidence) is not None) == is_fall, name
+        if is_fall:
+            assert confidence == pytest.approx(legacy_confidence), name
+
+
+def test_people_are_evaluated_independently():
+    keypoints, boxes = random_poses(50, np.random.default_rng(0))
+    indicators, confidences = evaluate_fall_rules(keypoints, boxes)
+
+    assert indicators.shape == (50, len(FALL_INDICATORS)) and confidences.shape == (50,)
+    for index in range(50):
+        single, confidence = evaluate_fall_rules(keypoints[index:index + 1], boxes[index:index + 1])
+        np.testing.assert_array_equal(single[0], indicators[index])
+        assert confidence[0] == confidences[index]
+
+
+def test_rules_do_not_depend_on_resolution_or_position():
+    keypoints, boxes = as_arrays(list(POSES))
+    expected, _ = evaluate_fall_rules(keypoints, boxes)
+
+    for scale, shift in ((0.5, 0.0), (3.0, 0.0), (1.0, 700.0)):
+        moved = keypoints.copy()
+        moved[..., :2] = moved[..., :2] * scale + shift
+        indicators, _ = evaluate_fall_rules(moved, boxes * scale + shift)
+        np.testing.assert_array_equal(indicators, expected)
+
+
+def test_people_without_visible_anchors_never_fall():
+    keypoints, boxes = as_arrays(["lying"])
+    keypoints[0, [0, 5, 6, 11, 12], 2] = 0.1
+    indicators, confidences = evaluate_fall_rules(keypoints, boxes)
+    assert not indicators.any() and confidences[0] == 0.0
+    assert legacy_analyze_pose_for_fall(as_dicts(keypoints[0]))[0] is False
+
+
+def test_no_people():
+    indicators, confidences = evaluate_fall_rules(np.zeros((0, 17, 3)), np.zeros((0, 4)))
+    assert indicators.shape == (0, len(FALL_INDICATORS)) and confidences.shape == (0,)
+
+
+@pytest.mark.parametrize("confidence, verdict", [(0.8, "fall_detected"), (0.7, "possible_fall"), (0.6, "possible_fall"),
+                                                 (0.5, None), (0.0, None)])
+def test_fall_verdict(confidence, verdict):
+    assert fall_verdict(confidence) == verdict
+
+
+def test_detector_results_are_json_with_arrays_alongside():
+    pytest.importorskip("torch")
+    pytest.importorskip("torchvision")
+    from detector import FallDetector
+
+    keypoints, boxes = as_arrays(["lying", "standing"])
+    arrays = {"boxes": boxes, "scores": np.array([0.9, 0.8], dtype=np.float32), "keypoints": keypoints}
+    detections = [{"bbox": box, "keypoints": as_dicts(person)} for box, person in zip(boxes.tolist(), keypoints)]
+
+    result = FallDetector.__new__(FallDetector)._build_result(detections, arrays)
+    assert json.loads(json.dumps(result)) == result
+    assert result["violation_type"] == "fall_detected"
+    assert [d["fall_indicators"] for d in result["detections"]] == [POSES["lying"][2], []]
+    assert result.arrays is arrays
@@ -0,0 +1,22 @@
+"""
+Tests for the import measurement script
+"""
+
+import subprocess
+import sys
+
+from scripts.measure_imports import parse_importtime_line
+
+
+def test_parses_importtime_lines():
+    assert parse_importtime_line("import time:       312 |       1204 |   json.decoder") == (312, 1204, "json.decoder")
+    assert parse_importtime_line("import time: self [us] | cumulative | imported package") is None
+    assert parse_importtime_line("Traceback (most recent call last):") is None
+
+
+def test_parses_real_importtime_output():
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import json"], capture_output=True, text=True)
+    rows = [parse_importtime_line(line) for line in output.stderr.splitlines()]
+    names = {row[2].strip() for row in rows if row is not None}
+    assert "json" in names
+    assert all(row is None or row[1] >= row[0] for row in rows)
@@ -0,0 +1,113 @@
+"""
+Tests for letterbox planning and frame preprocessing
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+
+from preprocess import LETTERBOX_COLOR, Preprocessor, letterbox_plan  # noqa: E402
+from utils.datasets import letterbox  # noqa: E402
+from utils.general import scale_coords  # noqa: E402
+from utils.keypoints import scale_keypoints  # noqa: E402
+
+SHAPES = [(640, 640), (360, 640), (720, 1280), (1080, 1920), (2160, 3840), (480, 640), (1920, 1080), (333, 517), (50, 900)]
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("stride", [32, 64])
+@pytest.mark.parametrize("auto", [True, False])
+def test_letterbox_plan_matches_letterbox(shape, stride, auto):
+    frame = np.zeros((*shape, 3), dtype=np.uint8)
+    image, ratio, pad = letterbox(frame, 640, auto=auto, stride=stride)
+    plan = letterbox_plan(frame.shape, 640, stride, auto=auto)
+
+    assert plan.input_shape == image.shape[:2]
+    assert plan.ratio_pad == (ratio, pad)
+    if auto:
+        assert plan.input_shape[0] % stride == 0 and plan.input_shape[1] % stride == 0
+    else:
+        assert plan.input_shape == (640, 640)
+
+    # The frame lands exactly where letterbox puts it: non-gray pixels only inside the plan's region
+    frame[...] = 255
+    image = letterbox(frame, 640, auto=auto, stride=stride)[0]
+    (top, left), (height, width) = plan.offset, plan.resized
+    assert (image[top:top + height, left:left + width] == 255).all()
+    assert (image == 255).all(axis=2).sum() == height * width
+
+
+def test_sixteen_by_nine_frames_share_one_rectangular_input():
+    assert {letterbox_plan(shape, 640, 64).input_shape for shape in [(720, 1280), (1080, 1920), (2160, 3840)]} == {(384, 640)}
+
+
+@pytest.mark.parametrize("shape", [(720, 1280), (1080, 1920), (333, 517), (1920, 1080)])
+def test_ratio_pad_maps_detections_back_to_source_pixels(shape):
+    plan = letterbox_plan(shape, 640, 64)
+    (gain, _), (pad_w, pad_h) = plan.ratio_pad
+    source = torch.tensor([[10.0, 20.0, shape[1] - 30.0, shape[0] - 40.0]])
+    keypoints = torch.tensor([[15.0, 25.0, 0.9] * 17])
+
+    boxes = source.clone()
+    boxes[:, [0, 2]] = boxes[:, [0, 2]] * gain + pad_w
+    boxes[:, [1, 3]] = boxes[:, [1, 3]] * gain + pad_h
+    mapped = keypoints.clone()
+    mapped[:, 0::3] = mapped[:, 0::3] * gain + pad_w
+    mapped[:, 1::3] = mapped[:, 1::3] * gain + pad_h
+
+    scale_coords(plan.input_shape, boxes, shape, plan.ratio_pad)
+    scale_keypoints(plan.input_shape, mapped, shape, plan.ratio_pad)
+    torch.testing.assert_close(boxes, source)
+    torch.testing.assert_close(mapped, keypoints)
+
+
+def legacy_input(image, stride, rect):
+    """One frame preprocessed the way FallDetector did before the reusable buffers"""
+    img = letterbox(image, 640, auto=rect, stride=stride)[0]
+    img = np.ascontiguousarray(img[:, :, ::-1].transpose(2, 0, 1)).astype(np.float32)
+    return img / 255.0
+
+
+@pytest.mark.parametrize("rect", [True, False])
+def test_batch_matches_the_legacy_preprocessing(rect):
+    rng = np.random.default_rng(0)
+    preprocessor = Preprocessor(640, 64, rect)
+    images = [rng.integers(0, 256, size=(*shape, 3), dtype=np.uint8) for shape in [(720, 1280), (1080, 1920), (384, 640)]]
+
+    for indices, plans in preprocessor.group(images):
+        batch = preprocessor.batch([images[index] for index in indices], plans)
+        assert batch.dtype == np.float32 and batch.shape[0] == len(indices)
+        for slot, index in zip(batch, indices):
+            np.testing.assert_allclose(slot, legacy_input(images[index], 64, rect), atol=1e-6)
+
+
+def test_group_keeps_order_within_each_input_shape():
+    preprocessor = Preprocessor(640, 64)
+    images = [np.zeros((*shape, 3), dtype=np.uint8) for shape in [(720, 1280), (640, 640), (1080, 1920), (640, 640)]]
+    groups = preprocessor.group(images)
+
+    assert [indices for indices, _ in groups] == [[0, 2], [1, 3]]
+    assert [plans[0].input_shape for _, plans in groups] == [(384, 640), (640, 640)]
+
+
+def test_buffers_are_reused_and_padding_repainted():
+    preprocessor = Preprocessor(640, 64)
+    bright = np.full((1080, 1920, 3), 255, dtype=np.uint8)
+    dark = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+    first = preprocessor.batch([bright], [preprocessor.plan(bright.shape)])
+    second = preprocessor.batch([dark], [preprocessor.plan(dark.shape)])
+    assert np.shares_memory(first, second)
+    # The padding rows of the shared canvas are gray again, not left over from the bright frame
+    top = preprocessor.plan(dark.shape).offset[0]
+    np.testing.assert_allclose(second[0, :, :top], LETTERBOX_COLOR / 255.0, atol=1e-6)
+    assert (second[0, :, top:-top] == 0).all()
+
+
+def test_batch_rejects_mixed_input_shapes():
+    preprocessor = Preprocessor(640, 64)
+    images = [np.zeros((720, 1280, 3), dtype=np.uint8), np.zeros((640, 640, 3), dtype=np.uint8)]
+    with pytest.raises(ValueError):
+        preprocessor.batch(images, [preprocessor.plan(image.shape) for image in images])
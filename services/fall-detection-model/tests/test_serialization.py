@@ -0,0 +1,118 @@
+"""
+Tests for the response formats
+"""
+
+import base64
+import json
+import struct
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("fastapi")
+
+from results import DetectionResult  # noqa: E402
+from serialization import BINARY, COMPACT_JSON, MSGPACK, negotiate_format, render_result  # noqa: E402
+
+
+def make_result(people=3):
+    rng = np.random.default_rng(0)
+    arrays = {
+        "boxes": rng.uniform(0, 640, size=(people, 4)).astype(np.float32),
+        "scores": rng.uniform(0, 1, size=people).astype(np.float32),
+        "keypoints": rng.uniform(0, 640, size=(people, 17, 3)).astype(np.float32)
+    }
+    return DetectionResult({
+        "violation_detected": True,
+        "violation_type": "fall_detected",
+        "severity": "critical",
+        "confidence": 0.8,
+        "detections": [{"bbox": box} for box in arrays["boxes"].tolist()],
+        "detection_count": people,
+        "model_name": "fall_detector",
+        "model_version": "1.0.0"
+    }, arrays)
+
+
+def decode_columns(payload, read):
+    """Rebuild the arrays described by a response layout"""
+    return {
+        name: np.frombuffer(read(name), dtype="<f4").reshape(spec["shape"])
+        for name, spec in payload["layout"].items()
+    }
+
+
+def assert_summary(payload, result):
+    for key in ("violation_detected", "violation_type", "severity", "confidence", "detection_count", "model_name"):
+        assert payload[key] == result[key]
+    assert "detections" not in payload and "arrays" not in payload
+
+
+@pytest.mark.parametrize("accept, media_type", [
+    (None, "application/json"),
+    ("application/json", "application/json"),
+    ("application/vnd.ruth.compact+json, application/json;q=0.5", COMPACT_JSON),
+    ("application/x-msgpack", MSGPACK),
+    ("application/octet-stream", BINARY),
+])
+def test_negotiate_format(accept, media_type):
+    assert negotiate_format(accept) == media_type
+
+
+def test_results_are_plain_json():
+    result = make_result()
+    assert json.loads(json.dumps(result)) == result
+    payload = json.loads(render_result(result, None).body)
+    assert "arrays" not in payload
+    assert payload["detections"] == result["detections"]
+    assert set(json.loads(render_result(result, None, summary_only=True).body)) <= set(result) - {"detections"}
+
+
+@pytest.mark.parametrize("summary_only", [False, True])
+def test_compact_json_round_trip(summary_only):
+    result = make_result()
+    response = render_result(result, COMPACT_JSON, summary_only)
+    payload = json.loads(response.body)
+
+    assert response.media_type == COMPACT_JSON
+    assert_summary(payload, result)
+    columns = decode_columns(payload, lambda name: base64.b64decode(payload[name]))
+    expected = ["boxes", "scores"] if summary_only else ["boxes", "scores", "keypoints"]
+    assert list(columns) == expected
+    for name in expected:
+        np.testing.assert_array_equal(columns[name], result.arrays[name])
+
+
+def test_binary_round_trip():
+    result = make_result()
+    body = render_result(result, BINARY).body
+
+    (header_length,) = struct.unpack_from("<I", body)
+    header = json.loads(body[4:4 + header_length])
+    assert_summary(header, result)
+
+    offset = 4 + header_length
+    for name, spec in header["layout"].items():
+        size = int(np.prod(spec["shape"])) * 4
+        column = np.frombuffer(body[offset:offset + size], dtype="<f4").reshape(spec["shape"])
+        np.testing.assert_array_equal(column, result.arrays[name])
+        offset += size
+    assert offset == len(body)
+
+
+def test_msgpack_round_trip():
+    msgpack = pytest.importorskip("msgpack")
+    result = make_result()
+    payload = msgpack.unpackb(render_result(result, MSGPACK).body, raw=False)
+
+    assert_summary(payload, result)
+    columns = decode_columns(payload, lambda name: payload[name])
+    for name, column in columns.items():
+        np.testing.assert_array_equal(column, result.arrays[name])
+
+
+def test_no_people_round_trip():
+    result = make_result(people=0)
+    payload = json.loads(render_result(result, COMPACT_JSON).body)
+    columns = decode_columns(payload, lambda name: base64.b64decode(payload[name]))
+    assert columns["keypoints"].shape == (0, 17, 3)
@@ -3,8 +3,6 @@
 import numpy as np
 import torch
 import yaml
-from scipy.cluster.vq import kmeans
-from tqdm import tqdm
 
 from utils.general import colorstr
 
@@ -76,6 +74,9 @@ def kmean_anchors(path='./data/coco.yaml', n=9, img_size=640, thr=4.0, gen=1000,
         Usage:
             from utils.autoanchor import *; _ = kmean_anchors()
     """
+    from scipy.cluster.vq import kmeans
+    from tqdm import tqdm
+
     thr = 1. / thr
     prefix = colorstr('autoanchor: ')
 
@@ -0,0 +1,47 @@
+# Keypoint output helpers used at inference time
+# Kept apart from utils.plots so serving does not import matplotlib, pandas, seaborn or scipy
+
+import numpy as np
+
+from utils.general import xyxy2xywh
+
+
+def output_to_keypoint(output):
+    # Convert model output to target format [batch_id, class_id, x, y, w, h, conf, kpts...]
+    # One device transfer per image and whole-array box conversion, instead of one per detection
+    targets = []
+    for i, o in enumerate(output):
+        o = o.detach().cpu().numpy()
+        if not len(o):
+            continue
+        targets.append(np.concatenate([
+            np.full((len(o), 1), i, dtype=o.dtype), o[:, 5:6], xyxy2xywh(o[:, :4]), o[:, 4:5], o[:, 6:]
+        ], 1))
+    return np.concatenate(targets) if targets else np.array([])
+
+
+def output_to_arrays(o, nkpt=17):
+    # Split one image's NMS output [xyxy, conf, cls, kpts] into float32 boxes (n,4), scores (n) and keypoints (n,nkpt,3)
+    o = o.detach().cpu().numpy().astype(np.float32, copy=False)  # single device transfer
+    return {
+        "boxes": np.ascontiguousarray(o[:, :4]),
+        "scores": np.ascontiguousarray(o[:, 4]),
+        "keypoints": np.ascontiguousarray(o[:, 6:6 + nkpt * 3]).reshape(-1, nkpt, 3)
+    }
+
+def scale_keypoints(img1_shape, kpts, img0_shape, ratio_pad=None, step=3):
+    # Rescale keypoints (x, y, conf triplets) from img1_shape to img0_shape, like scale_coords for boxes
+    if ratio_pad is None:  # calculate from img0_shape
+        gain = min(img1_shape[0] / img0_shape[0], img1_shape[1] / img0_shape[1])  # gain  = old / new
+        pad = (img1_shape[1] - img0_shape[1] * gain) / 2, (img1_shape[0] - img0_shape[0] * gain) / 2  # wh padding
+    else:
+        gain = ratio_pad[0][0]
+        pad = ratio_pad[1]
+
+    kpts[:, 0::step] -= pad[0]  # x padding
+    kpts[:, 1::step] -= pad[1]  # y padding
+    kpts[:, 0::step] /= gain
+    kpts[:, 1::step] /= gain
+    kpts[:, 0::step].clamp_(0, img0_shape[1])  # x
+    kpts[:, 1::step].clamp_(0, img0_shape[0])  # y
+    return kpts
@@ -342,7 +342,7 @@ def revert_sync_batchnorm(module):
 
 class TracedModel(nn.Module):
 
-    def __init__(self, model=None, device=None, img_size=(640,640)): 
+    def __init__(self, model=None, device=None, img_size=(640,640), save_path=None): 
         super(TracedModel, self).__init__()
         
         print(" Convert model to Traced-model... ") 
@@ -361,13 +361,26 @@ class TracedModel(nn.Module):
         
         traced_script_module = torch.jit.trace(self.model, rand_example, strict=False)
         #traced_script_module = torch.jit.script(self.model)
-        traced_script_module.save("traced_model.pt")
-        print(" traced_script_module saved! ")
+        self.model.traced = False  # leave the eager model usable
+        if save_path:  # only write the traced module when asked, never into the working directory
+            traced_script_module.save(str(save_path))
+            print(" traced_script_module saved! ")
         self.model = traced_script_module
         self.model.to(device)
         self.detect_layer.to(device)
         print(" model is traced! \n") 
 
+    @classmethod
+    def from_traced(cls, traced_module, detect_layer, device=None):
+        # Wrap an already traced (e.g. cached and frozen) backbone and its detect layer without tracing again
+        self = cls.__new__(cls)
+        nn.Module.__init__(self)
+        self.stride = detect_layer.stride
+        self.names = None
+        self.model = traced_module.to(device or 'cpu')
+        self.detect_layer = detect_layer.to(device or 'cpu')
+        return self
+
     def forward(self, x, augment=False, profile=False):
         out = self.model(x)
         out = self.detect_layer(out)
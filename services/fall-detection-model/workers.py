@@ -0,0 +1,82 @@
+"""
+Per-worker statistics for pre-fork serving
+Shared-memory counters and /proc based memory readings for each worker process
+"""
+
+import multiprocessing
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ruth_serving.memory import mapped_file_memory_kb, process_memory_kb
+
+
+class WorkerStats:
+    """
+    Request counters shared between the pre-fork parent and its workers
+
+    The arrays live in shared memory created before fork, so every worker
+    can report on all of its siblings.
+    """
+
+    def __init__(self, num_workers: int, threads_per_worker: int):
+        """
+        Initialize the shared counters
+
+        Args:
+            num_workers: Number of worker processes
+            threads_per_worker: torch intra-op thread budget of each worker
+        """
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        self._pids = multiprocessing.Array("i", num_workers)
+        self._started = multiprocessing.Array("d", num_workers)
+        self._requests = multiprocessing.Array("L", num_workers)
+        self._images = multiprocessing.Array("L", num_workers)
+
+    def register(self, index: int, pid: int):
+        """Record a (re)started worker and reset its counters"""
+        self._pids[index] = pid
+        self._started[index] = time.time()
+        self._requests[index] = 0
+        self._images[index] = 0
+
+    def record(self, index: int, images: int = 1):
+        """Count one served request for a worker"""
+        with self._requests.get_lock():
+            self._requests[index] += 1
+        with self._images.get_lock():
+            self._images[index] += images
+
+    def pids(self) -> List[int]:
+        """Process ids of the registered workers"""
+        return [pid for pid in self._pids[:] if pid]
+
+    def snapshot(self, weights_path: Optional[Path] = None) -> List[Dict]:
+        """
+        Return pid, throughput and memory usage for every worker
+
+        Args:
+            weights_path: Memory-mapped weights file to report per worker, if any
+        """
+        now = time.time()
+        workers = []
+        for index in range(self.num_workers):
+            pid = self._pids[index]
+            if not pid or not Path(f"/proc/{pid}").exists():
+                continue
+            uptime = max(now - self._started[index], 1e-6)
+            worker = {
+                "index": index,
+                "pid": pid,
+                "threads": self.threads_per_worker,
+                "uptime_seconds": round(uptime, 1),
+                "requests": self._requests[index],
+                "images": self._images[index],
+                "requests_per_second": round(self._requests[index] / uptime, 3),
+                **process_memory_kb(pid)
+            }
+            if weights_path is not None:
+                worker["weights"] = mapped_file_memory_kb(weights_path, pid)
+            workers.append(worker)
+        return workers
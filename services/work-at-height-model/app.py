@@ -3,16 +3,24 @@ Work at Height Detection Model Service
 FastAPI application for detecting workers at dangerous heights
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 import uvicorn
-import cv2
-import numpy as np
+import asyncio
 from pathlib import Path
 import logging
 import os
+import time
+from typing import Dict, Optional
 
 from detector import WorkAtHeightDetector
+from ruth_serving.executor import InferenceExecutor, QueueFullError
+from ruth_serving.metrics import Gauge, MetricsRegistry, server_timing_header, stage_timer
+from ruth_serving.hashing import file_sha256
+from ruth_serving.reload import ModelReloader, ReloadInProgressError
+from ruth_serving.warmup import parse_batch_sizes, parse_shapes, warm_up
+from ruth_serving.decode import DecodedImage, decode_image, scale_detections
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -33,13 +41,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Inference executor configuration
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "32"))
+INFERENCE_RETRY_AFTER = int(os.getenv("INFERENCE_RETRY_AFTER", "1"))
+
+# Hot reload configuration
+MODEL_PATH = Path(os.getenv("MODEL_PATH", "/app/weights/best.wah.pt"))
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Warmup configuration: frame shapes as HEIGHTxWIDTH and batch sizes to run before reporting ready.
+# 16:9 camera frames letterbox to a different input shape than square ones, so the default warms both
+WARMUP_SHAPES = parse_shapes(os.getenv("WARMUP_SHAPES", "640x640,720x1280"))
+WARMUP_BATCH_SIZES = parse_batch_sizes(os.getenv("WARMUP_BATCH_SIZES", "1"))
+WARMUP_ITERATIONS = int(os.getenv("WARMUP_ITERATIONS", "2"))
+
 # Global model instance
 detector = None
+reloader = None
+
+# Set once the loaded model has been warmed up
+ready = False
+warmup_report = None
+warmup_task = None
+
+# Hash and load time of the weights being served
+model_sha256 = None
+model_loaded_at = None
+executor = InferenceExecutor(
+    max_workers=INFERENCE_WORKERS,
+    max_queue_size=INFERENCE_QUEUE_SIZE,
+    retry_after=INFERENCE_RETRY_AFTER
+)
+
+# Prometheus metrics exposed on /metrics
+STAGE_METRIC = "work_at_height_stage_seconds"
+STAGE_DESCRIPTION = "Time spent in each stage of a detection request"
+registry = MetricsRegistry()
+requests_in_flight = registry.register(Gauge(
+    "work_at_height_requests_in_flight",
+    "Detection requests currently being handled"
+))
+model_load_seconds = registry.register(Gauge(
+    "work_at_height_model_load_seconds",
+    "Time taken to load the model weights"
+))
+registry.register(Gauge(
+    "work_at_height_queue_depth",
+    "Detections waiting for an inference thread",
+    callback=lambda: executor.queue_depth
+))
+registry.register(Gauge(
+    "work_at_height_inferences_in_flight",
+    "Detections currently running or queued on the inference executor",
+    callback=lambda: executor.in_flight
+))
 
 def load_model():
     """Load the work at height detection model on startup"""
-    global detector
-    model_path = Path("/app/weights/best.wah.pt")
+    global detector, model_sha256, model_loaded_at
+    model_path = MODEL_PATH
 
     if not model_path.exists():
         logger.warning(f"Model weights not found at {model_path}")
@@ -47,27 +109,107 @@ def load_model():
         return None
 
     try:
+        started = time.perf_counter()
         detector = WorkAtHeightDetector(str(model_path))
+        model_load_seconds.set(time.perf_counter() - started)
+        model_sha256 = file_sha256(model_path)
+        model_loaded_at = time.time()
         logger.info(f"Loaded work at height model from {model_path}")
         return detector
     except Exception as e:
         logger.error(f"Failed to load model: {e}")
         return None
 
+def warm_up_detector(target: WorkAtHeightDetector) -> Dict:
+    """Run the configured warmup inferences on a detector (blocking)"""
+    return warm_up(target, WARMUP_SHAPES, WARMUP_BATCH_SIZES, WARMUP_ITERATIONS)
+
+async def run_startup_warmup():
+    """Warm up the loaded model in the background, then report ready if it produced results"""
+    global ready, warmup_report
+    try:
+        warmup_report = await asyncio.get_running_loop().run_in_executor(None, warm_up_detector, detector)
+    except Exception as e:
+        # /ready keeps answering 503 with the error until a reload warms up cleanly
+        logger.error(f"Warmup failed, not reporting ready: {e}")
+        warmup_report = {"error": str(e)}
+        return
+    ready = True
+
+async def swap_detector(new_detector: WorkAtHeightDetector) -> Optional[WorkAtHeightDetector]:
+    """
+    Make a freshly loaded detector the one serving requests
+
+    Requests already running hold a reference to the previous detector and
+    finish on it; new requests pick up the new one.
+    """
+    global detector, ready, warmup_report
+    previous, detector = detector, new_detector
+    # The reloader only hands over a detector whose warmup ran without errors,
+    # so this also clears a failed startup warmup
+    warmup_report = reloader.warmup_report
+    ready = True
+    return previous
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize model when the API starts"""
+    global reloader, warmup_task
     logger.info("Starting Work at Height Detection Model Service...")
     load_model()
+    if detector is not None:
+        warmup_task = asyncio.create_task(run_startup_warmup())
+
+    reloader = ModelReloader(
+        MODEL_PATH,
+        WorkAtHeightDetector,
+        swap_detector,
+        warmup=warm_up_detector,
+        watch_interval=MODEL_WATCH_INTERVAL,
+        sha256=model_sha256,
+        loaded_at=model_loaded_at
+    )
+    reloader.start()
     logger.info("Work at Height Detection Model Service ready")
 
-def process_uploaded_image(file_content: bytes) -> np.ndarray:
-    """Convert uploaded file to OpenCV image"""
-    nparr = np.frombuffer(file_content, np.uint8)
-    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    if image is None:
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the inference threads when the API shuts down"""
+    if reloader is not None:
+        await reloader.stop()
+    executor.shutdown()
+
+@app.exception_handler(QueueFullError)
+async def queue_full_handler(request: Request, exc: QueueFullError):
+    """Reject requests quickly when the inference queue is full"""
+    return JSONResponse(
+        status_code=503,
+        content={"success": False, "detail": "Inference queue is full, retry later"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.middleware("http")
+async def track_in_flight(request: Request, call_next):
+    """Count detection requests currently being handled"""
+    if not request.url.path.startswith("/detect"):
+        return await call_next(request)
+    requests_in_flight.inc()
+    try:
+        return await call_next(request)
+    finally:
+        requests_in_flight.dec()
+
+def process_uploaded_image(file_content: bytes) -> DecodedImage:
+    """
+    Convert uploaded file to OpenCV image
+
+    Large JPEGs are decoded at a reduced scale that still covers the model
+    input; pass results through scale_detections with the returned scale.
+    """
+    try:
+        return decode_image(file_content, detector.img_size if detector is not None else 0)
+    except ValueError:
         raise HTTPException(status_code=400, detail="Invalid image format")
-    return image
 
 @app.get("/")
 async def root():
@@ -85,8 +227,21 @@ async def health_check():
         "status": "healthy",
         "service": "work-at-height-model",
         "version": "1.0.0",
-        "model_loaded": detector is not None
+        "model_loaded": detector is not None,
+        "queue_depth": executor.queue_depth,
+        "queue_capacity": executor.max_queue_size,
+        "in_flight": executor.in_flight
+    }
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once the model is loaded and warmed up, 503 before that"""
+    body = {
+        "ready": ready,
+        "model_loaded": detector is not None,
+        "warmup": warmup_report
     }
+    return JSONResponse(status_code=200 if ready else 503, content=body)
 
 @app.get("/info")
 async def model_info():
@@ -105,9 +260,38 @@ async def model_info():
             "safety_equipment_detection",
             "unsafe_position_detection"
         ],
-        "supported_formats": ["jpg", "jpeg", "png"]
+        "supported_formats": ["jpg", "jpeg", "png"],
+        "model_hash": reloader.sha256 if reloader is not None else model_sha256,
+        "model_loaded_at": reloader.loaded_at if reloader is not None else model_loaded_at
     }
 
+@app.post("/admin/reload")
+async def reload_model(request: Request, force: bool = False):
+    """
+    Load the current weights file, warm it up and swap it in without downtime
+
+    Requires the X-Admin-Token header when ADMIN_TOKEN is set.
+
+    Args:
+        force: Reload even if the weights hash has not changed
+    """
+    if ADMIN_TOKEN and request.headers.get("X-Admin-Token") != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    if not MODEL_PATH.exists():
+        raise HTTPException(status_code=404, detail=f"Model weights not found at {MODEL_PATH}")
+
+    try:
+        return {"success": True, **(await reloader.reload(force=force))}
+    except ReloadInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, previous model still active: {e}")
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Stage latency histograms, queue depth, in-flight requests and model load time in Prometheus format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.post("/detect")
 async def detect_work_at_height(file: UploadFile = File(...)):
     """
@@ -129,20 +313,35 @@ async def detect_work_at_height(file: UploadFile = File(...)):
             "violation_detected": False
         }
 
+    # Reject before reading the upload if the queue is already full
+    if not executor.has_capacity():
+        raise QueueFullError(executor.retry_after)
+
     try:
+        timings = {}
+
         # Process uploaded image
-        file_content = await file.read()
-        image = process_uploaded_image(file_content)
+        with stage_timer(timings, "read"):
+            file_content = await file.read()
+        with stage_timer(timings, "decode"):
+            decoded = process_uploaded_image(file_content)
 
-        # Run detection
-        result = detector.detect(image)
+        # Run detection on the inference executor, reporting coordinates in original pixels
+        result = scale_detections(await executor.run(detector.detect, decoded.image), decoded.scale)
+        timings.update(result.get("timings", {}))
 
-        return {
-            "success": True,
-            "model": "work-at-height",
-            **result
-        }
+        with stage_timer(timings, "serialize"):
+            response = JSONResponse({
+                "success": True,
+                "model": "work-at-height",
+                **result
+            })
+        registry.observe_stages(STAGE_METRIC, STAGE_DESCRIPTION, timings)
+        response.headers["Server-Timing"] = server_timing_header(timings)
+        return response
 
+    except QueueFullError:
+        raise
     except Exception as e:
         logger.error(f"Work at height detection failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,7 @@
+"""
+Model serving helpers shared by the model services
+
+Service images copy this package in from the ruth_serving build context
+(see docker-compose.yml, or pass --build-context ruth_serving=../../shared/ruth_serving
+to docker build). To run a service from its directory, put ../../shared on PYTHONPATH.
+"""
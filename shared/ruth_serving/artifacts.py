@@ -0,0 +1,183 @@
+"""
+Cached model artifacts
+Saves the fused, eval-mode inference model once per weights hash and memory-maps it on later starts
+
+Artifacts are mapped read-only and copy-on-write, so every process on a host
+that loads the same artifact file (workers, replicas and other services
+mounting the same cache volume) shares one set of page-cache pages for the
+weights instead of holding a private heap copy each.
+
+Fusing a checkpoint and unpickling an artifact need the YOLOv7 `models`
+package on sys.path, which the fall services provide from their vendored
+YOLOv7 tree; it is only imported when a checkpoint is fused, so importing
+this module does not depend on it.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+import torch
+
+from .hashing import file_sha256
+
+logger = logging.getLogger(__name__)
+
+# Bump when the artifact contents change so stale caches are rebuilt
+ARTIFACT_VERSION = 1
+
+
+def weights_sha256(weights_path: Path, cache_dir: Optional[Path] = None, read_only: bool = False) -> str:
+    """
+    Hash a weights file, remembering the result by size and mtime in the cache directory
+
+    Hashing a ~300 MB checkpoint costs a noticeable part of a cached start,
+    so the digest is reused until the file changes. Read-only consumers use
+    the index but never write it.
+    """
+    weights_path = Path(weights_path)
+    stat = weights_path.stat()
+    key = f"{weights_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    index_path = Path(cache_dir) / "sha256.json" if cache_dir else None
+    index = {}
+    if index_path is not None and index_path.exists():
+        try:
+            index = json.loads(index_path.read_text())
+        except ValueError:
+            index = {}
+    if key in index:
+        return index[key]
+
+    digest = file_sha256(weights_path)
+    if index_path is not None and not read_only:
+        index[key] = digest
+        try:
+            _atomic_write(index_path, json.dumps(index).encode())
+        except OSError as e:
+            logger.warning(f"Could not update hash index {index_path}: {e}")
+    return digest
+
+
+def artifact_path(weights_path: Path, cache_dir: Path, sha256: str) -> Path:
+    """Location of the fused artifact built from weights with the given hash"""
+    return Path(cache_dir) / f"{Path(weights_path).stem}.{sha256[:16]}.fused-v{ARTIFACT_VERSION}.pt"
+
+
+def _atomic_write(path: Path, data: bytes):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def _fuse_checkpoint(weights_path: Path) -> torch.nn.Module:
+    """Load a training checkpoint as the fused, eval-mode inference model"""
+    from models.experimental import attempt_load  # the calling service's vendored YOLOv7 tree
+    return attempt_load(str(weights_path), map_location="cpu")
+
+
+def compile_artifact(weights_path: Path, output_path: Path) -> torch.nn.Module:
+    """
+    Build the inference model from a training checkpoint and save it
+
+    The checkpoint is loaded through attempt_load, which keeps only the
+    (EMA) model, converts it to float, fuses conv/bn and RepConv blocks and
+    switches to eval mode. Optimizer state and training metadata are not
+    carried over. The file is written atomically so concurrent starts never
+    see a partial artifact.
+
+    Returns:
+        The fused model
+    """
+    started = time.perf_counter()
+    model = _fuse_checkpoint(weights_path)
+    model.eval()
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.")
+    os.close(fd)
+    try:
+        torch.save(model, tmp)
+        # mkstemp creates 0600 files; other services map the artifact as a different user
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, output_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    logger.info(
+        f"Compiled fused artifact {output_path} from {weights_path} "
+        f"in {time.perf_counter() - started:.1f}s ({output_path.stat().st_size / 1e6:.0f} MB)"
+    )
+    return model
+
+
+def load_artifact(path: Path) -> torch.nn.Module:
+    """
+    Memory-map a fused artifact; tensors are paged in from the file on first use
+
+    The file is opened read-only and mapped private, so pages stay shared
+    with every other process mapping it until something writes to a tensor.
+    Gradients are disabled so nothing in the serving path does.
+    """
+    model = torch.load(str(path), map_location="cpu", mmap=True, weights_only=False)
+    for parameter in model.parameters():
+        parameter.requires_grad_(False)
+    return model.eval()
+
+
+def load_inference_model(weights_path: Path, cache_dir: Optional[Path],
+                         read_only: bool = False) -> Tuple[torch.nn.Module, Optional[Path]]:
+    """
+    Load the fused inference model, building the cached artifact if needed
+
+    Args:
+        weights_path: Training checkpoint (e.g. yolov7-w6-pose.pt)
+        cache_dir: Directory holding fused artifacts, or None to always fuse in memory
+        read_only: Only use artifacts built by another service; fuse in memory if none exists
+
+    Returns:
+        Tuple of (model, artifact path or None when loaded without the cache)
+    """
+    if cache_dir is None:
+        return _fuse_checkpoint(weights_path), None
+
+    cache_dir = Path(cache_dir)
+    try:
+        if not read_only:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+        sha256 = weights_sha256(weights_path, cache_dir, read_only=read_only)
+        path = artifact_path(weights_path, cache_dir, sha256)
+
+        if not path.exists() and read_only:
+            logger.warning(f"No shared fused artifact for {weights_path} ({sha256[:12]}) in {cache_dir}, "
+                           f"fusing in memory")
+            return _fuse_checkpoint(weights_path), None
+        if not path.exists():
+            logger.info(f"No fused artifact for {weights_path} ({sha256[:12]}), compiling")
+            compile_artifact(weights_path, path)
+
+        started = time.perf_counter()
+        try:
+            model = load_artifact(path)
+        except (RuntimeError, EOFError, AttributeError) as e:
+            # Truncated file or built by an incompatible code/torch version
+            if read_only:
+                logger.warning(f"Shared fused artifact {path} unreadable ({e}), fusing in memory")
+                return _fuse_checkpoint(weights_path), None
+            logger.warning(f"Fused artifact {path} unreadable ({e}), rebuilding")
+            compile_artifact(weights_path, path)
+            model = load_artifact(path)
+        logger.info(f"Loaded fused artifact {path} in {time.perf_counter() - started:.2f}s")
+        return model, path
+
+    except OSError as e:
+        logger.warning(f"Model cache {cache_dir} unusable ({e}), fusing in memory")
+        return _fuse_checkpoint(weights_path), None
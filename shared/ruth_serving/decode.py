@@ -0,0 +1,170 @@
+"""
+Image decoding
+Decodes uploaded JPEGs at the smallest DCT-domain reduction that still covers the model input
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+# libjpeg scales 8x8 DCT blocks down while decoding, so the full-size image is never built
+REDUCED_DECODE_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2
+}
+
+# Start-of-frame markers carry the image size (C4, C8 and CC are DHT, JPG and DAC)
+SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Markers without a length field
+STANDALONE_MARKERS = frozenset([0x01, 0xD8, *range(0xD0, 0xD8)])
+START_OF_SCAN = 0xDA
+
+
+def jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Read a JPEG's dimensions from its frame header without decoding it
+
+    Args:
+        data: Encoded image
+
+    Returns:
+        (height, width) as stored, before any EXIF rotation, or None if the
+        data is not a JPEG or has no frame header before the first scan
+    """
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in STANDALONE_MARKERS:
+            i += 2
+            continue
+        if marker in SOF_MARKERS:
+            if i + 9 > len(data):
+                return None
+            height = int.from_bytes(data[i + 5:i + 7], "big")
+            width = int.from_bytes(data[i + 7:i + 9], "big")
+            return (height, width) if height and width else None
+        if marker == START_OF_SCAN:
+            return None
+        i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+    return None
+
+
+def reduction_factor(size: Sequence[int], target_size: int) -> int:
+    """Largest DCT reduction (8, 4, 2 or 1) that keeps the longer side at least target_size"""
+    long_side = max(size[:2])
+    for factor in REDUCED_DECODE_FLAGS:
+        if -(-long_side // factor) >= target_size:  # libjpeg rounds the scaled size up
+            return factor
+    return 1
+
+
+class DecodedImage:
+    """
+    An uploaded image decoded for the model, possibly at reduced resolution
+
+    Detections on `image` are in reduced pixels; multiply by `scale` (or use
+    scale_detections) for original pixels. Full-resolution pixels, e.g. for
+    evidence crops, are decoded from the original bytes only when asked for.
+    """
+
+    def __init__(self, data: Optional[bytes], image: np.ndarray, scale: float = 1.0):
+        self.data = data
+        self.image = image
+        self.scale = scale
+        self._full_resolution = None
+
+    def full_resolution(self) -> np.ndarray:
+        """The image at its original resolution, decoded on first use"""
+        if self.scale == 1.0 or self.data is None:
+            return self.image
+        if self._full_resolution is None:
+            self._full_resolution = cv2.imdecode(np.frombuffer(self.data, np.uint8), cv2.IMREAD_COLOR)
+        return self._full_resolution
+
+    def crop(self, box: Sequence[float], margin: float = 0.0) -> np.ndarray:
+        """
+        Cut a region out of the full-resolution image
+
+        Args:
+            box: x1, y1, x2, y2 in original pixels
+            margin: Extra context around the box, as a fraction of its size
+
+        Returns:
+            BGR crop (a copy, so the full-resolution image can be released)
+        """
+        image = self.full_resolution()
+        x1, y1, x2, y2 = box
+        dx, dy = (x2 - x1) * margin, (y2 - y1) * margin
+        height, width = image.shape[:2]
+        x1, x2 = int(max(0, x1 - dx)), int(min(width, x2 + dx))
+        y1, y2 = int(max(0, y1 - dy)), int(min(height, y2 + dy))
+        return image[y1:y2, x1:x2].copy()
+
+
+def decode_image(data: bytes, target_size: int = 0) -> DecodedImage:
+    """
+    Decode an encoded image, as small as the model input allows
+
+    JPEGs whose longer side is at least twice target_size are decoded at
+    1/2, 1/4 or 1/8 scale in the DCT domain, so a 4K snapshot for a 640 pixel
+    model is decoded straight to 960x540 instead of 3840x2160 and resized.
+    Other formats, and target_size 0, decode at full resolution.
+
+    Args:
+        data: Encoded image bytes
+        target_size: Model input size for the longer side (0 = full resolution)
+
+    Returns:
+        The DecodedImage
+
+    Raises:
+        ValueError: If the data cannot be decoded
+    """
+    size = jpeg_size(data) if target_size else None
+    factor = reduction_factor(size, target_size) if size else 1
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), REDUCED_DECODE_FLAGS.get(factor, cv2.IMREAD_COLOR))
+    if image is None:
+        raise ValueError("Invalid image format")
+
+    # EXIF rotation may swap the axes, so compare the longer sides
+    scale = max(size) / max(image.shape[:2]) if factor > 1 else 1.0
+    return DecodedImage(data, image, scale)
+
+
+def scale_detections(result: Dict, scale: float) -> Dict:
+    """
+    Map the coordinates in a detection result from a reduced decode back to original pixels, in place
+
+    Scales each detection's "bbox" (keeping integer boxes integers) and
+    keypoint "x"/"y", and the "boxes" and "keypoints" of the result's `arrays` attribute when present.
+    """
+    if scale == 1.0:
+        return result
+
+    for detection in result.get("detections", []):
+        if "bbox" in detection:
+            detection["bbox"] = [
+                int(round(value * scale)) if isinstance(value, int) else value * scale for value in detection["bbox"]
+            ]
+        for keypoint in detection.get("keypoints", []):
+            if isinstance(keypoint, dict):
+                keypoint["x"] *= scale
+                keypoint["y"] *= scale
+
+    arrays = getattr(result, "arrays", None)
+    if arrays:
+        arrays["boxes"] = arrays["boxes"] * np.float32(scale)
+        keypoints = arrays["keypoints"].copy()
+        keypoints[..., :2] *= np.float32(scale)
+        arrays["keypoints"] = keypoints
+    return result
@@ -0,0 +1,101 @@
+"""
+Bounded inference executor
+Runs blocking model calls off the asyncio event loop with admission control
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the inference queue cannot admit another request"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Inference queue is full")
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """
+    Dedicated thread pool for inference with a bounded admission queue
+
+    At most max_workers calls run at once and at most max_queue_size more
+    wait for a worker. Anything beyond that is rejected immediately with
+    QueueFullError so latency cannot grow without limit.
+    """
+
+    def __init__(self, max_workers: int = 1, max_queue_size: int = 32, retry_after: int = 1,
+                 thread_budget: int = 0, name: str = "inference"):
+        """
+        Initialize the executor
+
+        Args:
+            max_workers: Number of inference threads
+            max_queue_size: Number of admitted calls allowed to wait for a thread
+            retry_after: Seconds suggested to rejected clients via Retry-After
+            thread_budget: Intra-op torch threads for each inference thread (0 = leave the default)
+            name: Prefix of the inference thread names
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max(0, max_queue_size)
+        self.retry_after = retry_after
+        self.thread_budget = max(0, thread_budget)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=name,
+            initializer=self._init_thread
+        )
+        self._in_flight = 0
+
+    def _init_thread(self):
+        """Apply the intra-op thread budget in each inference thread"""
+        if self.thread_budget:
+            # With torch's OpenMP backend this sets the calling thread's team size
+            import torch
+            torch.set_num_threads(self.thread_budget)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of admitted calls that have not finished yet"""
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of admitted calls waiting for a free inference thread"""
+        return max(0, self._in_flight - self.max_workers)
+
+    def has_capacity(self) -> bool:
+        """Whether another call would be admitted right now"""
+        return self._in_flight < self.max_workers + self.max_queue_size
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """
+        Run a blocking callable on the inference pool
+
+        Args:
+            fn: Blocking callable, e.g. detector.detect
+            *args: Positional arguments for fn
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            QueueFullError: If the admission queue is full
+        """
+        if not self.has_capacity():
+            raise QueueFullError(self.retry_after)
+
+        # Only touched from the event loop thread, so no lock is needed
+        self._in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._in_flight -= 1
+
+    def shutdown(self):
+        """Stop accepting work and release the worker threads"""
+        self._executor.shutdown(wait=False)
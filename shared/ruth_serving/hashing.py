@@ -0,0 +1,16 @@
+"""
+Weights file hashing
+Identifies the weights a service is serving, shared by model reload and the artifact cache
+"""
+
+import hashlib
+from pathlib import Path
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Hash a weights file without reading it into memory at once"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,109 @@
+"""
+Weights memory accounting
+Reports how much of a process's resident memory belongs to the model weights
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+# smaps fields summed over the mappings of a file, and their reported names
+SMAPS_FIELDS = {
+    "Rss": "rss_kb",
+    "Pss": "pss_kb",
+    "Shared_Clean": "shared_clean_kb",
+    "Shared_Dirty": "shared_dirty_kb",
+    "Private_Clean": "private_clean_kb",
+    "Private_Dirty": "private_dirty_kb",
+}
+
+
+def process_memory_kb(pid: Union[int, str] = "self") -> Dict[str, int]:
+    """
+    Read the memory usage of a whole process from /proc
+
+    Rss counts every resident page, including weights shared with siblings.
+    Pss splits shared pages between the processes mapping them, so the sum
+    of Pss over all workers is the real memory cost of the pool.
+
+    Args:
+        pid: Process id (default: the calling process)
+
+    Returns:
+        Dictionary of memory figures in kB (empty if /proc is unavailable)
+    """
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if parts and parts[0][:-1] in SMAPS_FIELDS:
+                    memory[SMAPS_FIELDS[parts[0][:-1]]] = int(parts[1])
+    except (FileNotFoundError, PermissionError, ProcessLookupError):
+        return {}
+    return memory
+
+
+def mapped_file_memory_kb(path: Union[str, Path], pid: Union[int, str] = "self") -> Dict[str, int]:
+    """
+    Sum the smaps figures of every mapping of a file in a process
+
+    For a memory-mapped weights file, Shared_Clean counts pages also mapped
+    by other processes on the host (other workers, replicas or services
+    using the same cache volume), Pss is this process's fair share of them
+    and Private_Dirty counts pages copied on write. Private_Dirty should
+    stay at zero; anything else means the weights are being modified and no
+    longer shared.
+
+    Args:
+        path: Mapped file
+        pid: Process id (default: the calling process)
+
+    Returns:
+        Dictionary of memory figures in kB plus the number of mappings
+        (empty if /proc is unavailable)
+    """
+    target = str(Path(path).resolve())
+    memory = {name: 0 for name in SMAPS_FIELDS.values()}
+    memory["mappings"] = 0
+    matching = False
+    try:
+        with open(f"/proc/{pid}/smaps") as f:
+            for line in f:
+                parts = line.split()
+                if not parts:
+                    continue
+                if not parts[0].endswith(":"):
+                    # Mapping header: address perms offset dev inode [pathname]
+                    pathname = " ".join(parts[5:])
+                    matching = pathname == target
+                    if matching:
+                        memory["mappings"] += 1
+                elif matching and parts[0][:-1] in SMAPS_FIELDS:
+                    memory[SMAPS_FIELDS[parts[0][:-1]]] += int(parts[1])
+    except (FileNotFoundError, PermissionError, ProcessLookupError):
+        return {}
+    return memory
+
+
+def weights_memory_kb(model: Any, artifact_path: Optional[Path], pid: Union[int, str] = "self") -> Dict:
+    """
+    Resident memory attributable to a detector's weights
+
+    Weights memory-mapped from an artifact are measured from smaps. Weights
+    loaded onto the heap are private to the process, so their size is the
+    parameter and buffer bytes.
+
+    Args:
+        model: torch module holding the weights
+        artifact_path: File the weights are mapped from, or None when on the heap
+        pid: Process id (default: the calling process)
+
+    Returns:
+        Dictionary with "mapped", the artifact path and memory figures in kB
+    """
+    if artifact_path is not None:
+        return {"mapped": True, "artifact": str(artifact_path), **mapped_file_memory_kb(artifact_path, pid)}
+
+    tensors = list(model.parameters()) + list(model.buffers()) if model is not None else []
+    size_kb = sum(t.numel() * t.element_size() for t in tensors) // 1024
+    return {"mapped": False, "artifact": None, "rss_kb": size_kb, "pss_kb": size_kb, "private_dirty_kb": size_kb}
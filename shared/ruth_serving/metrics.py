@@ -0,0 +1,204 @@
+"""
+Lightweight in-process metrics
+Histograms, counters and gauges rendered in the Prometheus text format
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence
+
+# Stage latency buckets in seconds, from sub-millisecond post-processing to multi-second forwards
+STAGE_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+
+
+@contextmanager
+def stage_timer(timings: Dict[str, float], stage: str):
+    """Add the wall time of the enclosed block, in milliseconds, to timings[stage]"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - start) * 1000.0
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    """Format stage timings in milliseconds as a Server-Timing header value"""
+    return ", ".join(f"{stage};dur={duration:.2f}" for stage, duration in timings.items())
+
+
+def _format_labels(labels: Dict[str, str], extra: Optional[Dict[str, str]] = None) -> str:
+    merged = {**labels, **(extra or {})}
+    if not merged:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in merged.items()) + "}"
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with a running count and sum
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float],
+                 labels: Optional[Dict[str, str]] = None):
+        """
+        Initialize the histogram
+
+        Args:
+            name: Metric name
+            description: Human readable description
+            buckets: Sorted upper bounds of the buckets (an implicit +Inf bucket is added)
+            labels: Constant labels identifying this series
+        """
+        self.name = name
+        self.description = description
+        self.labels = labels or {}
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """Record a single observation"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Dict:
+        """Return cumulative bucket counts, total count and sum"""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+
+        cumulative = {}
+        running = 0
+        for bound, bucket_count in zip(self.buckets + [float("inf")], counts):
+            running += bucket_count
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+
+        return {
+            "name": self.name,
+            "description": self.description,
+            "buckets": cumulative,
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else 0.0
+        }
+
+    def render(self) -> List[str]:
+        """Render the histogram series in the Prometheus text format"""
+        snapshot = self.snapshot()
+        lines = [
+            f"{self.name}_bucket{_format_labels(self.labels, {'le': bound})} {count}"
+            for bound, count in snapshot["buckets"].items()
+        ]
+        lines.append(f"{self.name}_sum{_format_labels(self.labels)} {snapshot['sum']}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels)} {snapshot['count']}")
+        return lines
+
+
+class Counter:
+    """
+    Monotonically increasing counter
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, description: str, labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.description = description
+        self.labels = labels or {}
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels)} {self._value}"]
+
+
+class Gauge:
+    """
+    Value that can go up and down, or be read from a callback at render time
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, description: str, labels: Optional[Dict[str, str]] = None,
+                 callback: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.description = description
+        self.labels = labels or {}
+        self.callback = callback
+        self._value = 0.0
+
+    def set(self, value: float):
+        self._value = value
+
+    def inc(self, amount: float = 1.0):
+        self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        self._value -= amount
+
+    def render(self) -> List[str]:
+        value = self.callback() if self.callback is not None else self._value
+        return [f"{self.name}{_format_labels(self.labels)} {value}"]
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics exposed together on /metrics
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._stage_histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Add a metric to the registry and return it"""
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def observe_stages(self, name: str, description: str, timings: Dict[str, float]):
+        """
+        Record stage timings (milliseconds) into per-stage histograms in seconds
+
+        Histograms are created on first use with a "stage" label.
+        """
+        for stage, duration in timings.items():
+            key = f"{name}:{stage}"
+            histogram = self._stage_histograms.get(key)
+            if histogram is None:
+                with self._lock:
+                    histogram = self._stage_histograms.get(key)
+                    if histogram is None:
+                        histogram = Histogram(name, description, STAGE_BUCKETS, labels={"stage": stage})
+                        self._stage_histograms[key] = histogram
+                        self._metrics.append(histogram)
+            histogram.observe(duration / 1000.0)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics)
+
+        lines = []
+        described = set()
+        for metric in sorted(metrics, key=lambda m: m.name):
+            if metric.name not in described:
+                described.add(metric.name)
+                lines.append(f"# HELP {metric.name} {metric.description}")
+                lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,170 @@
+"""
+Hot model reload
+Loads new weights in the background, warms them up and atomically swaps the active detector
+"""
+
+import asyncio
+import logging
+import os
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .hashing import file_sha256
+
+logger = logging.getLogger(__name__)
+
+
+class ReloadInProgressError(Exception):
+    """Raised when a reload is requested while another one is running"""
+
+
+class ModelReloader:
+    """
+    Replaces the served detector without restarting the service
+
+    The new detector is loaded and warmed up on a background thread while the
+    old one keeps serving, and is only swapped in if the warmup succeeds (it
+    raises when an inference reports an error). The swap itself is a single reference assignment
+    on the event loop, so requests already running keep their reference to the
+    old detector and finish on it; its weights are freed when the last of
+    them drops that reference.
+    """
+
+    def __init__(self, weights_path: Path, load: Callable[[str], Any], swap: Callable[[Any], Awaitable[Any]],
+                 warmup: Optional[Callable[[Any], Any]] = None, watch_interval: float = 0.0,
+                 sha256: Optional[str] = None, loaded_at: Optional[float] = None):
+        """
+        Initialize the reloader
+
+        Args:
+            weights_path: Weights file to (re)load
+            load: Blocking callable building a detector from a weights path
+            swap: Coroutine function installing a new detector and returning the previous one
+            warmup: Blocking callable run on a new detector before the swap, returning a
+                report and raising if the detector cannot serve
+            watch_interval: Seconds between checks of the weights file for changes (0 = no watcher)
+            sha256: Hash of the weights currently being served, if any
+            loaded_at: When the weights currently being served were loaded
+        """
+        self.weights_path = Path(weights_path)
+        self.load = load
+        self.swap = swap
+        self.warmup = warmup
+        self.watch_interval = watch_interval
+
+        self.sha256 = sha256
+        self.loaded_at = loaded_at
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self.warmup_report: Optional[Dict] = None
+
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def reload(self, force: bool = False) -> Dict:
+        """
+        Load, warm up and swap in the current contents of the weights file
+
+        Args:
+            force: Reload even if the file hash matches the active model
+
+        Returns:
+            Reload outcome and the active model info
+
+        Raises:
+            ReloadInProgressError: If another reload is running
+        """
+        if self._lock.locked():
+            raise ReloadInProgressError("A model reload is already in progress")
+
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            sha256 = await loop.run_in_executor(None, file_sha256, self.weights_path)
+            if sha256 == self.sha256 and not force:
+                return {"reloaded": False, "reason": "weights unchanged", **self.info()}
+
+            started = time.perf_counter()
+            try:
+                detector, warmup_report = await loop.run_in_executor(None, self._load_and_warm)
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Model reload from {self.weights_path} failed, keeping the current model: {e}")
+                raise
+
+            self.warmup_report = warmup_report
+            previous = await self.swap(detector)
+            self.sha256 = sha256
+            self.loaded_at = time.time()
+            self.reloads += 1
+            self.last_error = None
+            logger.info(
+                f"Swapped in model {sha256[:12]} from {self.weights_path} "
+                f"(loaded and warmed up in {time.perf_counter() - started:.1f}s)"
+            )
+
+            if previous is not None:
+                weakref.finalize(previous, logger.info, "Previous model released after in-flight requests drained")
+            return {"reloaded": True, **self.info()}
+
+    def _load_and_warm(self):
+        """Build and warm up a detector, raising if either step fails so it is never swapped in"""
+        detector = self.load(str(self.weights_path))
+        if detector is None:
+            raise RuntimeError(f"Loading {self.weights_path} returned no detector")
+        warmup_report = self.warmup(detector) if self.warmup is not None else None
+        return detector, warmup_report
+
+    def start(self):
+        """Start watching the weights file for changes"""
+        if self.watch_interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._watch())
+            logger.info(f"Watching {self.weights_path} for new weights every {self.watch_interval:.0f}s")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.weights_path)
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    async def _watch(self):
+        last = self._signature()
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            current = self._signature()
+            if current is None or current == last:
+                continue
+
+            # Wait until the file stops changing so a copy in progress is not loaded
+            await asyncio.sleep(self.watch_interval)
+            if self._signature() != current:
+                continue
+            last = current
+
+            logger.info(f"Detected new weights at {self.weights_path}, reloading")
+            try:
+                await self.reload()
+            except ReloadInProgressError:
+                logger.info("A reload is already in progress, skipping")
+            except Exception:
+                pass  # already logged; keep serving the current model
+
+    def info(self) -> Dict:
+        return {
+            "weights_path": str(self.weights_path),
+            "model_hash": self.sha256,
+            "model_loaded_at": self.loaded_at,
+            "reloads": self.reloads,
+            "last_reload_error": self.last_error
+        }
@@ -0,0 +1,95 @@
+"""
+Model warmup
+Runs synthetic inferences at each served resolution and batch size before reporting ready
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupError(Exception):
+    """Raised when a warmup inference reports an error instead of detections"""
+
+
+def parse_shapes(value: str) -> List[Tuple[int, int]]:
+    """
+    Parse frame shapes given as "HEIGHTxWIDTH" separated by commas
+
+    Example: "640x640,720x1280,1080x1920"
+    """
+    shapes = []
+    for entry in value.split(","):
+        entry = entry.strip().lower()
+        if not entry:
+            continue
+        height, _, width = entry.partition("x")
+        shapes.append((int(height), int(width or height)))
+    return shapes
+
+
+def parse_batch_sizes(value: str) -> List[int]:
+    """Parse comma separated batch sizes, ignoring duplicates and non-positive values"""
+    sizes = []
+    for entry in value.split(","):
+        if entry.strip() and int(entry) > 0 and int(entry) not in sizes:
+            sizes.append(int(entry))
+    return sizes
+
+
+def warm_up(detector: Any, shapes: Sequence[Tuple[int, int]], batch_sizes: Sequence[int],
+            iterations: int = 2) -> Dict:
+    """
+    Run synthetic inferences so real requests do not pay first-call costs
+
+    Each shape and batch size combination runs detect_batch `iterations`
+    times on noise frames, which exercises kernel selection, allocator growth
+    and lazy initialization the same way real frames would.
+
+    Args:
+        detector: Detector exposing detect_batch(images)
+        shapes: Frame shapes (height, width) to warm up
+        batch_sizes: Batch sizes to warm up
+        iterations: Inferences per combination
+
+    Returns:
+        Per-combination timings in milliseconds and the total warmup time
+
+    Raises:
+        WarmupError: If any result carries an "error" (detect_batch reports
+            inference failures that way instead of raising)
+    """
+    started = time.perf_counter()
+    rng = np.random.default_rng(0)
+    runs = []
+
+    for height, width in shapes:
+        frame = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        for batch_size in batch_sizes:
+            timings = []
+            for _ in range(max(1, iterations)):
+                call_started = time.perf_counter()
+                results = detector.detect_batch([frame] * batch_size)
+                timings.append((time.perf_counter() - call_started) * 1000.0)
+                errors = [result["error"] for result in results if isinstance(result, dict) and "error" in result]
+                if errors:
+                    raise WarmupError(f"Warmup inference at {height}x{width} batch {batch_size} failed: {errors[0]}")
+
+            runs.append({
+                "shape": f"{height}x{width}",
+                "batch_size": batch_size,
+                "first_ms": round(timings[0], 1),
+                "last_ms": round(timings[-1], 1)
+            })
+            logger.info(
+                f"Warmup {height}x{width} batch {batch_size}: first {timings[0]:.0f} ms, "
+                f"last {timings[-1]:.0f} ms over {len(timings)} runs"
+            )
+
+    total_ms = (time.perf_counter() - started) * 1000.0
+    logger.info(f"Warmup finished in {total_ms / 1000.0:.1f}s ({len(runs)} shape/batch combinations)")
+    return {"total_ms": round(total_ms, 1), "runs": runs}
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Tests import the package the way the service images do, from the shared directory
+SHARED_ROOT = Path(__file__).resolve().parent.parent
+if str(SHARED_ROOT) not in sys.path:
+    sys.path.insert(0, str(SHARED_ROOT))
@@ -0,0 +1,49 @@
+"""
+Tests for the cached model artifacts
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("torch")
+
+from conftest import SHARED_ROOT  # noqa: E402
+from ruth_serving.artifacts import artifact_path, weights_sha256  # noqa: E402
+
+
+def test_imports_without_a_yolov7_tree(tmp_path):
+    code = (
+        f"import sys; sys.path.insert(0, {str(SHARED_ROOT)!r}); import ruth_serving.artifacts; "
+        "assert 'models' not in sys.modules, 'imported a vendored YOLOv7 package'"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_weights_hash_is_remembered_until_the_file_changes(tmp_path):
+    weights = tmp_path / "model.pt"
+    weights.write_bytes(b"v1")
+    cache = tmp_path / "cache"
+    cache.mkdir()
+
+    first = weights_sha256(weights, cache)
+    assert (cache / "sha256.json").exists()
+    assert weights_sha256(weights, cache) == first
+
+    weights.write_bytes(b"v2 with another size")
+    assert weights_sha256(weights, cache) != first
+
+
+def test_read_only_consumers_never_write_the_index(tmp_path):
+    weights = tmp_path / "model.pt"
+    weights.write_bytes(b"v1")
+    weights_sha256(weights, tmp_path, read_only=True)
+    assert not (tmp_path / "sha256.json").exists()
+
+
+def test_artifact_path_is_keyed_by_hash():
+    path = artifact_path("weights/yolov7-w6-pose.pt", "/cache", "ab" * 32)
+    assert path.parent.as_posix() == "/cache"
+    assert path.name.startswith("yolov7-w6-pose.abababababababab.fused-v")
@@ -0,0 +1,117 @@
+"""
+Tests for reduced JPEG decoding
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+from ruth_serving.decode import decode_image, jpeg_size, reduction_factor, scale_detections  # noqa: E402
+
+
+def encode(height: int, width: int, ext: str = ".jpg", params=()) -> bytes:
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    image[:, : width // 2] = 200
+    return cv2.imencode(ext, image, list(params))[1].tobytes()
+
+
+@pytest.mark.parametrize("height, width", [(480, 640), (1080, 1920), (2160, 3840), (1, 1)])
+def test_jpeg_size_reads_the_frame_header(height, width):
+    assert jpeg_size(encode(height, width)) == (height, width)
+
+
+def test_jpeg_size_reads_progressive_frames():
+    data = encode(720, 1280, params=(cv2.IMWRITE_JPEG_PROGRESSIVE, 1))
+    assert jpeg_size(data) == (720, 1280)
+
+
+def test_jpeg_size_skips_app_segments_and_fill_bytes():
+    data = encode(300, 400)
+    payload = b"Exif\x00\x00" + b"\x00" * 64
+    app1 = b"\xff\xe1" + (len(payload) + 2).to_bytes(2, "big") + payload
+    assert jpeg_size(data[:2] + b"\xff" + app1 + data[2:]) == (300, 400)
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"\xff\xd8",
+    encode(32, 32, ext=".png"),
+    encode(32, 32)[:20],
+    b"\xff\xd8\xff\xda\x00\x02",
+])
+def test_jpeg_size_rejects_other_data(data):
+    assert jpeg_size(data) is None
+
+
+@pytest.mark.parametrize("size, target, factor", [
+    ((2160, 3840), 640, 4),
+    ((1080, 1920), 640, 2),
+    ((720, 1280), 640, 2),
+    ((720, 1279), 640, 2),
+    ((720, 1278), 640, 1),
+    ((5120, 5120), 640, 8),
+    ((480, 640), 640, 1),
+])
+def test_reduction_factor_keeps_the_model_input_covered(size, target, factor):
+    assert reduction_factor(size, target) == factor
+    assert -(-max(size) // factor) >= target or factor == 1
+
+
+def test_decode_image_reduces_large_jpegs():
+    decoded = decode_image(encode(1080, 1920), 640)
+    assert decoded.image.shape[:2] == (540, 960)
+    assert decoded.scale == 2.0
+    assert decoded.full_resolution().shape[:2] == (1080, 1920)
+    assert decoded.crop([100, 100, 200, 300]).shape[:2] == (200, 100)
+
+
+def test_decode_image_keeps_small_and_non_jpeg_images():
+    assert decode_image(encode(480, 640), 640).scale == 1.0
+    decoded = decode_image(encode(1080, 1920, ext=".png"), 640)
+    assert decoded.scale == 1.0 and decoded.image.shape[:2] == (1080, 1920)
+    assert decode_image(encode(1080, 1920), 0).scale == 1.0
+
+
+def test_decode_image_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_image(b"not an image", 640)
+
+
+class ResultWithArrays(dict):
+    """A result carrying its detections as arrays alongside the JSON fields"""
+
+    def __init__(self, fields, arrays):
+        super().__init__(fields)
+        self.arrays = arrays
+
+
+def test_scale_detections_maps_back_to_original_pixels():
+    result = ResultWithArrays({
+        "detections": [{
+            "bbox": [10, 20, 30, 40],
+            "keypoints": [{"x": 1.5, "y": 2.0, "confidence": 0.9}]
+        }, {
+            "bbox": [1.25, 2.5, 3.0, 4.0]
+        }]
+    }, {
+        "boxes": np.array([[10, 20, 30, 40]], dtype=np.float32),
+        "keypoints": np.ones((1, 17, 3), dtype=np.float32)
+    })
+    original_keypoints = result.arrays["keypoints"]
+
+    assert scale_detections(result, 2.0) is result
+    first, second = result["detections"]
+    assert first["bbox"] == [20, 40, 60, 80] and all(isinstance(v, int) for v in first["bbox"])
+    assert first["keypoints"][0] == {"x": 3.0, "y": 4.0, "confidence": 0.9}
+    assert second["bbox"] == [2.5, 5.0, 6.0, 8.0]
+    np.testing.assert_array_equal(result.arrays["boxes"], [[20, 40, 60, 80]])
+    np.testing.assert_array_equal(result.arrays["keypoints"][..., :2], 2.0)
+    np.testing.assert_array_equal(result.arrays["keypoints"][..., 2], 1.0)
+    # The caller's keypoint array is not modified
+    np.testing.assert_array_equal(original_keypoints, 1.0)
+
+
+def test_scale_detections_is_a_no_op_at_full_resolution():
+    result = {"detections": [{"bbox": [1, 2, 3, 4]}]}
+    assert scale_detections(result, 1.0) == {"detections": [{"bbox": [1, 2, 3, 4]}]}
@@ -0,0 +1,69 @@
+"""
+Tests for the bounded inference executor
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from ruth_serving.executor import InferenceExecutor, QueueFullError
+
+
+def test_run_returns_result_off_the_event_loop():
+    executor = InferenceExecutor(max_workers=1, max_queue_size=0)
+
+    async def main():
+        return await executor.run(lambda: threading.current_thread().name)
+
+    try:
+        assert asyncio.run(main()).startswith("inference")
+    finally:
+        executor.shutdown()
+
+
+def test_rejects_calls_beyond_workers_and_queue():
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1, retry_after=3)
+    release = threading.Event()
+
+    async def main():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        waiting = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0)
+        assert executor.in_flight == 2
+        assert executor.queue_depth == 1
+        assert not executor.has_capacity()
+
+        # The apps turn this into a 503 with the Retry-After header
+        with pytest.raises(QueueFullError) as rejected:
+            await executor.run(lambda: None)
+        assert rejected.value.retry_after == 3
+
+        release.set()
+        await asyncio.gather(running, waiting)
+        assert executor.in_flight == 0
+        assert executor.has_capacity()
+
+    try:
+        asyncio.run(main())
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_failed_calls_free_their_slot():
+    executor = InferenceExecutor(max_workers=1, max_queue_size=0)
+
+    def fail():
+        raise ValueError("bad frame")
+
+    async def main():
+        with pytest.raises(ValueError):
+            await executor.run(fail)
+        assert executor.in_flight == 0
+        assert await executor.run(lambda: "ok") == "ok"
+
+    try:
+        asyncio.run(main())
+    finally:
+        executor.shutdown()
@@ -0,0 +1,33 @@
+"""
+Tests for weights memory accounting
+"""
+
+import mmap
+import os
+
+import pytest
+
+from ruth_serving.memory import mapped_file_memory_kb, process_memory_kb
+
+pytestmark = pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs /proc smaps")
+
+
+def test_process_memory_reports_every_field():
+    memory = process_memory_kb()
+    assert set(memory) == {"rss_kb", "pss_kb", "shared_clean_kb", "shared_dirty_kb",
+                           "private_clean_kb", "private_dirty_kb"}
+    assert memory["rss_kb"] > 0
+
+
+def test_process_memory_of_a_missing_process_is_empty():
+    assert process_memory_kb(2 ** 22 + 1) == {}
+
+
+def test_mapped_file_memory_counts_the_mapping(tmp_path):
+    path = tmp_path / "weights.bin"
+    path.write_bytes(b"\1" * (1 << 20))
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        assert sum(mapped[::4096]) == 256  # touch every page
+        memory = mapped_file_memory_kb(path)
+    assert memory["mappings"] == 1
+    assert memory["rss_kb"] >= 1024
@@ -0,0 +1,110 @@
+"""
+Tests for hot model reload
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from ruth_serving.hashing import file_sha256  # noqa: E402
+from ruth_serving.reload import ModelReloader, ReloadInProgressError  # noqa: E402
+from ruth_serving.warmup import WarmupError, warm_up  # noqa: E402
+
+
+class FakeDetector:
+    """Detector built from a weights file; "bad" weights load but fail every inference"""
+
+    def __init__(self, weights_path: str):
+        with open(weights_path) as f:
+            self.weights = f.read()
+
+    def detect_batch(self, images):
+        if self.weights == "bad":
+            return [{"violation_detected": False, "error": "unexpected key in state_dict"} for _ in images]
+        return [{"violation_detected": False, "detections": []} for _ in images]
+
+
+class Service:
+    """The served-detector bookkeeping the apps keep in module globals"""
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.swaps = 0
+
+    async def swap(self, new_detector):
+        previous, self.detector = self.detector, new_detector
+        self.swaps += 1
+        return previous
+
+
+def make_reloader(weights_path, service):
+    return ModelReloader(
+        weights_path,
+        FakeDetector,
+        service.swap,
+        warmup=lambda detector: warm_up(detector, [(32, 32)], [1], iterations=1),
+        sha256=file_sha256(weights_path)
+    )
+
+
+def test_reload_swaps_in_a_detector_that_warms_up(tmp_path):
+    weights = tmp_path / "model.pt"
+    weights.write_text("v1")
+    service = Service(FakeDetector(str(weights)))
+    reloader = make_reloader(weights, service)
+
+    weights.write_text("v2")
+    outcome = asyncio.run(reloader.reload())
+
+    assert outcome["reloaded"] is True
+    assert service.detector.weights == "v2"
+    assert reloader.sha256 == file_sha256(weights)
+    assert reloader.reloads == 1
+    assert reloader.warmup_report["runs"][0]["shape"] == "32x32"
+
+
+def test_bad_checkpoint_keeps_the_previous_detector(tmp_path):
+    weights = tmp_path / "model.pt"
+    weights.write_text("v1")
+    previous = FakeDetector(str(weights))
+    service = Service(previous)
+    reloader = make_reloader(weights, service)
+    served_hash = reloader.sha256
+
+    weights.write_text("bad")
+    with pytest.raises(WarmupError, match="unexpected key"):
+        asyncio.run(reloader.reload())
+
+    assert service.detector is previous
+    assert service.swaps == 0
+    assert reloader.sha256 == served_hash
+    assert reloader.reloads == 0
+    assert "unexpected key" in reloader.info()["last_reload_error"]
+
+
+def test_unchanged_weights_are_not_reloaded(tmp_path):
+    weights = tmp_path / "model.pt"
+    weights.write_text("v1")
+    service = Service(FakeDetector(str(weights)))
+    reloader = make_reloader(weights, service)
+
+    assert asyncio.run(reloader.reload())["reloaded"] is False
+    assert asyncio.run(reloader.reload(force=True))["reloaded"] is True
+    assert service.swaps == 1
+
+
+def test_concurrent_reload_is_rejected(tmp_path):
+    weights = tmp_path / "model.pt"
+    weights.write_text("v1")
+    reloader = make_reloader(weights, Service(FakeDetector(str(weights))))
+
+    async def main():
+        first = asyncio.ensure_future(reloader.reload(force=True))
+        await asyncio.sleep(0)
+        with pytest.raises(ReloadInProgressError):
+            await reloader.reload(force=True)
+        await first
+
+    asyncio.run(main())
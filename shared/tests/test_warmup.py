@@ -0,0 +1,47 @@
+"""
+Tests for model warmup
+"""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from ruth_serving.warmup import WarmupError, parse_batch_sizes, parse_shapes, warm_up  # noqa: E402
+
+
+class FakeDetector:
+    """Returns one result per frame, optionally reporting an error the way detect_batch does"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    def detect_batch(self, images):
+        self.calls.append((images[0].shape, len(images)))
+        if self.error:
+            return [{"violation_detected": False, "error": self.error} for _ in images]
+        return [{"violation_detected": False, "detections": []} for _ in images]
+
+
+def test_parse_shapes_and_batch_sizes():
+    assert parse_shapes("640x640, 720X1280,,512") == [(640, 640), (720, 1280), (512, 512)]
+    assert parse_batch_sizes("1,8,1,0,4") == [1, 8, 4]
+
+
+def test_warm_up_runs_every_combination():
+    detector = FakeDetector()
+    report = warm_up(detector, [(64, 64), (48, 96)], [1, 2], iterations=2)
+
+    assert [(run["shape"], run["batch_size"]) for run in report["runs"]] == [
+        ("64x64", 1), ("64x64", 2), ("48x96", 1), ("48x96", 2)
+    ]
+    assert detector.calls == [((64, 64, 3), 1)] * 2 + [((64, 64, 3), 2)] * 2 + [((48, 96, 3), 1)] * 2 + [((48, 96, 3), 2)] * 2
+    assert report["total_ms"] >= 0
+
+
+def test_warm_up_raises_on_error_results():
+    detector = FakeDetector(error="size mismatch for model.0.conv.weight")
+    with pytest.raises(WarmupError, match="size mismatch"):
+        warm_up(detector, [(64, 64)], [1, 2])
+    # Stops at the first failing inference
+    assert len(detector.calls) == 1